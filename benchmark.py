@@ -0,0 +1,313 @@
+"""
+Benchmarks de desempenho para o NutriBot Evolve.
+Este script mede o desempenho dos componentes críticos do bot em cenários de carga.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pathlib import Path
+from PIL import Image
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import DatabaseManager
+from utils.food_matcher import FoodMatcher, QUANTITY_PATTERN
+from utils.report_data import ReportData
+from utils.photo_analyzer import PhotoAnalyzer
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def run_concurrently(task, workers, operations_per_worker):
+    """
+    Executa uma tarefa em várias threads e mede a vazão.
+
+    Args:
+        task (callable): Função que recebe o índice da operação
+        workers (int): Número de threads simulando os workers do dispatcher
+        operations_per_worker (int): Número de operações por thread
+
+    Returns:
+        float: Operações por segundo
+    """
+    def worker(worker_index):
+        for i in range(operations_per_worker):
+            task(worker_index * operations_per_worker + i)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(worker, range(workers)))
+    elapsed = time.perf_counter() - start_time
+
+    return (workers * operations_per_worker) / elapsed
+
+def benchmark_connection_pool(workers=8, queries_per_worker=500, users=50):
+    """
+    Compara a vazão de consultas com uma conexão por chamada e com o pool de conexões.
+
+    Args:
+        workers (int): Número de workers concorrentes
+        queries_per_worker (int): Consultas executadas por worker
+        users (int): Número de usuários simulados
+
+    Returns:
+        dict: Consultas por segundo antes e depois
+    """
+    print_header("Benchmark: pool de conexões do banco de dados")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "benchmark.db")
+        manager = DatabaseManager(db_path)
+
+        # Popula o banco com refeições de hoje para vários usuários
+        today = datetime.date.today()
+        with manager.connection() as conn:
+            conn.executemany(
+                "INSERT INTO meals (user_id, meal_type, description, calories, protein, carbs, fat, meal_date, created_at) "
+                "VALUES (?, 'almoco', 'arroz e feijão', 500, 30, 60, 10, ?, ?)",
+                [(user_id % users, today, datetime.datetime.now()) for user_id in range(users * 5)]
+            )
+            conn.commit()
+
+        # Consulta usada pelo comando /status
+        query = """
+        SELECT SUM(calories) as total_calories, SUM(protein) as total_protein,
+               SUM(carbs) as total_carbs, SUM(fat) as total_fat
+        FROM meals WHERE user_id = ? AND meal_date = ?
+        """
+
+        def connect_per_call(i):
+            # Comportamento anterior: abre e fecha uma conexão a cada consulta
+            conn = sqlite3.connect(db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                return conn.execute(query, (i % users, today)).fetchone()
+            finally:
+                conn.close()
+
+        def pooled(i):
+            return manager.fetch_one(query, (i % users, today))
+
+        before = run_concurrently(connect_per_call, workers, queries_per_worker)
+        after = run_concurrently(pooled, workers, queries_per_worker)
+        manager.close_pool()
+
+    print(f"Workers concorrentes: {workers}")
+    print(f"Conexão por chamada: {before:,.0f} consultas/s")
+    print(f"Pool de conexões:    {after:,.0f} consultas/s")
+    print(f"Ganho: {after / before:.1f}x")
+
+    return {'before': before, 'after': after}
+
+def build_synthetic_food_names(count, seed=42):
+    """
+    Gera nomes de alimentos sintéticos no estilo das tabelas TACO/IBGE.
+
+    Args:
+        count (int): Número de nomes a gerar
+        seed (int): Semente para reprodutibilidade
+
+    Returns:
+        list: Nomes de alimentos distintos
+    """
+    rng = random.Random(seed)
+    bases = ["arroz", "feijão", "frango", "carne", "peixe", "batata", "pão", "queijo",
+             "leite", "iogurte", "banana", "maçã", "tomate", "cenoura", "abóbora", "milho"]
+    modifiers = ["integral", "cozido", "cru", "grelhado", "assado", "frito", "light", "desnatado",
+                 "refogado", "em conserva", "com sal", "sem sal", "tipo 1", "tipo 2", "orgânico"]
+
+    names = set(bases)
+    while len(names) < count:
+        words = [rng.choice(bases)] + rng.sample(modifiers, rng.randint(1, 3))
+        names.add(" ".join(words) + f" {rng.randint(1, 9999)}")
+    return sorted(names)
+
+def benchmark_food_matcher(food_count=10000, messages=20):
+    """
+    Compara a identificação de alimentos com uma regex por alimento e com o localizador compilado.
+
+    Args:
+        food_count (int): Tamanho do banco de dados de alimentos
+        messages (int): Número de mensagens analisadas
+
+    Returns:
+        dict: Mensagens por segundo antes e depois
+    """
+    print_header(f"Benchmark: identificação de alimentos ({food_count:,} alimentos)")
+
+    food_names = build_synthetic_food_names(food_count)
+    texts = [
+        "almoço: 150g de arroz integral cozido, feijão (80g) e frango grelhado",
+        "café da manhã com pão, queijo e 200ml de leite desnatado",
+        "jantar: 2 colheres de batata assado, tomate e cenoura cozido",
+    ]
+
+    def per_food_regex(text):
+        # Comportamento anterior: uma regex montada e executada por alimento
+        found = []
+        for food_name in food_names:
+            pattern = (r'(' + QUANTITY_PATTERN + r')?\s*(?:de\s+)?(' + re.escape(food_name) + r')|\b(' +
+                       re.escape(food_name) + r')\s*(?:\((' + QUANTITY_PATTERN + r')\))?')
+            for match in re.finditer(pattern, text):
+                found.append((match.group(2) or match.group(3), match.group(1) or match.group(4) or ""))
+        return found
+
+    start_time = time.perf_counter()
+    matcher = FoodMatcher(food_names)
+    build_time = time.perf_counter() - start_time
+
+    def timed(func, count):
+        start = time.perf_counter()
+        for i in range(count):
+            func(texts[i % len(texts)])
+        return count / (time.perf_counter() - start)
+
+    before = timed(per_food_regex, max(1, messages // 10))
+    after = timed(matcher.find_all, messages * 100)
+
+    print(f"Compilação do localizador: {build_time * 1000:.0f} ms")
+    print(f"Regex por alimento:   {before:,.1f} mensagens/s")
+    print(f"Localizador único:    {after:,.0f} mensagens/s")
+    print(f"Ganho: {after / before:,.0f}x")
+
+    return {'before': before, 'after': after}
+
+def benchmark_report_stats(days=365, reports=200):
+    """
+    Compara as estatísticas de relatório calculadas em listas de dicionários e sobre arrays NumPy.
+
+    Args:
+        days (int): Tamanho da janela do relatório
+        reports (int): Número de relatórios calculados
+
+    Returns:
+        dict: Relatórios por segundo antes e depois
+    """
+    print_header(f"Benchmark: estatísticas de relatório ({days} dias)")
+
+    rng = random.Random(42)
+    end_date = datetime.date.today()
+    start_date = end_date - datetime.timedelta(days=days - 1)
+    series = {name: [rng.uniform(0, 3000) for _ in range(days)] for name in ReportData.SERIES}
+    daily_target = 2000
+
+    daily = [
+        {name: series[name][i] for name in ReportData.SERIES}
+        for i in range(days)
+    ]
+
+    def list_stats():
+        # Comportamento anterior: uma passagem pela lista para cada estatística
+        stats = {}
+        for name in ReportData.NUTRIENTS:
+            values = [day[name] for day in daily]
+            stats[f'total_{name}'] = sum(values)
+            stats[f'avg_{name}'] = sum(values) / len(values)
+        calories = [day['calories'] for day in daily]
+        stats['days_over'] = sum(1 for value in calories if value > daily_target)
+        stats['days_under'] = sum(1 for value in calories if value < daily_target)
+        stats['std'] = np.std(calories)
+        stats['rolling'] = [sum(calories[i:i + 7]) / 7 for i in range(len(calories) - 6)]
+        return stats
+
+    def array_stats():
+        report_data = ReportData(1, start_date, end_date, {name: np.array(values) for name, values in series.items()})
+        return report_data.summarize(daily_target, window=7)
+
+    def timed(func, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            func()
+        return count / (time.perf_counter() - start)
+
+    before = timed(list_stats, reports)
+    after = timed(array_stats, reports)
+
+    print(f"Listas de dicionários: {before:,.0f} relatórios/s")
+    print(f"Arrays NumPy:          {after:,.0f} relatórios/s")
+    print(f"Ganho: {after / before:,.1f}x")
+
+    return {'before': before, 'after': after}
+
+def benchmark_photo_analysis(photos=10, size=(4000, 3000)):
+    """
+    Compara a análise de fotos decodificando a imagem inteira e em resolução reduzida.
+
+    Args:
+        photos (int): Número de fotos analisadas
+        size (tuple): Dimensões das fotos (padrão: 12 megapixels, como em câmeras de celular)
+
+    Returns:
+        dict: Fotos por segundo antes e depois
+    """
+    print_header(f"Benchmark: análise de fotos ({size[0] * size[1] / 1e6:.0f} megapixels)")
+
+    # Foto sintética com gradiente e ruído, comprimida como as câmeras de celular
+    rng = np.random.default_rng(42)
+    gradient = np.linspace(40, 220, size[0], dtype=np.float32)[np.newaxis, :, np.newaxis]
+    noise = rng.normal(0, 8, (size[1], size[0], 3)).astype(np.float32)
+    pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+    photo_dir = tempfile.mkdtemp()
+    photo_path = os.path.join(photo_dir, "photo.jpg")
+    Image.fromarray(pixels, 'RGB').save(photo_path, quality=90)
+
+    analyzer = PhotoAnalyzer()
+
+    def full_resolution():
+        # Comportamento anterior: imagem inteira convertida para cinza, duas vezes
+        # (análise de iluminação e novamente para as sugestões)
+        image = Image.open(photo_path)
+        for _ in range(2):
+            histogram = image.convert('L').histogram()
+            sum(i * histogram[i] for i in range(256)) / sum(histogram)
+
+    def timed(func):
+        start = time.perf_counter()
+        for _ in range(photos):
+            func()
+        return photos / (time.perf_counter() - start)
+
+    try:
+        before = timed(full_resolution)
+        after = timed(lambda: analyzer.analyze_photo(photo_path))
+        working_size = PhotoAnalyzer._load_working_image(photo_path)[2].size
+    finally:
+        os.remove(photo_path)
+        os.rmdir(photo_dir)
+
+    print(f"Resolução total:    {before:,.2f} fotos/s")
+    print(f"Resolução reduzida: {after:,.2f} fotos/s")
+    print(f"Ganho: {after / before:,.1f}x")
+    print(f"Imagem decodificada: {size[0]}x{size[1]} -> {working_size[0]}x{working_size[1]}")
+
+    return {'before': before, 'after': after}
+
+def run_all_benchmarks():
+    """Executa todos os benchmarks."""
+    print_header("BENCHMARKS DO NUTRIBOT EVOLVE")
+
+    benchmarks = [
+        benchmark_connection_pool,
+        benchmark_food_matcher,
+        benchmark_report_stats,
+        benchmark_photo_analysis
+    ]
+
+    for benchmark in benchmarks:
+        benchmark()
+
+if __name__ == "__main__":
+    run_all_benchmarks()
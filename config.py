@@ -9,6 +9,66 @@ TOKEN = "7527630621:AAFVK10miTDtB1ivqZA5HCshQREKaBNs1es"
 # Configurações do banco de dados
 DATABASE_PATH = "database/nutribot.db"
 
+# Configurações do pool de conexões do banco de dados
+DB_POOL_SIZE = 5                    # Número máximo de conexões abertas simultaneamente
+DB_POOL_TIMEOUT = 30                # Tempo máximo (s) de espera por uma conexão livre
+DB_POOL_RECYCLE = 3600              # Idade máxima (s) de uma conexão antes de ser recriada
+DB_POOL_HEALTH_CHECK_INTERVAL = 60  # Conexões ociosas há mais tempo que isso (s) são testadas antes do uso
+
+# Perfis de armazenamento do SQLite (PRAGMAs aplicados em cada conexão do pool)
+STORAGE_PROFILES = {
+    "padrao": {
+        "journal_mode": "WAL",       # Leitores não bloqueiam durante as escritas
+        "synchronous": "NORMAL",     # Seguro com WAL; fsync apenas nos checkpoints
+        "cache_size": -16000,        # Valores negativos são em KiB (~16 MB)
+        "mmap_size": 134217728,      # 128 MB de leitura via memória mapeada
+        "busy_timeout": 5000,        # Espera (ms) por um lock antes de falhar
+        "temp_store": "MEMORY"
+    },
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",       # fsync a cada commit
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "busy_timeout": 10000,
+        "temp_store": "DEFAULT"
+    },
+    "compatibilidade": {
+        "journal_mode": "DELETE",    # Para sistemas de arquivos sem suporte a WAL (ex.: rede)
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "busy_timeout": 10000,
+        "temp_store": "DEFAULT"
+    }
+}
+STORAGE_PROFILE = "padrao"
+
+# Fila de escrita: todas as escritas passam por uma única thread com commit em grupo
+DB_WRITE_QUEUE_ENABLED = True
+DB_WRITE_BATCH_SIZE = 64      # Máximo de operações gravadas em um único commit
+DB_WRITE_BATCH_DELAY = 0.0    # Espera (s) por mais operações antes do commit (0 = só agrupa o que já está na fila)
+DB_WRITE_TIMEOUT = 30         # Espera máxima (s) até a thread escritora iniciar uma operação (depois disso a escrita falha)
+
+# Número máximo de operações de banco de dados simultâneas nos handlers assíncronos (main_v20.py)
+DB_ASYNC_MAX_WORKERS = DB_POOL_SIZE
+
+# Catálogo de alimentos (resources/food_database.json) compartilhado pelo processo
+FOOD_CATALOG_RELOAD_INTERVAL = 5  # Intervalo mínimo (s) entre verificações de alteração do arquivo
+FOOD_CATALOG_BACKEND = "json"     # "json" (tabela inteira em memória) ou "sqlite" (resources/food_catalog.db, lido sob demanda)
+
+# Cache das análises de texto de refeições (invalidado quando o catálogo de alimentos é recarregado)
+MEAL_ANALYSIS_CACHE_SIZE = 2048   # Máximo de textos normalizados mantidos em cache
+MEAL_ANALYSIS_CACHE_TTL = 3600    # Tempo de vida (s) de cada análise em cache
+
+# Cache em memória dos estados de conversação (gravados também em conversation_states)
+CONVERSATION_CACHE_SIZE = 10000   # Máximo de usuários com estado em memória
+CONVERSATION_CACHE_TTL = 1800     # Tempo (s) sem atividade até o estado sair da memória
+
+# Cache de perfis de usuários (invalidado a cada alteração em UserRepository)
+USER_CACHE_SIZE = 10000   # Máximo de perfis mantidos em memória
+USER_CACHE_TTL = 300      # Tempo de vida (s) de cada perfil em cache
+
 # Constantes para cálculo de calorias
 # Fórmula de Harris-Benedict para cálculo de TMB (Taxa Metabólica Basal)
 # Homens: TMB = 88.362 + (13.397 × peso em kg) + (4.799 × altura em cm) - (5.677 × idade em anos)
@@ -74,6 +134,40 @@ MAX_MESSAGE_LENGTH = 4096  # Limite de caracteres para mensagens do Telegram
 # Configurações de relatórios
 REPORT_FREQUENCY = 7  # Frequência de geração de relatórios em dias
 
+# Pool de processos que desenha os gráficos dos relatórios
+CHART_RENDER_WORKERS = 2    # Número de processos de renderização (0 = desenha na thread que gera o relatório)
+CHART_RENDER_TIMEOUT = 60   # Tempo máximo (s) de espera por um gráfico
+
+# Cache de relatórios e gráficos identificados pelo hash dos dados (diretório reports/)
+REPORT_CACHE_MAX_AGE = 604800             # Arquivos sem uso há mais tempo (s) são removidos (7 dias)
+REPORT_CACHE_MAX_BYTES = 524288000        # Tamanho máximo do diretório de relatórios (500 MB)
+REPORT_CACHE_EVICTION_INTERVAL = 3600     # Intervalo mínimo (s) entre limpezas do diretório
+
+# Geração antecipada dos relatórios de todos os usuários (a cada REPORT_FREQUENCY dias)
+REPORT_BATCH_TIME = "03:00"       # Horário de início da geração em lote (fora do horário de pico)
+REPORT_BATCH_CHUNK_SIZE = 200     # Usuários lidos do banco por lote
+REPORT_BATCH_WORKERS = 4          # Relatórios gerados em paralelo
+REPORT_BATCH_CHECKPOINT_PATH = "database/report_batch_{report_type}.json"  # Progresso para retomar execuções interrompidas
+
+# Recebimento de fotos corporais
+PHOTO_CHUNK_SIZE = 65536          # Bytes copiados por vez ao salvar uma foto (memória constante por envio)
+PHOTO_MAX_BYTES = 20971520        # Tamanho máximo aceito por foto (20 MB, limite de download da API de bots)
+PHOTO_DOWNLOAD_TIMEOUT = 30       # Tempo máximo (s) de espera por dados ao baixar uma foto
+PHOTO_ANALYSIS_MAX_SIZE = (512, 512)    # Tamanho máximo da imagem decodificada para análise
+PHOTO_THUMBNAIL_SIZE = (320, 320)       # Tamanho máximo das miniaturas geradas no envio
+PHOTO_COMPARISON_SIZE = (800, 600)      # Tamanho máximo de cada foto nas imagens de comparação
+PHOTO_ANALYZER_VERSION = 1              # Versão das regras de análise: alterar faz as análises salvas serem refeitas
+
+# Pool de processos que analisa e compara as fotos
+PHOTO_SERVICE_WORKERS = 2         # Número de processos (0 = processa na thread que atende a mensagem)
+PHOTO_SERVICE_TIMEOUT = 30        # Tempo máximo (s) de espera por uma análise ou comparação
+PHOTO_SERVICE_MAX_PENDING = 200   # Máximo de trabalhos na fila (acima disso novos envios são recusados)
+
+# Reanálise das fotos em segundo plano (ao mudar PHOTO_ANALYZER_VERSION)
+PHOTO_REANALYSIS_CHUNK_SIZE = 20     # Fotos enviadas ao serviço por lote (bem abaixo de PHOTO_SERVICE_MAX_PENDING)
+PHOTO_REANALYSIS_RETRY_DELAY = 5     # Espera (s) antes de reenviar fotos recusadas pela fila cheia ou canceladas
+PHOTO_REANALYSIS_MAX_RETRIES = 3     # Tentativas seguidas sem progresso antes de deixar o restante para a próxima execução
+
 # Configurações de lembretes
 DEFAULT_REMINDERS = {
     "cafe_da_manha": "08:00",
@@ -84,6 +178,12 @@ DEFAULT_REMINDERS = {
     "ceia": "21:30"
 }
 
+# Envio dos lembretes (limite global do Telegram: cerca de 30 mensagens por segundo)
+REMINDER_SEND_RATE = 25       # Lembretes enviados por segundo
+REMINDER_SEND_BURST = 30      # Lembretes enviados seguidos antes de aplicar o limite
+REMINDER_BATCH_SIZE = 100     # Lembretes por lote
+REMINDER_SEND_WORKERS = 4     # Lotes enviados em paralelo
+
 # Configurações de recursos premium
 PREMIUM_FEATURES = [
     "dietas_exclusivas",
@@ -0,0 +1,55 @@
+"""
+Configuração do pytest para os scripts de teste do NutriBot Evolve.
+Os scripts também podem ser executados diretamente (python test_*.py); como
+neles cada teste informa o resultado retornando True ou False, um teste que
+retorna False é considerado falho também pelo pytest.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def temp_database(tmp_path_factory):
+    """
+    Aponta o gerenciador global para um banco de dados temporário em cada módulo.
+    
+    A instância global é criada na primeira importação de database.db_manager,
+    com o caminho de config.DATABASE_PATH; trocar o caminho depois disso não
+    tem efeito, então o gerenciador é reaberto no arquivo temporário e os caches
+    de perfis e de estados de conversação são descartados.
+    """
+    from database.db_manager import db_manager
+    from database.user_repository import UserRepository
+    from utils.conversation_manager import ConversationManager
+
+    db_manager.reopen(os.path.join(tmp_path_factory.mktemp("db"), "nutribot_test.db"))
+    UserRepository.invalidate_cache()
+    ConversationManager.invalidate_cache()
+    yield db_manager.db_path
+    UserRepository.invalidate_cache()
+    ConversationManager.invalidate_cache()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Gerenciador de banco de dados inicializado em um arquivo temporário."""
+    from database.db_manager import DatabaseManager
+
+    manager = DatabaseManager(os.path.join(tmp_path, "migrations_test.db"))
+    yield manager
+    manager.close_pool()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Falha os testes que retornam False."""
+    outcome = yield
+    if outcome.excinfo is None and outcome.get_result() is False:
+        pytest.fail(f"{pyfuncitem.name} retornou False", pytrace=False)
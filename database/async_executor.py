@@ -0,0 +1,98 @@
+"""
+Executor assíncrono de operações de banco de dados para o NutriBot Evolve.
+Executa as chamadas bloqueantes dos handlers async do python-telegram-bot v20
+em um pool de threads dedicado, com concorrência limitada.
+"""
+
+import sys
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+
+class AsyncDatabaseExecutor:
+    """Classe para executar operações bloqueantes de banco de dados fora do event loop."""
+    
+    def __init__(self, max_workers):
+        """
+        Inicializa o executor.
+        
+        Args:
+            max_workers (int): Número máximo de operações de banco de dados simultâneas
+        """
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        """
+        Cria o pool de threads na primeira utilização.
+        
+        Returns:
+            ThreadPoolExecutor: Pool de threads do executor
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="nutribot-db-async"
+                    )
+        return self._executor
+    
+    async def run(self, func, *args, **kwargs):
+        """
+        Executa uma função bloqueante no executor e aguarda o resultado.
+        
+        Args:
+            func (callable): Função a executar
+            *args: Argumentos posicionais da função
+            **kwargs: Argumentos nomeados da função
+            
+        Returns:
+            O valor retornado pela função
+        """
+        loop = asyncio.get_running_loop()
+        # Propaga as variáveis de contexto (ex.: UserRepository.request_scope) para a thread do executor
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+    
+    def shutdown(self, wait=True):
+        """
+        Encerra o pool de threads do executor.
+        
+        Args:
+            wait (bool): Se True, aguarda as operações em andamento
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def async_method(method):
+    """
+    Cria a versão assíncrona de um método estático de repositório.
+    
+    Args:
+        method (callable): Método bloqueante
+        
+    Returns:
+        staticmethod: Método assíncrono que executa o original no executor do banco de dados
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.run(method, *args, **kwargs)
+    return staticmethod(wrapper)
+
+
+# Instância global do executor de banco de dados
+db_executor = AsyncDatabaseExecutor(config.DB_ASYNC_MAX_WORKERS)
@@ -0,0 +1,263 @@
+"""
+Pool de conexões SQLite para o NutriBot Evolve.
+Mantém conexões abertas e reutilizáveis entre as chamadas do DatabaseManager,
+com afinidade por thread, verificação de saúde e reciclagem periódica.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PooledConnection:
+    """Conexão SQLite mantida pelo pool, junto com seus metadados de uso."""
+
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        """
+        Inicializa a conexão do pool.
+
+        Args:
+            conn (sqlite3.Connection): Conexão SQLite aberta
+        """
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Classe para gerenciar um conjunto limitado de conexões SQLite reutilizáveis."""
+
+    def __init__(self, db_path, size=5, timeout=30, recycle=3600, health_check_interval=60, on_connect=None):
+        """
+        Inicializa o pool de conexões.
+
+        Args:
+            db_path (str): Caminho para o arquivo do banco de dados
+            size (int): Número máximo de conexões abertas simultaneamente
+            timeout (float): Tempo máximo (s) de espera por uma conexão livre
+            recycle (float): Idade máxima (s) de uma conexão antes de ser recriada
+            health_check_interval (float): Conexões ociosas há mais tempo que isso são testadas antes do uso
+            on_connect (callable, optional): Função chamada com cada nova conexão criada
+        """
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_check_interval = health_check_interval
+        self.on_connect = on_connect
+
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+        # Contadores para acompanhamento do uso do pool
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'waits': 0
+        }
+
+    def _count(self, name):
+        """Incrementa um contador de estatísticas."""
+        with self._condition:
+            self.stats[name] += 1
+
+    def _create_connection(self):
+        """
+        Abre uma nova conexão com o banco de dados.
+
+        Returns:
+            PooledConnection: Conexão criada
+        """
+        # check_same_thread=False: a conexão pode ser usada por outra thread depois de devolvida ao pool,
+        # mas nunca por duas threads ao mesmo tempo
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Para acessar colunas pelo nome
+
+        if self.on_connect:
+            self.on_connect(conn)
+
+        self._count('created')
+        return PooledConnection(conn)
+
+    def _is_healthy(self, pooled):
+        """
+        Verifica se uma conexão ainda responde.
+
+        Args:
+            pooled (PooledConnection): Conexão a verificar
+
+        Returns:
+            bool: True se a conexão está utilizável
+        """
+        try:
+            pooled.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, pooled):
+        """Fecha uma conexão sem devolvê-la ao pool."""
+        try:
+            pooled.conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _validate(self, pooled):
+        """
+        Recicla conexões antigas e substitui conexões com problemas.
+
+        Args:
+            pooled (PooledConnection): Conexão retirada do pool
+
+        Returns:
+            PooledConnection: Conexão pronta para uso
+        """
+        now = time.monotonic()
+
+        if self.recycle and now - pooled.created_at > self.recycle:
+            self._discard(pooled)
+            self._count('recycled')
+            return self._create_connection()
+
+        if now - pooled.last_used > self.health_check_interval and not self._is_healthy(pooled):
+            self._discard(pooled)
+            self._count('discarded')
+            return self._create_connection()
+
+        self._count('reused')
+        return pooled
+
+    def _acquire(self):
+        """
+        Retira uma conexão do pool, criando uma nova se houver espaço.
+
+        Returns:
+            PooledConnection: Conexão reservada para a thread atual
+        """
+        deadline = time.monotonic() + self.timeout
+        preferred = getattr(self._local, 'preferred', None)
+        pooled = None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    # Afinidade: reutiliza a última conexão desta thread se ela estiver livre
+                    if preferred is not None and preferred in self._idle:
+                        self._idle.remove(preferred)
+                        pooled = preferred
+                    else:
+                        pooled = self._idle.pop()
+                    break
+
+                if self._created < self.size:
+                    # Reserva a vaga; a conexão é aberta fora do lock
+                    self._created += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError("Tempo esgotado aguardando uma conexão livre no pool")
+
+                self.stats['waits'] += 1
+                self._condition.wait(remaining)
+
+        try:
+            pooled = self._create_connection() if pooled is None else self._validate(pooled)
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+        self._local.preferred = pooled
+        return pooled
+
+    def _release(self, pooled, discard=False):
+        """
+        Devolve uma conexão ao pool.
+
+        Args:
+            pooled (PooledConnection): Conexão em uso
+            discard (bool): Se True, fecha a conexão em vez de reutilizá-la
+        """
+        if not discard:
+            try:
+                # Nunca devolve ao pool uma transação pendente
+                if pooled.conn.in_transaction:
+                    pooled.conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        pooled.last_used = time.monotonic()
+
+        with self._condition:
+            if discard:
+                self._created -= 1
+            else:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+        if discard:
+            self._discard(pooled)
+            self._count('discarded')
+
+    @contextmanager
+    def connection(self):
+        """
+        Fornece uma conexão do pool durante o bloco `with`.
+
+        Chamadas aninhadas na mesma thread reutilizam a mesma conexão.
+
+        Yields:
+            sqlite3.Connection: Conexão reservada para a thread atual
+        """
+        current = getattr(self._local, 'current', None)
+        if current is not None:
+            yield current.conn
+            return
+
+        pooled = self._acquire()
+        self._local.current = pooled
+        discard = False
+        try:
+            yield pooled.conn
+        except sqlite3.ProgrammingError:
+            # Conexão fechada ou inutilizável: não deve voltar ao pool
+            discard = True
+            raise
+        finally:
+            self._local.current = None
+            self._release(pooled, discard)
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas do pool."""
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+            self._created -= len(idle)
+            self._condition.notify_all()
+
+        for pooled in idle:
+            self._discard(pooled)
+
+    def get_stats(self):
+        """
+        Retorna estatísticas de uso do pool.
+
+        Returns:
+            dict: Contadores de uso e ocupação atual
+        """
+        with self._condition:
+            stats = dict(self.stats)
+            stats['open'] = self._created
+            stats['idle'] = len(self._idle)
+            stats['size'] = self.size
+        return stats
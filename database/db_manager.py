@@ -1,200 +1,397 @@
 """
 Gerenciador de banco de dados para o NutriBot Evolve.
-Responsável por criar e gerenciar a conexão com o banco de dados SQLite.
+Responsável por criar e gerenciar as conexões com o banco de dados SQLite.
 """
 
 import sqlite3
 import os
 import sys
+import json
 import datetime
+import threading
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar config
 sys.path.append(str(Path(__file__).parent.parent))
 import config
+from database.connection_pool import ConnectionPool
+from database.write_queue import WriteQueue
+from database.migrations import apply_migrations
+
+# PRAGMAs que podem ser definidos em um perfil de armazenamento
+STORAGE_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout', 'temp_store')
+
+# Versão mínima da biblioteca SQLite: as gravações usam INSERT/UPDATE ... RETURNING (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def check_sqlite_version(version_info=None):
+    """
+    Verifica se a biblioteca SQLite usada pelo Python suporta as instruções do gerenciador.
+    
+    Args:
+        version_info (tuple, optional): Versão a verificar (padrão: sqlite3.sqlite_version_info)
+        
+    Raises:
+        RuntimeError: Se a versão do SQLite for anterior a MIN_SQLITE_VERSION
+    """
+    version_info = version_info or sqlite3.sqlite_version_info
+    if version_info < MIN_SQLITE_VERSION:
+        version = '.'.join(str(part) for part in version_info)
+        required = '.'.join(str(part) for part in MIN_SQLITE_VERSION)
+        raise RuntimeError(
+            f"SQLite {version} não suportado: o NutriBot Evolve requer SQLite {required} "
+            f"ou superior (cláusula RETURNING)"
+        )
 
 class DatabaseManager:
     """Classe para gerenciar conexões e operações do banco de dados."""
     
-    def __init__(self):
-        """Inicializa o gerenciador de banco de dados."""
+    def __init__(self, db_path=None):
+        """
+        Inicializa o gerenciador de banco de dados.
+        
+        Args:
+            db_path (str, optional): Caminho para o banco de dados (padrão: config.DATABASE_PATH)
+        """
+        self._open(db_path)
+    
+    def _open(self, db_path=None):
+        """
+        Cria o pool de conexões e a fila de escrita e inicializa o banco de dados.
+        
+        Args:
+            db_path (str, optional): Caminho para o banco de dados (padrão: config.DATABASE_PATH)
+            
+        Raises:
+            RuntimeError: Se a versão do SQLite não suportar as instruções usadas
+        """
+        check_sqlite_version()
+        
         # Obtém o caminho absoluto para o banco de dados
-        self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), config.DATABASE_PATH)
-        self.conn = None
-        self.cursor = None
+        self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), db_path or config.DATABASE_PATH)
+        
+        # Conexão e cursor abertos via connect() pertencem apenas à thread que os abriu
+        self._local = threading.local()
         
         # Garante que o diretório do banco de dados existe
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
+        # Pool de conexões reutilizadas pelas operações de consulta e escrita
+        self.pool = ConnectionPool(
+            self.db_path,
+            size=config.DB_POOL_SIZE,
+            timeout=config.DB_POOL_TIMEOUT,
+            recycle=config.DB_POOL_RECYCLE,
+            health_check_interval=config.DB_POOL_HEALTH_CHECK_INTERVAL,
+            on_connect=self._apply_storage_profile
+        )
+        
+        # Fila que serializa as escritas em uma única thread com commit em grupo
+        self.write_queue = None
+        if config.DB_WRITE_QUEUE_ENABLED:
+            self.write_queue = WriteQueue(
+                self._create_writer_connection,
+                batch_size=config.DB_WRITE_BATCH_SIZE,
+                batch_delay=config.DB_WRITE_BATCH_DELAY,
+                timeout=config.DB_WRITE_TIMEOUT
+            )
+        
         # Inicializa o banco de dados
         self.initialize_database()
     
+    def _apply_storage_profile(self, conn):
+        """
+        Aplica os PRAGMAs do perfil de armazenamento configurado a uma conexão.
+        
+        Args:
+            conn (sqlite3.Connection): Conexão recém-aberta
+        """
+        profile = config.STORAGE_PROFILES.get(config.STORAGE_PROFILE, {})
+        for pragma, value in profile.items():
+            if pragma not in STORAGE_PRAGMAS:
+                raise ValueError(f"PRAGMA não suportado no perfil de armazenamento: {pragma}")
+            conn.execute(f"PRAGMA {pragma} = {value}")
+    
+    def _create_writer_connection(self):
+        """
+        Abre a conexão dedicada à thread escritora.
+        
+        Returns:
+            sqlite3.Connection: Conexão com o banco de dados
+        """
+        conn = sqlite3.connect(self.db_path, timeout=config.DB_POOL_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._apply_storage_profile(conn)
+        return conn
+    
+    def execute_write(self, operation):
+        """
+        Executa uma operação de escrita em uma transação.
+        
+        Com a fila de escrita habilitada, a operação é executada pela thread
+        escritora junto com as demais escritas pendentes (commit em grupo).
+        
+        Args:
+            operation (callable): Função que recebe a conexão e executa a escrita,
+                sem chamar commit() ou rollback()
+            
+        Returns:
+            O valor retornado pela operação
+            
+        Raises:
+            sqlite3.Error: Se a escrita falhar
+        """
+        if self.write_queue is not None:
+            return self.write_queue.submit(operation)
+        
+        with self.pool.connection() as conn:
+            try:
+                result = operation(conn)
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+    
+    @property
+    def conn(self):
+        """Conexão aberta por connect() na thread atual, ou None."""
+        return getattr(self._local, 'conn', None)
+    
+    @property
+    def cursor(self):
+        """Cursor aberto por connect() na thread atual, ou None."""
+        return getattr(self._local, 'cursor', None)
+    
     def connect(self):
-        """Estabelece conexão com o banco de dados."""
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row  # Para acessar colunas pelo nome
-        self.cursor = self.conn.cursor()
-        return self.conn
+        """
+        Reserva uma conexão do pool para a thread atual até a chamada de close().
+        
+        Enquanto a conexão estiver reservada, as demais operações do gerenciador
+        feitas pela mesma thread a reutilizam.
+        
+        Returns:
+            sqlite3.Connection: Conexão com o banco de dados
+        """
+        if self.conn is not None:
+            return self.conn
+        
+        context = self.pool.connection()
+        conn = context.__enter__()
+        self._local.context = context
+        self._local.conn = conn
+        self._local.cursor = conn.cursor()
+        return conn
     
     def close(self):
-        """Fecha a conexão com o banco de dados."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        """Devolve ao pool a conexão reservada por connect() na thread atual."""
+        context = getattr(self._local, 'context', None)
+        if context is None:
+            return
+        
+        self._local.cursor.close()
+        self._local.context = None
+        self._local.conn = None
+        self._local.cursor = None
+        context.__exit__(None, None, None)
+    
+    def connection(self):
+        """
+        Fornece uma conexão do pool para uso em um bloco `with`.
+        
+        Returns:
+            contextmanager: Gerenciador de contexto que entrega uma sqlite3.Connection
+        """
+        return self.pool.connection()
+    
+    def close_pool(self):
+        """Encerra a fila de escrita e fecha as conexões ociosas mantidas pelo pool."""
+        if self.write_queue is not None:
+            self.write_queue.stop()
+        self.pool.close_all()
+    
+    def reopen(self, db_path=None):
+        """
+        Fecha as conexões atuais e passa a usar outro arquivo de banco de dados.
+        
+        Usado pelos testes para trocar o banco da instância global, já criada
+        na importação dos módulos, por um banco temporário.
+        
+        Args:
+            db_path (str, optional): Caminho para o banco de dados (padrão: config.DATABASE_PATH)
+        """
+        self.close_pool()
+        self._open(db_path)
     
     def initialize_database(self):
-        """Cria as tabelas do banco de dados se não existirem."""
+        """Cria as tabelas do banco de dados se não existirem e aplica as migrações pendentes."""
         try:
-            conn = self.connect()
+            with self.pool.connection() as conn:
+                # Tabela de usuários
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER UNIQUE,
+                    username TEXT,
+                    full_name TEXT,
+                    age INTEGER,
+                    weight REAL,
+                    height REAL,
+                    gender TEXT,
+                    activity_level TEXT,
+                    goal TEXT,
+                    diet_type TEXT,
+                    daily_calories REAL,
+                    is_premium BOOLEAN DEFAULT 0,
+                    onboarding_complete BOOLEAN DEFAULT 0,
+                    created_at TIMESTAMP,
+                    updated_at TIMESTAMP
+                )
+                ''')
             
-            # Tabela de usuários
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER UNIQUE,
-                username TEXT,
-                full_name TEXT,
-                age INTEGER,
-                weight REAL,
-                height REAL,
-                gender TEXT,
-                activity_level TEXT,
-                goal TEXT,
-                diet_type TEXT,
-                daily_calories REAL,
-                is_premium BOOLEAN DEFAULT 0,
-                onboarding_complete BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP,
-                updated_at TIMESTAMP
-            )
-            ''')
+                # Tabela de refeições
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS meals (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    meal_type TEXT,
+                    description TEXT,
+                    calories REAL,
+                    protein REAL,
+                    carbs REAL,
+                    fat REAL,
+                    meal_date DATE,
+                    created_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+                ''')
             
-            # Tabela de refeições
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS meals (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER,
-                meal_type TEXT,
-                description TEXT,
-                calories REAL,
-                protein REAL,
-                carbs REAL,
-                fat REAL,
-                meal_date DATE,
-                created_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            ''')
+                # Tabela de fotos
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS photos (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    photo_path TEXT,
+                    description TEXT,
+                    photo_date DATE,
+                    created_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+                ''')
             
-            # Tabela de fotos
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS photos (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER,
-                photo_path TEXT,
-                description TEXT,
-                photo_date DATE,
-                created_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            ''')
+                # Tabela de lembretes
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS reminders (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    reminder_type TEXT,
+                    reminder_time TIME,
+                    is_active BOOLEAN DEFAULT 1,
+                    created_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+                ''')
             
-            # Tabela de lembretes
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER,
-                reminder_type TEXT,
-                reminder_time TIME,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            ''')
+                # Tabela de relatórios
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    report_type TEXT,
+                    start_date DATE,
+                    end_date DATE,
+                    report_data TEXT,
+                    created_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+                ''')
             
-            # Tabela de relatórios
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS reports (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER,
-                report_type TEXT,
-                start_date DATE,
-                end_date DATE,
-                report_data TEXT,
-                created_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            ''')
+                # Tabela de estados de conversação (para gerenciar o fluxo de onboarding)
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS conversation_states (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER UNIQUE,
+                    state TEXT,
+                    context TEXT,
+                    updated_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+                ''')
             
-            # Tabela de estados de conversação (para gerenciar o fluxo de onboarding)
-            conn.execute('''
-            CREATE TABLE IF NOT EXISTS conversation_states (
-                id INTEGER PRIMARY KEY,
-                user_id INTEGER UNIQUE,
-                state TEXT,
-                context TEXT,
-                updated_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            ''')
+                conn.commit()
+                
+                # Aplica as migrações de esquema pendentes (índices, novas tabelas e colunas)
+                apply_migrations(conn)
             
-            conn.commit()
             print("Banco de dados inicializado com sucesso.")
             
         except sqlite3.Error as e:
             print(f"Erro ao inicializar o banco de dados: {e}")
-        finally:
-            self.close()
     
     def execute_query(self, query, params=None):
-        """Executa uma consulta SQL e retorna os resultados."""
-        try:
-            conn = self.connect()
+        """
+        Executa uma consulta SQL de escrita e retorna os resultados.
+        
+        As linhas são lidas dentro da transação, para que nenhum cursor seja
+        usado depois de a conexão passar para outra thread.
+        
+        Returns:
+            list: Linhas retornadas pela consulta ou None em caso de erro
+        """
+        def operation(conn):
             if params:
-                result = self.cursor.execute(query, params)
+                cursor = conn.execute(query, params)
             else:
-                result = self.cursor.execute(query)
-            
-            conn.commit()
-            return result
+                cursor = conn.execute(query)
+            return cursor.fetchall()
+        
+        try:
+            return self.execute_write(operation)
         except sqlite3.Error as e:
             print(f"Erro ao executar consulta: {e}")
             return None
-        finally:
-            self.close()
     
-    def fetch_one(self, query, params=None):
-        """Executa uma consulta e retorna um único resultado."""
-        try:
-            self.connect()
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
+    def fetch_one(self, query, params=None, raise_errors=False):
+        """
+        Executa uma consulta e retorna um único resultado.
+        
+        Args:
+            query (str): Consulta SQL
+            params (tuple, optional): Parâmetros da consulta
+            raise_errors (bool): Se True, propaga os erros do SQLite em vez de retornar None,
+                para distinguir um erro de uma consulta sem resultado
             
-            return self.cursor.fetchone()
+        Returns:
+            sqlite3.Row: Primeira linha, ou None se não houver resultado ou em caso de erro
+        """
+        try:
+            with self.pool.connection() as conn:
+                if params:
+                    cursor = conn.execute(query, params)
+                else:
+                    cursor = conn.execute(query)
+                
+                return cursor.fetchone()
         except sqlite3.Error as e:
+            if raise_errors:
+                raise
             print(f"Erro ao buscar resultado: {e}")
             return None
-        finally:
-            self.close()
     
     def fetch_all(self, query, params=None):
         """Executa uma consulta e retorna todos os resultados."""
         try:
-            self.connect()
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            
-            return self.cursor.fetchall()
+            with self.pool.connection() as conn:
+                if params:
+                    cursor = conn.execute(query, params)
+                else:
+                    cursor = conn.execute(query)
+                
+                return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Erro ao buscar resultados: {e}")
             return []
-        finally:
-            self.close()
     
     def insert(self, table, data):
         """Insere dados em uma tabela e retorna o ID do registro inserido."""
@@ -205,15 +402,10 @@ class DatabaseManager:
         query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
         
         try:
-            conn = self.connect()
-            self.cursor.execute(query, values)
-            conn.commit()
-            return self.cursor.lastrowid
+            return self.execute_write(lambda conn: conn.execute(query, values).lastrowid)
         except sqlite3.Error as e:
             print(f"Erro ao inserir dados: {e}")
             return None
-        finally:
-            self.close()
     
     def update(self, table, data, condition):
         """Atualiza registros em uma tabela."""
@@ -224,15 +416,91 @@ class DatabaseManager:
         values = tuple(list(data.values()) + list(condition.values()))
         
         try:
-            conn = self.connect()
-            self.cursor.execute(query, values)
-            conn.commit()
-            return self.cursor.rowcount
+            return self.execute_write(lambda conn: conn.execute(query, values).rowcount)
         except sqlite3.Error as e:
             print(f"Erro ao atualizar dados: {e}")
             return 0
-        finally:
-            self.close()
+    
+    def upsert(self, table, data, conflict_columns, json_merge_columns=()):
+        """
+        Insere ou atualiza um registro em uma única instrução atômica.
+        
+        Usa INSERT ... ON CONFLICT DO UPDATE, sem consultar antes se o registro existe.
+        As colunas em json_merge_columns recebem um dicionário que é mesclado ao JSON
+        já armazenado com json_patch (chaves com valor None são removidas).
+        
+        Args:
+            table (str): Nome da tabela
+            data (dict): Valores das colunas
+            conflict_columns (list): Colunas da restrição UNIQUE usada para detectar o conflito
+            json_merge_columns (tuple, optional): Colunas JSON mescladas em vez de substituídas
+            
+        Returns:
+            sqlite3.Row: Registro resultante ou None em caso de erro
+        """
+        columns = ', '.join(data.keys())
+        placeholders = ', '.join(["json_patch('{}', ?)" if key in json_merge_columns else '?' for key in data])
+        values = tuple(json.dumps(value or {}) if key in json_merge_columns else value for key, value in data.items())
+        
+        update_columns = [key for key in data if key not in conflict_columns]
+        set_clause = ', '.join([
+            f"{key} = json_patch(COALESCE({table}.{key}, '{{}}'), ?)" if key in json_merge_columns
+            else f"{key} = excluded.{key}"
+            for key in update_columns
+        ])
+        # O patch é repassado sem passar pelo INSERT: em excluded.{coluna} as chaves
+        # com valor None já teriam sido descartadas e não seriam removidas do JSON
+        values += tuple(json.dumps(data[key] or {}) for key in update_columns if key in json_merge_columns)
+        conflict_action = f"DO UPDATE SET {set_clause}" if update_columns else "DO NOTHING"
+        
+        query = (f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+                 f"ON CONFLICT({', '.join(conflict_columns)}) {conflict_action} RETURNING *")
+        
+        def operation(conn):
+            # RETURNING precisa ser lido até o fim para concluir a instrução
+            rows = conn.execute(query, values).fetchall()
+            return rows[0] if rows else None
+        
+        try:
+            return self.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao inserir ou atualizar dados: {e}")
+            return None
+    
+    def merge_json(self, table, json_column, patch, condition, data=None):
+        """
+        Mescla um dicionário ao JSON armazenado em uma coluna, em uma única instrução.
+        
+        A mesclagem é feita pelo SQLite com json_patch, sem ler o valor antes
+        (chaves com valor None são removidas).
+        
+        Args:
+            table (str): Nome da tabela
+            json_column (str): Coluna com o objeto JSON
+            patch (dict): Dados a mesclar
+            condition (dict): Condição que identifica o registro
+            data (dict, optional): Outras colunas atualizadas na mesma instrução
+            
+        Returns:
+            sqlite3.Row: Registro atualizado ou None se não existir ou em caso de erro
+        """
+        data = data or {}
+        set_clause = ', '.join([f"{json_column} = json_patch(COALESCE({json_column}, '{{}}'), ?)"] +
+                               [f"{key} = ?" for key in data.keys()])
+        where_clause = ' AND '.join([f"{key} = ?" for key in condition.keys()])
+        
+        query = f"UPDATE {table} SET {set_clause} WHERE {where_clause} RETURNING *"
+        values = (json.dumps(patch),) + tuple(data.values()) + tuple(condition.values())
+        
+        def operation(conn):
+            rows = conn.execute(query, values).fetchall()
+            return rows[0] if rows else None
+        
+        try:
+            return self.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao mesclar dados JSON: {e}")
+            return None
     
     def delete(self, table, condition):
         """Remove registros de uma tabela."""
@@ -242,15 +510,10 @@ class DatabaseManager:
         query = f"DELETE FROM {table} WHERE {where_clause}"
         
         try:
-            conn = self.connect()
-            self.cursor.execute(query, values)
-            conn.commit()
-            return self.cursor.rowcount
+            return self.execute_write(lambda conn: conn.execute(query, values).rowcount)
         except sqlite3.Error as e:
             print(f"Erro ao remover dados: {e}")
             return 0
-        finally:
-            self.close()
 
 
 # Instância global do gerenciador de banco de dados
@@ -4,6 +4,7 @@ Responsável por operações de banco de dados relacionadas a refeições.
 """
 
 import sys
+import sqlite3
 import datetime
 from pathlib import Path
 
@@ -14,6 +15,58 @@ from database.db_manager import db_manager
 class MealRepository:
     """Classe para gerenciar operações de banco de dados relacionadas a refeições."""
     
+    # Campos nutricionais acumulados na tabela daily_totals
+    NUTRIENT_FIELDS = ('calories', 'protein', 'carbs', 'fat')
+    
+    @staticmethod
+    def _apply_daily_delta(conn, user_id, date, nutrients, meal_count):
+        """
+        Soma (ou subtrai) valores nutricionais aos totais de um dia.
+        
+        Deve ser chamado dentro da mesma transação que altera a tabela meals, depois
+        da alteração. Se o dia ainda não tem totais, eles são calculados a partir das
+        refeições, e não do delta, que sozinho deixaria totais negativos ao subtrair.
+        
+        Args:
+            conn (sqlite3.Connection): Conexão da transação em andamento
+            user_id (int): ID do usuário no Telegram
+            date: Data da refeição
+            nutrients (dict): Valores de calories, protein, carbs e fat (negativos para subtrair)
+            meal_count (int): Variação no número de refeições (1, -1 ou 0)
+            
+        Returns:
+            bool: True se os totais do dia foram reconstruídos a partir das refeições
+        """
+        params = {field: nutrients.get(field) or 0 for field in MealRepository.NUTRIENT_FIELDS}
+        params.update(user_id=user_id, date=date, meal_count=meal_count, updated_at=datetime.datetime.now())
+        
+        # Quando o dia fica sem refeições, zera os totais para não acumular erro de arredondamento
+        rowcount = conn.execute("""
+        UPDATE daily_totals SET
+            calories = CASE WHEN meal_count + :meal_count <= 0 THEN 0 ELSE calories + :calories END,
+            protein = CASE WHEN meal_count + :meal_count <= 0 THEN 0 ELSE protein + :protein END,
+            carbs = CASE WHEN meal_count + :meal_count <= 0 THEN 0 ELSE carbs + :carbs END,
+            fat = CASE WHEN meal_count + :meal_count <= 0 THEN 0 ELSE fat + :fat END,
+            meal_count = MAX(meal_count + :meal_count, 0),
+            updated_at = :updated_at
+        WHERE user_id = :user_id AND date = :date
+        """, params).rowcount
+        
+        if rowcount == 0:
+            # Dia sem totais: reconstrói a partir das refeições (nenhuma linha se o dia ficou vazio)
+            conn.execute("""
+            INSERT INTO daily_totals (user_id, date, calories, protein, carbs, fat, meal_count, updated_at)
+            SELECT user_id, meal_date,
+                   COALESCE(SUM(calories), 0), COALESCE(SUM(protein), 0),
+                   COALESCE(SUM(carbs), 0), COALESCE(SUM(fat), 0),
+                   COUNT(*), :updated_at
+            FROM meals
+            WHERE user_id = :user_id AND meal_date = :date
+            GROUP BY user_id, meal_date
+            """, params)
+        
+        return rowcount == 0
+    
     @staticmethod
     def add_meal(user_id, meal_type, description, calories, protein, carbs, fat, meal_date=None):
         """
@@ -48,7 +101,20 @@ class MealRepository:
             'created_at': now
         }
         
-        return db_manager.insert('meals', data)
+        columns = ', '.join(data.keys())
+        placeholders = ', '.join(['?' for _ in data])
+        query = f"INSERT INTO meals ({columns}) VALUES ({placeholders})"
+        
+        def operation(conn):
+            meal_id = conn.execute(query, tuple(data.values())).lastrowid
+            MealRepository._apply_daily_delta(conn, user_id, meal_date, data, 1)
+            return meal_id
+        
+        try:
+            return db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao adicionar refeição: {e}")
+            return None
     
     @staticmethod
     def get_meals_by_user_and_date(user_id, date=None):
@@ -103,24 +169,21 @@ class MealRepository:
         if date is None:
             date = datetime.datetime.now().date()
         
+        # Leitura por chave primária na tabela de totais materializados
         query = """
-        SELECT 
-            SUM(calories) as total_calories,
-            SUM(protein) as total_protein,
-            SUM(carbs) as total_carbs,
-            SUM(fat) as total_fat
-        FROM meals 
-        WHERE user_id = ? AND meal_date = ?
+        SELECT calories, protein, carbs, fat
+        FROM daily_totals
+        WHERE user_id = ? AND date = ?
         """
         
         result = db_manager.fetch_one(query, (user_id, date))
         
         if result:
             return {
-                'calories': result['total_calories'] or 0,
-                'protein': result['total_protein'] or 0,
-                'carbs': result['total_carbs'] or 0,
-                'fat': result['total_fat'] or 0
+                'calories': result['calories'] or 0,
+                'protein': result['protein'] or 0,
+                'carbs': result['carbs'] or 0,
+                'fat': result['fat'] or 0
             }
         else:
             return {
@@ -130,6 +193,29 @@ class MealRepository:
                 'fat': 0
             }
     
+    @staticmethod
+    def get_daily_totals_by_date_range(user_id, start_date, end_date):
+        """
+        Busca os totais diários de um usuário em um intervalo de datas.
+        
+        Args:
+            user_id (int): ID do usuário no Telegram
+            start_date (datetime.date): Data inicial
+            end_date (datetime.date): Data final
+            
+        Returns:
+            dict: Totais indexados pela data no formato 'YYYY-MM-DD' (apenas dias com refeições)
+        """
+        query = """
+        SELECT date, calories, protein, carbs, fat, meal_count
+        FROM daily_totals
+        WHERE user_id = ? AND date BETWEEN ? AND ?
+        ORDER BY date
+        """
+        rows = db_manager.fetch_all(query, (user_id, start_date, end_date))
+        
+        return {str(row['date']): dict(row) for row in rows if row['meal_count'] > 0}
+    
     @staticmethod
     def update_meal(meal_id, data):
         """
@@ -142,8 +228,32 @@ class MealRepository:
         Returns:
             int: Número de registros atualizados
         """
-        condition = {'id': meal_id}
-        return db_manager.update('meals', data, condition)
+        set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
+        query = f"UPDATE meals SET {set_clause} WHERE id = ?"
+        values = tuple(data.values()) + (meal_id,)
+        
+        def operation(conn):
+            old_meal = conn.execute("SELECT * FROM meals WHERE id = ?", (meal_id,)).fetchone()
+            rowcount = conn.execute(query, values).rowcount
+            
+            if old_meal and rowcount:
+                # Remove os valores antigos e soma os novos (a data pode ter mudado)
+                new_meal = conn.execute("SELECT * FROM meals WHERE id = ?", (meal_id,)).fetchone()
+                old_values = {field: -(old_meal[field] or 0) for field in MealRepository.NUTRIENT_FIELDS}
+                rebuilt = MealRepository._apply_daily_delta(conn, old_meal['user_id'], old_meal['meal_date'], old_values, -1)
+                
+                # Um dia reconstruído já inclui os valores novos da refeição
+                same_day = (old_meal['user_id'], old_meal['meal_date']) == (new_meal['user_id'], new_meal['meal_date'])
+                if not (rebuilt and same_day):
+                    MealRepository._apply_daily_delta(conn, new_meal['user_id'], new_meal['meal_date'], dict(new_meal), 1)
+            
+            return rowcount
+        
+        try:
+            return db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao atualizar refeição: {e}")
+            return 0
     
     @staticmethod
     def delete_meal(meal_id):
@@ -156,8 +266,21 @@ class MealRepository:
         Returns:
             int: Número de registros removidos
         """
-        condition = {'id': meal_id}
-        return db_manager.delete('meals', condition)
+        def operation(conn):
+            old_meal = conn.execute("SELECT * FROM meals WHERE id = ?", (meal_id,)).fetchone()
+            rowcount = conn.execute("DELETE FROM meals WHERE id = ?", (meal_id,)).rowcount
+            
+            if old_meal and rowcount:
+                old_values = {field: -(old_meal[field] or 0) for field in MealRepository.NUTRIENT_FIELDS}
+                MealRepository._apply_daily_delta(conn, old_meal['user_id'], old_meal['meal_date'], old_values, -1)
+            
+            return rowcount
+        
+        try:
+            return db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao remover refeição: {e}")
+            return 0
     
     @staticmethod
     def get_meal_types_for_user(user_id, date=None):
@@ -182,3 +305,108 @@ class MealRepository:
         
         results = db_manager.fetch_all(query, (user_id, date))
         return [result['meal_type'] for result in results]
+    
+    @staticmethod
+    def _aggregate_meals(user_id=None):
+        """
+        Calcula os totais diários diretamente a partir da tabela meals.
+        
+        Args:
+            user_id (int, optional): Restringe o cálculo a um usuário
+            
+        Returns:
+            dict: Totais indexados por (user_id, data)
+        """
+        query = """
+        SELECT user_id, meal_date,
+               COALESCE(SUM(calories), 0) as calories, COALESCE(SUM(protein), 0) as protein,
+               COALESCE(SUM(carbs), 0) as carbs, COALESCE(SUM(fat), 0) as fat,
+               COUNT(*) as meal_count
+        FROM meals
+        """
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        query += " GROUP BY user_id, meal_date"
+        
+        return {(row['user_id'], str(row['meal_date'])): dict(row) for row in db_manager.fetch_all(query, params)}
+    
+    @staticmethod
+    def verify_daily_totals(user_id=None, tolerance=0.01):
+        """
+        Compara a tabela daily_totals com os totais recalculados a partir das refeições.
+        
+        Args:
+            user_id (int, optional): Restringe a verificação a um usuário
+            tolerance (float): Diferença máxima aceita em cada campo nutricional
+            
+        Returns:
+            list: Divergências encontradas (user_id, data, valores esperados e armazenados)
+        """
+        expected = MealRepository._aggregate_meals(user_id)
+        
+        query = "SELECT * FROM daily_totals"
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        stored = {(row['user_id'], str(row['date'])): dict(row) for row in db_manager.fetch_all(query, params)}
+        
+        empty_day = {field: 0 for field in MealRepository.NUTRIENT_FIELDS + ('meal_count',)}
+        divergences = []
+        
+        for key in sorted(set(expected) | set(stored), key=str):
+            expected_day = expected.get(key, empty_day)
+            stored_day = stored.get(key, empty_day)
+            
+            matches = expected_day['meal_count'] == stored_day['meal_count'] and all(
+                abs((expected_day[field] or 0) - (stored_day[field] or 0)) <= tolerance
+                for field in MealRepository.NUTRIENT_FIELDS
+            )
+            
+            if not matches:
+                divergences.append({
+                    'user_id': key[0],
+                    'date': key[1],
+                    'expected': {field: expected_day[field] for field in empty_day},
+                    'stored': {field: stored_day[field] for field in empty_day}
+                })
+        
+        return divergences
+    
+    @staticmethod
+    def rebuild_daily_totals(user_id=None):
+        """
+        Reconstrói a tabela daily_totals a partir das refeições, corrigindo divergências.
+        
+        Os instantâneos de relatórios afetados são descartados na mesma transação.
+        
+        Args:
+            user_id (int, optional): Restringe a reconstrução a um usuário
+            
+        Returns:
+            int: Número de dias gravados ou None em caso de erro
+        """
+        where_clause = " WHERE user_id = ?" if user_id is not None else ""
+        params = (user_id,) if user_id is not None else ()
+        
+        def operation(conn):
+            conn.execute(f"DELETE FROM daily_totals{where_clause}", params)
+            # Os instantâneos de relatórios foram montados sobre os totais antigos
+            conn.execute(f"DELETE FROM reports{where_clause}", params)
+            return conn.execute(f"""
+            INSERT INTO daily_totals (user_id, date, calories, protein, carbs, fat, meal_count, updated_at)
+            SELECT user_id, meal_date,
+                   COALESCE(SUM(calories), 0), COALESCE(SUM(protein), 0),
+                   COALESCE(SUM(carbs), 0), COALESCE(SUM(fat), 0),
+                   COUNT(*), ?
+            FROM meals{where_clause}
+            GROUP BY user_id, meal_date
+            """, (datetime.datetime.now(),) + params).rowcount
+        
+        try:
+            return db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao reconstruir totais diários: {e}")
+            return None
@@ -0,0 +1,219 @@
+"""
+Migrações de esquema do banco de dados para o NutriBot Evolve.
+Cada migração tem um número de versão; a versão aplicada fica registrada em
+PRAGMA user_version e as migrações pendentes são executadas na inicialização.
+"""
+
+import datetime
+
+def _migration_001_composite_indexes(conn):
+    """
+    Cria índices compostos para as consultas mais frequentes.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    # Refeições de um dia ou intervalo, ordenadas (get_meals_by_user_and_date*)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_meals_user_date_created
+    ON meals(user_id, meal_date, created_at)
+    """)
+
+    # Totais diários lidos apenas do índice, sem acessar a tabela (reconstrução de daily_totals)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_meals_user_date_totals
+    ON meals(user_id, meal_date, calories, protein, carbs, fat)
+    """)
+
+    # Fotos de um usuário, das mais recentes para as mais antigas (get_photos_by_user)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_photos_user_date_created
+    ON photos(user_id, photo_date DESC, created_at DESC)
+    """)
+
+    # Índices de coluna única criados pelo optimize.py, cobertos pelos índices acima
+    # (users.user_id já é indexado pela restrição UNIQUE)
+    conn.execute("DROP INDEX IF EXISTS idx_users_user_id")
+    conn.execute("DROP INDEX IF EXISTS idx_meals_user_id")
+    conn.execute("DROP INDEX IF EXISTS idx_meals_meal_date")
+    conn.execute("DROP INDEX IF EXISTS idx_photos_user_id")
+
+
+def _migration_002_daily_totals(conn):
+    """
+    Cria a tabela de totais diários e a preenche a partir das refeições existentes.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    # Totais mantidos incrementalmente pelo MealRepository na mesma transação das refeições
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS daily_totals (
+        user_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        calories REAL NOT NULL DEFAULT 0,
+        protein REAL NOT NULL DEFAULT 0,
+        carbs REAL NOT NULL DEFAULT 0,
+        fat REAL NOT NULL DEFAULT 0,
+        meal_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP,
+        PRIMARY KEY (user_id, date)
+    ) WITHOUT ROWID
+    """)
+
+    conn.execute("""
+    INSERT OR REPLACE INTO daily_totals (user_id, date, calories, protein, carbs, fat, meal_count, updated_at)
+    SELECT user_id, meal_date,
+           COALESCE(SUM(calories), 0), COALESCE(SUM(protein), 0),
+           COALESCE(SUM(carbs), 0), COALESCE(SUM(fat), 0),
+           COUNT(*), ?
+    FROM meals
+    GROUP BY user_id, meal_date
+    """, (datetime.datetime.now(),))
+
+def _migration_003_report_snapshots(conn):
+    """
+    Mantém um único instantâneo por usuário e tipo de relatório na tabela reports.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    # Preserva apenas o registro mais recente de cada usuário e tipo
+    conn.execute("""
+    DELETE FROM reports
+    WHERE id NOT IN (SELECT MAX(id) FROM reports GROUP BY user_id, report_type)
+    """)
+
+    # Restrição usada pelo upsert do ReportRepository (save_snapshot)
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_user_type
+    ON reports(user_id, report_type)
+    """)
+
+def _migration_004_reminder_index(conn):
+    """
+    Garante um único lembrete de cada tipo por usuário.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    # Preserva apenas o lembrete mais recente de cada usuário e tipo
+    conn.execute("""
+    DELETE FROM reminders
+    WHERE id NOT IN (SELECT MAX(id) FROM reminders GROUP BY user_id, reminder_type)
+    """)
+
+    # Lembretes de um usuário (get_reminders_by_user) e restrição usada pelo upsert
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_user_type
+    ON reminders(user_id, reminder_type)
+    """)
+
+
+def _migration_005_photo_derivatives(conn):
+    """
+    Adiciona à tabela photos os caminhos das versões reduzidas de cada foto.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(photos)")}
+
+    # Miniatura (listagens) e versão no tamanho das comparações, geradas no envio
+    if 'thumbnail_path' not in columns:
+        conn.execute("ALTER TABLE photos ADD COLUMN thumbnail_path TEXT")
+    if 'comparison_path' not in columns:
+        conn.execute("ALTER TABLE photos ADD COLUMN comparison_path TEXT")
+
+
+def _migration_006_photo_analyses(conn):
+    """
+    Cria a tabela com o resultado da análise de cada foto.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+    """
+    # Uma análise por foto; analyzer_version indica as que precisam ser refeitas
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS photo_analyses (
+        photo_id INTEGER PRIMARY KEY,
+        analyzer_version INTEGER NOT NULL,
+        content_hash TEXT,
+        width INTEGER,
+        height INTEGER,
+        brightness REAL,
+        quality_level TEXT,
+        lighting_level TEXT,
+        framing_level TEXT,
+        analysis_data TEXT,
+        analyzed_at TIMESTAMP,
+        FOREIGN KEY (photo_id) REFERENCES photos(id)
+    )
+    """)
+
+
+# Lista ordenada de migrações: (versão, descrição, função)
+MIGRATIONS = [
+    (1, "Índices compostos para refeições e fotos", _migration_001_composite_indexes),
+    (2, "Tabela de totais diários materializados", _migration_002_daily_totals),
+    (3, "Instantâneos de relatórios por usuário e tipo", _migration_003_report_snapshots),
+    (4, "Lembrete único por usuário e tipo", _migration_004_reminder_index),
+    (5, "Versões reduzidas das fotos", _migration_005_photo_derivatives),
+    (6, "Análises de fotos", _migration_006_photo_analyses),
+]
+
+def get_schema_version(conn):
+    """
+    Retorna a versão de esquema aplicada ao banco de dados.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+
+    Returns:
+        int: Versão atual do esquema
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def get_latest_version():
+    """
+    Retorna a versão de esquema mais recente conhecida.
+
+    Returns:
+        int: Número da última migração
+    """
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def apply_migrations(conn):
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco de dados
+
+    Returns:
+        list: Versões aplicadas nesta execução
+    """
+    applied = []
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Outro processo pode ter aplicado a migração enquanto aguardávamos o lock
+            if version <= get_schema_version(conn):
+                conn.execute("ROLLBACK")
+                continue
+
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(f"Migração {version} aplicada: {description}")
+        applied.append(version)
+
+    return applied
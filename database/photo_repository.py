@@ -4,6 +4,8 @@ Responsável por operações de banco de dados relacionadas a fotos corporais.
 """
 
 import sys
+import json
+import sqlite3
 import datetime
 import os
 from pathlib import Path
@@ -58,6 +60,31 @@ class PhotoRepository:
         query = "SELECT * FROM photos WHERE user_id = ? ORDER BY photo_date DESC, created_at DESC LIMIT ?"
         return db_manager.fetch_all(query, (user_id, limit))
     
+    @staticmethod
+    def get_photos_with_analysis(user_id, analyzer_version, limit=10):
+        """
+        Busca fotos de um usuário com o resumo da análise salva, sem abrir as imagens.
+        
+        Análises de outras versões do analisador são ignoradas (colunas vazias).
+        
+        Args:
+            user_id (int): ID do usuário no Telegram
+            analyzer_version (int): Versão atual do analisador (PHOTO_ANALYZER_VERSION)
+            limit (int, optional): Limite de fotos a retornar
+            
+        Returns:
+            list: Lista de fotos com width, height, brightness, quality_level,
+                lighting_level e framing_level
+        """
+        query = """
+        SELECT p.*, a.width, a.height, a.brightness, a.quality_level, a.lighting_level, a.framing_level
+        FROM photos p
+        LEFT JOIN photo_analyses a ON a.photo_id = p.id AND a.analyzer_version = ?
+        WHERE p.user_id = ?
+        ORDER BY p.photo_date DESC, p.created_at DESC LIMIT ?
+        """
+        return db_manager.fetch_all(query, (analyzer_version, user_id, limit))
+    
     @staticmethod
     def get_latest_photo(user_id):
         """
@@ -101,6 +128,121 @@ class PhotoRepository:
         condition = {'id': photo_id}
         return db_manager.update('photos', data, condition)
     
+    @staticmethod
+    def set_derivatives(photo_id, thumbnail_path, comparison_path):
+        """
+        Registra as versões reduzidas de uma foto.
+        
+        Args:
+            photo_id (int): ID da foto
+            thumbnail_path (str): Caminho da miniatura
+            comparison_path (str): Caminho da versão de comparação
+            
+        Returns:
+            int: Número de registros atualizados
+        """
+        data = {
+            'thumbnail_path': thumbnail_path,
+            'comparison_path': comparison_path
+        }
+        return PhotoRepository.update_photo(photo_id, data)
+    
+    @staticmethod
+    def get_photos_without_derivatives(after_id=0, limit=200):
+        """
+        Retorna um lote de fotos sem versões reduzidas, em ordem crescente de ID.
+        
+        A paginação é feita pelo último ID do lote anterior (sem OFFSET).
+        
+        Args:
+            after_id (int, optional): Último ID do lote anterior
+            limit (int, optional): Tamanho máximo do lote
+            
+        Returns:
+            list: Lista de fotos (id, user_id, photo_path)
+        """
+        query = """
+        SELECT id, user_id, photo_path FROM photos
+        WHERE id > ? AND (thumbnail_path IS NULL OR comparison_path IS NULL)
+        ORDER BY id LIMIT ?
+        """
+        return db_manager.fetch_all(query, (after_id, limit))
+    
+    @staticmethod
+    def save_analysis(photo_id, analysis):
+        """
+        Grava (ou substitui) a análise de uma foto.
+        
+        Args:
+            photo_id (int): ID da foto
+            analysis (dict): Resultado de PhotoAnalyzer.analyze_photo
+            
+        Returns:
+            sqlite3.Row: Registro gravado ou None em caso de erro
+        """
+        data = {
+            'photo_id': photo_id,
+            'analyzer_version': analysis['analyzer_version'],
+            'content_hash': analysis.get('content_hash'),
+            'width': analysis['dimensions']['width'],
+            'height': analysis['dimensions']['height'],
+            'brightness': analysis['lighting'].get('brightness'),
+            'quality_level': analysis['quality']['level'],
+            'lighting_level': analysis['lighting']['level'],
+            'framing_level': analysis['framing']['level'],
+            # JSON compacto: sem indentação nem espaços entre os separadores
+            'analysis_data': json.dumps(analysis, ensure_ascii=False, separators=(',', ':')),
+            'analyzed_at': datetime.datetime.now()
+        }
+        
+        return db_manager.upsert('photo_analyses', data, conflict_columns=('photo_id',))
+    
+    @staticmethod
+    def get_analysis(photo_id, analyzer_version):
+        """
+        Busca a análise salva de uma foto.
+        
+        Args:
+            photo_id (int): ID da foto
+            analyzer_version (int): Versão atual do analisador (PHOTO_ANALYZER_VERSION)
+            
+        Returns:
+            dict: Análise completa ou None se não existir ou for de outra versão
+        """
+        query = "SELECT analysis_data FROM photo_analyses WHERE photo_id = ? AND analyzer_version = ?"
+        row = db_manager.fetch_one(query, (photo_id, analyzer_version))
+        if not row:
+            return None
+        
+        try:
+            return json.loads(row['analysis_data'])
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def get_photos_needing_analysis(analyzer_version, after_id=0, limit=200):
+        """
+        Retorna um lote de fotos sem análise ou analisadas por outra versão, em ordem crescente de ID.
+        
+        A paginação é feita pelo último ID do lote anterior (sem OFFSET).
+        
+        Args:
+            analyzer_version (int): Versão atual do analisador (PHOTO_ANALYZER_VERSION)
+            after_id (int, optional): Último ID do lote anterior
+            limit (int, optional): Tamanho máximo do lote
+            
+        Returns:
+            list: Lista de fotos (id, user_id, photo_path, content_hash)
+        """
+        query = """
+        SELECT p.id, p.user_id, p.photo_path, a.content_hash
+        FROM photos p
+        LEFT JOIN photo_analyses a ON a.photo_id = p.id
+        WHERE p.id > ? AND (a.photo_id IS NULL OR a.analyzer_version != ?)
+        ORDER BY p.id LIMIT ?
+        """
+        return db_manager.fetch_all(query, (after_id, analyzer_version, limit))
+    
     @staticmethod
     def delete_photo(photo_id):
         """
@@ -112,19 +254,30 @@ class PhotoRepository:
         Returns:
             int: Número de registros removidos
         """
-        # Primeiro, obtém o caminho do arquivo
+        # Primeiro, obtém os caminhos dos arquivos (original e versões reduzidas)
         photo = PhotoRepository.get_photo_by_id(photo_id)
-        if photo and photo['photo_path']:
-            # Tenta remover o arquivo físico
-            try:
-                if os.path.exists(photo['photo_path']):
-                    os.remove(photo['photo_path'])
-            except Exception as e:
-                print(f"Erro ao remover arquivo de foto: {e}")
-        
-        # Remove o registro do banco de dados
-        condition = {'id': photo_id}
-        return db_manager.delete('photos', condition)
+        if photo:
+            for column in ('photo_path', 'thumbnail_path', 'comparison_path'):
+                if not photo[column]:
+                    continue
+                
+                # Tenta remover o arquivo físico
+                try:
+                    if os.path.exists(photo[column]):
+                        os.remove(photo[column])
+                except Exception as e:
+                    print(f"Erro ao remover arquivo de foto: {e}")
+        
+        # Remove a análise e o registro do banco de dados na mesma transação
+        def operation(conn):
+            conn.execute("DELETE FROM photo_analyses WHERE photo_id = ?", (photo_id,))
+            return conn.execute("DELETE FROM photos WHERE id = ?", (photo_id,)).rowcount
+        
+        try:
+            return db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao remover foto: {e}")
+            return 0
     
     @staticmethod
     def get_photo_count_by_user(user_id):
@@ -0,0 +1,211 @@
+"""
+Repositório de lembretes para o NutriBot Evolve.
+Responsável por operações de banco de dados relacionadas aos lembretes
+programados e por avisar o agendador a cada alteração.
+"""
+
+import sys
+import sqlite3
+import datetime
+import threading
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+from database.db_manager import db_manager
+import config
+
+class ReminderRepository:
+    """Classe para gerenciar operações de banco de dados relacionadas a lembretes."""
+
+    # Funções chamadas com o ID de cada lembrete alterado
+    _listeners = []
+    _listeners_lock = threading.Lock()
+
+    @staticmethod
+    def add_change_listener(callback):
+        """
+        Registra uma função chamada sempre que um lembrete é criado, alterado ou removido.
+
+        Args:
+            callback (callable): Função que recebe o ID do lembrete
+        """
+        with ReminderRepository._listeners_lock:
+            ReminderRepository._listeners.append(callback)
+
+    @staticmethod
+    def remove_change_listener(callback):
+        """
+        Remove uma função registrada com add_change_listener().
+
+        Args:
+            callback (callable): Função registrada
+        """
+        with ReminderRepository._listeners_lock:
+            if callback in ReminderRepository._listeners:
+                ReminderRepository._listeners.remove(callback)
+
+    @staticmethod
+    def _notify(reminder_ids):
+        """
+        Avisa os interessados sobre lembretes alterados.
+
+        Args:
+            reminder_ids (iterable): IDs dos lembretes alterados
+        """
+        with ReminderRepository._listeners_lock:
+            listeners = list(ReminderRepository._listeners)
+
+        for reminder_id in reminder_ids:
+            for callback in listeners:
+                try:
+                    callback(reminder_id)
+                except Exception as e:
+                    print(f"Erro ao notificar alteração do lembrete {reminder_id}: {e}")
+
+    @staticmethod
+    def set_reminder(user_id, reminder_type, reminder_time, is_active=True):
+        """
+        Cria ou atualiza o lembrete de um tipo para o usuário.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            reminder_type (str): Tipo de lembrete (ex.: cafe_da_manha, agua)
+            reminder_time (str): Horário no formato HH:MM
+            is_active (bool, optional): Se o lembrete está ativo
+
+        Returns:
+            int: ID do lembrete ou None em caso de erro
+        """
+        data = {
+            'user_id': user_id,
+            'reminder_type': reminder_type,
+            'reminder_time': reminder_time,
+            'is_active': 1 if is_active else 0,
+            'created_at': datetime.datetime.now()
+        }
+
+        row = db_manager.upsert('reminders', data, conflict_columns=('user_id', 'reminder_type'))
+        if row is None:
+            return None
+
+        ReminderRepository._notify([row['id']])
+        return row['id']
+
+    @staticmethod
+    def create_default_reminders(user_id):
+        """
+        Cria os lembretes padrão (config.DEFAULT_REMINDERS) que o usuário ainda não tem.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+
+        Returns:
+            list: IDs dos lembretes criados
+        """
+        now = datetime.datetime.now()
+
+        def operation(conn):
+            created = []
+            for reminder_type, reminder_time in config.DEFAULT_REMINDERS.items():
+                rows = conn.execute("""
+                INSERT INTO reminders (user_id, reminder_type, reminder_time, is_active, created_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(user_id, reminder_type) DO NOTHING
+                RETURNING id
+                """, (user_id, reminder_type, reminder_time, now)).fetchall()
+                created.extend(row['id'] for row in rows)
+            return created
+
+        try:
+            created = db_manager.execute_write(operation)
+        except sqlite3.Error as e:
+            print(f"Erro ao criar lembretes padrão: {e}")
+            return []
+
+        ReminderRepository._notify(created)
+        return created
+
+    @staticmethod
+    def set_reminder_active(reminder_id, is_active):
+        """
+        Ativa ou desativa um lembrete.
+
+        Args:
+            reminder_id (int): ID do lembrete
+            is_active (bool): Se o lembrete deve ficar ativo
+
+        Returns:
+            int: Número de registros atualizados
+        """
+        rows_updated = db_manager.update('reminders', {'is_active': 1 if is_active else 0}, {'id': reminder_id})
+        if rows_updated:
+            ReminderRepository._notify([reminder_id])
+        return rows_updated
+
+    @staticmethod
+    def delete_reminder(reminder_id):
+        """
+        Remove um lembrete.
+
+        Args:
+            reminder_id (int): ID do lembrete
+
+        Returns:
+            int: Número de registros removidos
+        """
+        rows_deleted = db_manager.delete('reminders', {'id': reminder_id})
+        if rows_deleted:
+            ReminderRepository._notify([reminder_id])
+        return rows_deleted
+
+    @staticmethod
+    def get_reminder(reminder_id):
+        """
+        Busca um lembrete pelo ID.
+
+        Args:
+            reminder_id (int): ID do lembrete
+
+        Returns:
+            dict: Dados do lembrete ou None se não encontrado
+        """
+        query = "SELECT * FROM reminders WHERE id = ?"
+        return db_manager.fetch_one(query, (reminder_id,))
+
+    @staticmethod
+    def get_reminders_by_user(user_id):
+        """
+        Busca os lembretes de um usuário.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+
+        Returns:
+            list: Lista de lembretes ordenada pelo horário
+        """
+        # Poucos lembretes por usuário: ordenar aqui evita uma ordenação temporária no SQLite
+        query = "SELECT * FROM reminders WHERE user_id = ?"
+        reminders = db_manager.fetch_all(query, (user_id,))
+        return sorted(reminders, key=lambda reminder: reminder['reminder_time'])
+
+    @staticmethod
+    def get_active_reminders(after_id=0, limit=1000):
+        """
+        Retorna um lote de lembretes ativos, em ordem crescente de ID.
+
+        A paginação é feita pelo último ID do lote anterior (sem OFFSET).
+
+        Args:
+            after_id (int, optional): Último ID do lote anterior
+            limit (int, optional): Tamanho máximo do lote
+
+        Returns:
+            list: Lista de lembretes (id, user_id, reminder_type, reminder_time)
+        """
+        query = """
+        SELECT id, user_id, reminder_type, reminder_time FROM reminders
+        WHERE is_active = 1 AND id > ?
+        ORDER BY id LIMIT ?
+        """
+        return db_manager.fetch_all(query, (after_id, limit))
@@ -0,0 +1,145 @@
+"""
+Repositório de relatórios para o NutriBot Evolve.
+Responsável por guardar na tabela reports o último instantâneo de cada tipo
+de relatório de um usuário (período e totais diários dos dias com refeições)
+e por buscar apenas os totais diários alterados desde então.
+"""
+
+import sys
+import json
+import datetime
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+from database.db_manager import db_manager
+
+class ReportRepository:
+    """Classe para gerenciar operações de banco de dados relacionadas a relatórios."""
+
+    # Margem aplicada ao instante do instantâneo: alterações gravadas em commits
+    # ainda pendentes naquele momento são buscadas de novo na próxima atualização
+    SNAPSHOT_OVERLAP = datetime.timedelta(seconds=60)
+
+    @staticmethod
+    def save_snapshot(user_id, report_type, start_date, end_date, days, as_of):
+        """
+        Grava (ou substitui) o instantâneo de um relatório.
+
+        Guarda apenas o necessário para a atualização incremental: o período e o
+        instante ficam nas colunas da tabela e os totais diários, no JSON.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            report_type (str): Tipo do relatório (weekly, monthly)
+            start_date (datetime.date): Data inicial do período
+            end_date (datetime.date): Data final do período
+            days (dict): Totais por data 'YYYY-MM-DD' -> [calorias, proteínas, carboidratos, gorduras, refeições]
+            as_of (datetime.datetime): Instante anterior à leitura dos totais diários
+
+        Returns:
+            sqlite3.Row: Registro gravado ou None em caso de erro
+        """
+        # JSON compacto: sem indentação nem espaços entre os separadores
+        payload = json.dumps({'days': days}, ensure_ascii=False, separators=(',', ':'))
+
+        data = {
+            'user_id': user_id,
+            'report_type': report_type,
+            'start_date': start_date,
+            'end_date': end_date,
+            'report_data': payload,
+            'created_at': as_of
+        }
+
+        return db_manager.upsert('reports', data, conflict_columns=('user_id', 'report_type'))
+
+    @staticmethod
+    def get_snapshot(user_id, report_type):
+        """
+        Busca o último instantâneo de um relatório.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            report_type (str): Tipo do relatório (weekly, monthly)
+
+        Returns:
+            dict: start_date, end_date, created_at e days, ou None se não existir
+        """
+        query = """
+        SELECT start_date, end_date, report_data, created_at
+        FROM reports WHERE user_id = ? AND report_type = ?
+        """
+        row = db_manager.fetch_one(query, (user_id, report_type))
+        if not row:
+            return None
+
+        try:
+            payload = json.loads(row['report_data'])
+        except (TypeError, ValueError):
+            return None
+
+        return {
+            'start_date': ReportRepository._to_date(row['start_date']),
+            'end_date': ReportRepository._to_date(row['end_date']),
+            'created_at': ReportRepository._to_datetime(row['created_at']),
+            'days': payload.get('days', {})
+        }
+
+    @staticmethod
+    def get_changed_daily_totals(user_id, start_date, end_date, snapshot):
+        """
+        Busca os totais diários do período alterados desde um instantâneo.
+
+        Inclui os dias fora do período do instantâneo e os dias atualizados depois
+        dele, mesmo que tenham ficado sem refeições (totais zerados).
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            start_date (datetime.date): Data inicial do novo período
+            end_date (datetime.date): Data final do novo período
+            snapshot (dict): Instantâneo retornado por get_snapshot()
+
+        Returns:
+            dict: Totais indexados pela data no formato 'YYYY-MM-DD'
+        """
+        query = """
+        SELECT date, calories, protein, carbs, fat, meal_count
+        FROM daily_totals
+        WHERE user_id = ? AND date BETWEEN ? AND ?
+          AND (updated_at > ? OR date < ? OR date > ?)
+        """
+        since = snapshot['created_at'] - ReportRepository.SNAPSHOT_OVERLAP
+        params = (user_id, start_date, end_date, since, snapshot['start_date'], snapshot['end_date'])
+
+        return {str(row['date']): dict(row) for row in db_manager.fetch_all(query, params)}
+
+    @staticmethod
+    def _to_date(value):
+        """
+        Converte o valor de uma coluna DATE em datetime.date.
+
+        Args:
+            value: Valor lido do banco (date ou texto ISO)
+
+        Returns:
+            datetime.date: Data convertida
+        """
+        if isinstance(value, datetime.date):
+            return value
+        return datetime.date.fromisoformat(str(value)[:10])
+
+    @staticmethod
+    def _to_datetime(value):
+        """
+        Converte o valor de uma coluna TIMESTAMP em datetime.datetime.
+
+        Args:
+            value: Valor lido do banco (datetime ou texto ISO)
+
+        Returns:
+            datetime.datetime: Instante convertido
+        """
+        if isinstance(value, datetime.datetime):
+            return value
+        return datetime.datetime.fromisoformat(str(value))
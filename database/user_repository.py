@@ -4,16 +4,94 @@ Responsável por operações de banco de dados relacionadas a usuários.
 """
 
 import sys
+import sqlite3
 import datetime
+import threading
+import contextlib
+import contextvars
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
+import config
 from database.db_manager import db_manager
+from utils.cache import LRUCache
 
 class UserRepository:
     """Classe para gerenciar operações de banco de dados relacionadas a usuários."""
     
+    # Cache de perfis compartilhado pelo processo (invalidado a cada alteração do usuário)
+    _profile_cache = LRUCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+    
+    # Perfis já lidos na requisição atual (ativo dentro de request_scope)
+    _request_cache = contextvars.ContextVar('user_request_cache', default=None)
+    
+    # Marca usuários inexistentes, evitando consultar o banco novamente
+    _NOT_FOUND = object()
+    
+    _request_stats = {'hits': 0}
+    _stats_lock = threading.Lock()
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def request_scope():
+        """
+        Delimita uma requisição: dentro dela cada usuário é lido no máximo uma vez.
+        
+        Pode ser usado com "with" ou como decorador. Escopos aninhados reutilizam
+        o escopo mais externo.
+        """
+        if UserRepository._request_cache.get() is not None:
+            yield
+            return
+        
+        token = UserRepository._request_cache.set({})
+        try:
+            yield
+        finally:
+            UserRepository._request_cache.reset(token)
+    
+    @staticmethod
+    def invalidate_cache(user_id=None):
+        """
+        Descarta o perfil em cache, forçando a próxima leitura a consultar o banco.
+        
+        Args:
+            user_id (int, optional): ID do usuário no Telegram (padrão: todos os usuários)
+        """
+        scope = UserRepository._request_cache.get()
+        
+        if user_id is None:
+            UserRepository._profile_cache.clear()
+            if scope is not None:
+                scope.clear()
+        else:
+            UserRepository._profile_cache.delete(user_id)
+            if scope is not None:
+                scope.pop(user_id, None)
+    
+    @staticmethod
+    def get_cache_stats():
+        """
+        Retorna as métricas do cache de perfis.
+        
+        Returns:
+            dict: Acertos no escopo da requisição e no cache do processo, leituras
+                do banco e taxa de acertos total
+        """
+        stats = UserRepository._profile_cache.get_stats()
+        with UserRepository._stats_lock:
+            request_hits = UserRepository._request_stats['hits']
+        
+        lookups = request_hits + stats['hits'] + stats['misses']
+        return {
+            'request_hits': request_hits,
+            'process_hits': stats['hits'],
+            'database_reads': stats['misses'],
+            'size': stats['size'],
+            'hit_rate': (request_hits + stats['hits']) / lookups if lookups else 0
+        }
+    
     @staticmethod
     def create_user(user_id, username=None, full_name=None):
         """
@@ -36,7 +114,9 @@ class UserRepository:
             'updated_at': now
         }
         
-        return db_manager.insert('users', data)
+        record_id = db_manager.insert('users', data)
+        UserRepository.invalidate_cache(user_id)
+        return record_id
     
     @staticmethod
     def get_user_by_id(user_id):
@@ -49,8 +129,36 @@ class UserRepository:
         Returns:
             dict: Dados do usuário ou None se não encontrado
         """
-        query = "SELECT * FROM users WHERE user_id = ?"
-        return db_manager.fetch_one(query, (user_id,))
+        scope = UserRepository._request_cache.get()
+        if scope is not None and user_id in scope:
+            with UserRepository._stats_lock:
+                UserRepository._request_stats['hits'] += 1
+            return scope[user_id]
+        
+        user = UserRepository._profile_cache.get(user_id)
+        if user is LRUCache.MISSING:
+            # Uma alteração do usuário durante a leitura cancela a reserva, e o perfil
+            # lido (possivelmente anterior a ela) não é guardado no cache
+            reservation = UserRepository._profile_cache.reserve(user_id)
+            query = "SELECT * FROM users WHERE user_id = ?"
+            try:
+                user = db_manager.fetch_one(query, (user_id,), raise_errors=True)
+            except sqlite3.Error as e:
+                # Um erro na consulta não indica usuário inexistente: nada é guardado
+                # em cache, e a próxima leitura consulta o banco novamente
+                print(f"Erro ao buscar usuário: {e}")
+                UserRepository._profile_cache.delete(user_id)
+                return None
+            # sqlite3.Row é imutável e pode ser compartilhado entre threads
+            UserRepository._profile_cache.set_reserved(
+                user_id, UserRepository._NOT_FOUND if user is None else user, reservation
+            )
+        elif user is UserRepository._NOT_FOUND:
+            user = None
+        
+        if scope is not None:
+            scope[user_id] = user
+        return user
     
     @staticmethod
     def update_user(user_id, data):
@@ -68,7 +176,9 @@ class UserRepository:
         data['updated_at'] = datetime.datetime.now()
         
         condition = {'user_id': user_id}
-        return db_manager.update('users', data, condition)
+        rows_updated = db_manager.update('users', data, condition)
+        UserRepository.invalidate_cache(user_id)
+        return rows_updated
     
     @staticmethod
     def update_onboarding_status(user_id, is_complete):
@@ -88,7 +198,9 @@ class UserRepository:
         }
         
         condition = {'user_id': user_id}
-        return db_manager.update('users', data, condition)
+        rows_updated = db_manager.update('users', data, condition)
+        UserRepository.invalidate_cache(user_id)
+        return rows_updated
     
     @staticmethod
     def set_user_premium_status(user_id, is_premium):
@@ -108,7 +220,9 @@ class UserRepository:
         }
         
         condition = {'user_id': user_id}
-        return db_manager.update('users', data, condition)
+        rows_updated = db_manager.update('users', data, condition)
+        UserRepository.invalidate_cache(user_id)
+        return rows_updated
     
     @staticmethod
     def get_all_users():
@@ -143,6 +257,28 @@ class UserRepository:
         query = "SELECT * FROM users WHERE onboarding_complete = 1"
         return db_manager.fetch_all(query)
     
+    @staticmethod
+    def get_onboarded_user_ids(after_user_id=0, limit=500):
+        """
+        Retorna um lote de IDs de usuários com onboarding completo, em ordem crescente.
+        
+        A paginação é feita pelo último ID do lote anterior (sem OFFSET), então
+        cada lote custa o mesmo independentemente da posição na tabela.
+        
+        Args:
+            after_user_id (int, optional): Último ID do lote anterior
+            limit (int, optional): Tamanho máximo do lote
+            
+        Returns:
+            list: IDs dos usuários no Telegram
+        """
+        query = """
+        SELECT user_id FROM users
+        WHERE onboarding_complete = 1 AND user_id > ?
+        ORDER BY user_id LIMIT ?
+        """
+        return [row['user_id'] for row in db_manager.fetch_all(query, (after_user_id, limit))]
+    
     @staticmethod
     def delete_user(user_id):
         """
@@ -155,4 +291,6 @@ class UserRepository:
             int: Número de registros removidos
         """
         condition = {'user_id': user_id}
-        return db_manager.delete('users', condition)
+        rows_deleted = db_manager.delete('users', condition)
+        UserRepository.invalidate_cache(user_id)
+        return rows_deleted
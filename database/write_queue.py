@@ -0,0 +1,261 @@
+"""
+Fila de escrita do banco de dados para o NutriBot Evolve.
+Serializa todas as escritas em uma única thread e agrupa as operações
+pendentes em uma só transação (commit em grupo).
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+
+
+class WriteRequest:
+    """Operação de escrita aguardando execução pela thread escritora."""
+
+    __slots__ = ('operation', 'result', 'error', 'done', 'claimed', 'abandoned')
+
+    def __init__(self, operation):
+        """
+        Inicializa a requisição de escrita.
+
+        Args:
+            operation (callable): Função que recebe a conexão e executa a escrita
+        """
+        self.operation = operation
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        # Marcadas sob o lock da fila: a thread escritora só executa a operação se
+        # quem a enviou não desistiu de esperar, e vice-versa
+        self.claimed = False
+        self.abandoned = False
+
+
+class WriteQueue:
+    """Classe para executar escritas em uma única thread com commit em grupo."""
+
+    # Sinal de parada enviado à thread escritora
+    _STOP = object()
+
+    def __init__(self, connection_factory, batch_size=64, batch_delay=0.0, timeout=None):
+        """
+        Inicializa a fila de escrita.
+
+        Args:
+            connection_factory (callable): Função que abre a conexão usada pela thread escritora
+                (deve permitir uso fora da thread que a criou)
+            batch_size (int): Número máximo de operações por transação
+            batch_delay (float): Tempo (s) de espera por mais operações antes do commit
+            timeout (float, optional): Tempo máximo (s) de espera até a thread escritora
+                iniciar uma operação (None = sem limite)
+        """
+        self.connection_factory = connection_factory
+        self.batch_size = max(1, int(batch_size))
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stopping = False
+
+        # Contadores para acompanhamento do commit em grupo
+        self.stats = {
+            'operations': 0,
+            'commits': 0,
+            'failed_operations': 0
+        }
+
+    def _ensure_started(self):
+        """Inicia a thread escritora na primeira escrita (chamado com o lock da fila)."""
+        if self._thread is None or not self._thread.is_alive():
+            # A conexão é aberta aqui para que falhas cheguem a quem solicitou a escrita
+            self._conn = self.connection_factory()
+            # Controle manual das transações (BEGIN/COMMIT explícitos)
+            self._conn.isolation_level = None
+
+            self._thread = threading.Thread(target=self._run, name="nutribot-db-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, operation):
+        """
+        Executa uma operação de escrita e aguarda o commit.
+
+        A operação recebe uma sqlite3.Connection e não deve chamar commit() nem
+        rollback(): a transação é controlada pela fila.
+
+        Args:
+            operation (callable): Função que recebe a conexão e executa a escrita
+
+        Returns:
+            O valor retornado pela operação
+
+        Raises:
+            sqlite3.Error: Se a operação ou o commit falhar, se a fila já foi encerrada
+                ou se a thread escritora não iniciar a operação dentro do tempo limite
+        """
+        # Escritas disparadas de dentro de outra operação já estão na transação atual
+        if threading.current_thread() is self._thread:
+            return operation(self._conn)
+
+        request = WriteRequest(operation)
+        with self._lock:
+            # Depois do sinal de parada, nenhuma escrita seria executada
+            if self._stopping:
+                raise sqlite3.OperationalError("fila de escrita encerrada")
+            self._ensure_started()
+            self._queue.put(request)
+
+        if not request.done.wait(self.timeout):
+            with self._lock:
+                if not request.claimed:
+                    # A operação não será executada
+                    request.abandoned = True
+                    raise sqlite3.OperationalError("tempo esgotado aguardando a fila de escrita")
+            # Já em execução: o resultado chega com o commit do lote
+            request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect_batch(self, first):
+        """
+        Junta à primeira operação as demais que já estão na fila.
+
+        Args:
+            first (WriteRequest): Primeira operação do lote
+
+        Returns:
+            tuple: (Lista de operações, True se a parada foi solicitada)
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.batch_delay
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is WriteQueue._STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _commit_batch(self, batch):
+        """
+        Executa um lote de operações em uma única transação.
+
+        Cada operação roda em um savepoint próprio, de modo que a falha de uma
+        não desfaz as demais.
+
+        Args:
+            batch (list): Lista de WriteRequest
+        """
+        with self._lock:
+            for request in batch:
+                request.claimed = not request.abandoned
+            batch = [request for request in batch if request.claimed]
+        if not batch:
+            return
+
+        conn = self._conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for request in batch:
+                conn.execute("SAVEPOINT operacao")
+                try:
+                    request.result = request.operation(conn)
+                    conn.execute("RELEASE operacao")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO operacao")
+                    conn.execute("RELEASE operacao")
+                    request.error = e
+            conn.execute("COMMIT")
+            self.stats['commits'] += 1
+        except sqlite3.Error as e:
+            # Falha da transação inteira: nenhuma operação do lote foi gravada
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for request in batch:
+                if request.error is None:
+                    request.result = None
+                    request.error = e
+        finally:
+            self.stats['operations'] += len(batch)
+            self.stats['failed_operations'] += sum(1 for request in batch if request.error is not None)
+            for request in batch:
+                request.done.set()
+
+    def _run(self):
+        """Laço principal da thread escritora."""
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                if item is WriteQueue._STOP:
+                    break
+
+                batch, stop = self._collect_batch(item)
+                self._commit_batch(batch)
+        finally:
+            self._conn.close()
+            self._conn = None
+            # Se a thread terminou por um erro, quem aguarda não fica bloqueado
+            self._fail_pending(sqlite3.OperationalError("thread escritora encerrada"))
+
+    def _fail_pending(self, error):
+        """
+        Conclui com erro as operações que ainda estão na fila.
+
+        Args:
+            error (sqlite3.Error): Erro entregue a quem aguarda cada operação
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not WriteQueue._STOP:
+                item.error = error
+                item.done.set()
+
+    def stop(self, timeout=None):
+        """
+        Encerra a thread escritora após concluir as escritas pendentes.
+
+        Escritas enviadas depois da parada são recusadas com sqlite3.OperationalError.
+
+        Args:
+            timeout (float, optional): Tempo máximo (s) de espera pelo encerramento
+        """
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                # Sem thread escritora, nada mais executaria as operações ainda na fila
+                self._fail_pending(sqlite3.OperationalError("fila de escrita encerrada"))
+                return
+            self._queue.put(WriteQueue._STOP)
+
+        thread.join(timeout)
+
+    def get_stats(self):
+        """
+        Retorna estatísticas da fila de escrita.
+
+        Returns:
+            dict: Operações, commits e tamanho médio dos lotes
+        """
+        stats = dict(self.stats)
+        stats['pending'] = self._queue.qsize()
+        stats['avg_batch_size'] = stats['operations'] / stats['commits'] if stats['commits'] else 0
+        return stats
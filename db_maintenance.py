@@ -0,0 +1,217 @@
+"""
+Script de manutenção do banco de dados do NutriBot Evolve.
+Reúne comandos para verificar e reparar dados derivados das tabelas principais.
+
+Uso:
+    python db_maintenance.py reconstruir-totais [--usuario ID]
+    python db_maintenance.py verificar-totais [--usuario ID] [--corrigir]
+    python db_maintenance.py converter-catalogo [--origem JSON] [--destino DB]
+    python db_maintenance.py gerar-relatorios [--tipo semanal|mensal] [--lote N] [--trabalhadores N] [--limite N] [--recomecar]
+    python db_maintenance.py gerar-miniaturas [--lote N]
+    python db_maintenance.py reanalisar-fotos [--lote N]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from database.db_manager import db_manager
+from database.meal_repository import MealRepository
+from database.photo_repository import PhotoRepository
+from utils.food_catalog import FOOD_DATABASE_PATH, FOOD_CATALOG_SQLITE_PATH
+from utils.food_catalog_sqlite import convert_json_to_sqlite
+from utils.chart_renderer import chart_renderer
+from utils.report_batch import ReportBatch
+from utils.photo_service import photo_service
+from utils.photo_reanalysis import reanalyze_photos
+
+def rebuild_totals(args):
+    """Reconstrói a tabela daily_totals a partir das refeições."""
+    print("Reconstruindo totais diários...")
+    days = MealRepository.rebuild_daily_totals(args.usuario)
+
+    if days is None:
+        print("❌ Falha ao reconstruir os totais diários.")
+        return False
+
+    print(f"✅ {days} dias reconstruídos.")
+    return True
+
+def verify_totals(args):
+    """Compara daily_totals com as refeições e, opcionalmente, corrige as divergências."""
+    print("Verificando totais diários...")
+    divergences = MealRepository.verify_daily_totals(args.usuario)
+
+    if not divergences:
+        print("✅ Nenhuma divergência encontrada.")
+        return True
+
+    print(f"❌ {len(divergences)} divergências encontradas:")
+    for divergence in divergences[:20]:
+        print(f"  Usuário {divergence['user_id']}, {divergence['date']}: "
+              f"esperado {divergence['expected']}, armazenado {divergence['stored']}")
+    if len(divergences) > 20:
+        print(f"  ... e mais {len(divergences) - 20}")
+
+    if args.corrigir:
+        # Reconstrói apenas os usuários afetados
+        for user_id in sorted({divergence['user_id'] for divergence in divergences}):
+            MealRepository.rebuild_daily_totals(user_id)
+        remaining = MealRepository.verify_daily_totals(args.usuario)
+        print(f"{'✅' if not remaining else '❌'} Divergências após correção: {len(remaining)}")
+        return not remaining
+
+    return False
+
+def convert_catalog(args):
+    """Converte o banco de dados de alimentos em JSON para o catálogo SQLite."""
+    print(f"Convertendo {args.origem} para {args.destino}...")
+    try:
+        count = convert_json_to_sqlite(args.origem, args.destino)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Falha ao converter o catálogo de alimentos: {e}")
+        return False
+
+    print(f"✅ {count} alimentos convertidos.")
+    print('Para usar o catálogo, defina FOOD_CATALOG_BACKEND = "sqlite" em config.py.')
+    return True
+
+def generate_reports(args):
+    """Gera antecipadamente os relatórios de todos os usuários com onboarding completo."""
+    report_type = {'semanal': 'weekly', 'mensal': 'monthly'}[args.tipo]
+    batch = ReportBatch(report_type, chunk_size=args.lote, workers=args.trabalhadores)
+
+    checkpoint = None if args.recomecar else batch.load_checkpoint()
+    if checkpoint:
+        print(f"Retomando após o usuário {checkpoint['last_user_id']} ({checkpoint['processed']} já processados)...")
+    else:
+        print(f"Gerando relatórios ({args.tipo})...")
+
+    def show_progress(metrics):
+        print(f"  {metrics['processed']} usuários processados "
+              f"({metrics['generated']} gerados, {metrics['skipped']} ignorados, {metrics['failed']} falhas) "
+              f"- {metrics['reports_per_second']:.1f} relatórios/s")
+
+    try:
+        metrics = batch.run(resume=not args.recomecar, max_users=args.limite, progress=show_progress)
+    finally:
+        chart_renderer.shutdown()
+
+    status = "concluída" if metrics['completed'] else "interrompida (use o comando novamente para continuar)"
+    print(f"{'✅' if not metrics['failed'] else '❌'} Geração {status}: {metrics['generated']} relatórios gerados "
+          f"em {metrics['elapsed']:.1f} s ({metrics['reports_per_second']:.1f} relatórios/s).")
+    return not metrics['failed']
+
+def generate_photo_derivatives(args):
+    """Gera as versões reduzidas das fotos enviadas antes de existirem."""
+    print("Gerando miniaturas e versões de comparação das fotos...")
+    generated = 0
+    failed = 0
+    last_id = 0
+
+    try:
+        photo_service.start()
+        while True:
+            photos = PhotoRepository.get_photos_without_derivatives(last_id, args.lote)
+            if not photos:
+                break
+
+            # O lote inteiro é enviado de uma vez e processado em paralelo pelo serviço
+            jobs = [(photo, photo_service.submit(photo['user_id'], 'create_derivatives', photo['photo_path']))
+                    for photo in photos]
+            for photo, job in jobs:
+                derivatives = photo_service.result(job)
+                if derivatives:
+                    PhotoRepository.set_derivatives(photo['id'], derivatives['thumbnail_path'], derivatives['comparison_path'])
+                    generated += 1
+                else:
+                    print(f"  Foto {photo['id']} ignorada: {photo['photo_path']}")
+                    failed += 1
+
+            last_id = photos[-1]['id']
+            print(f"  {generated + failed} fotos processadas ({generated} geradas, {failed} falhas)")
+    finally:
+        photo_service.shutdown()
+
+    print(f"{'✅' if not failed else '❌'} {generated} fotos atualizadas, {failed} falhas.")
+    return not failed
+
+def reanalyze_photo_analyses(args):
+    """Refaz as análises de fotos ausentes ou de versões anteriores do analisador."""
+    print("Analisando fotos sem análise atualizada...")
+
+    def show_progress(metrics):
+        print(f"  {metrics['processed']} fotos processadas ({metrics['analyzed']} analisadas, {metrics['failed']} falhas)")
+
+    try:
+        photo_service.start()
+        metrics = reanalyze_photos(chunk_size=args.lote, progress=show_progress)
+    finally:
+        photo_service.shutdown()
+
+    print(f"{'✅' if not metrics['failed'] else '❌'} {metrics['analyzed']} fotos analisadas, "
+          f"{metrics['failed']} falhas em {metrics['elapsed']:.1f} s.")
+    if not metrics['completed']:
+        print("❌ Serviço de fotos ocupado: execute novamente para analisar as fotos restantes.")
+    return not metrics['failed'] and metrics['completed']
+
+def build_parser():
+    """
+    Cria o parser de argumentos da linha de comando.
+
+    Returns:
+        argparse.ArgumentParser: Parser com os subcomandos de manutenção
+    """
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados do NutriBot Evolve")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    rebuild_parser = subparsers.add_parser("reconstruir-totais", help="Reconstrói a tabela daily_totals")
+    rebuild_parser.add_argument("--usuario", type=int, help="ID do usuário no Telegram (padrão: todos)")
+    rebuild_parser.set_defaults(func=rebuild_totals)
+
+    verify_parser = subparsers.add_parser("verificar-totais", help="Verifica a tabela daily_totals")
+    verify_parser.add_argument("--usuario", type=int, help="ID do usuário no Telegram (padrão: todos)")
+    verify_parser.add_argument("--corrigir", action="store_true", help="Reconstrói os usuários com divergências")
+    verify_parser.set_defaults(func=verify_totals)
+
+    catalog_parser = subparsers.add_parser("converter-catalogo", help="Converte o catálogo de alimentos para SQLite")
+    catalog_parser.add_argument("--origem", default=FOOD_DATABASE_PATH, help="Arquivo JSON de alimentos")
+    catalog_parser.add_argument("--destino", default=FOOD_CATALOG_SQLITE_PATH, help="Arquivo SQLite de destino")
+    catalog_parser.set_defaults(func=convert_catalog)
+
+    reports_parser = subparsers.add_parser("gerar-relatorios", help="Gera os relatórios de todos os usuários")
+    reports_parser.add_argument("--tipo", choices=("semanal", "mensal"), default="semanal", help="Tipo de relatório")
+    reports_parser.add_argument("--lote", type=int, help="Usuários lidos por lote (padrão: REPORT_BATCH_CHUNK_SIZE)")
+    reports_parser.add_argument("--trabalhadores", type=int, help="Relatórios em paralelo (padrão: REPORT_BATCH_WORKERS)")
+    reports_parser.add_argument("--limite", type=int, help="Máximo de usuários nesta execução")
+    reports_parser.add_argument("--recomecar", action="store_true", help="Ignora o progresso salvo e começa do início")
+    reports_parser.set_defaults(func=generate_reports)
+
+    derivatives_parser = subparsers.add_parser("gerar-miniaturas", help="Gera as versões reduzidas das fotos existentes")
+    derivatives_parser.add_argument("--lote", type=int, default=100, help="Fotos processadas por lote")
+    derivatives_parser.set_defaults(func=generate_photo_derivatives)
+
+    reanalyze_parser = subparsers.add_parser("reanalisar-fotos", help="Refaz as análises de fotos desatualizadas")
+    reanalyze_parser.add_argument("--lote", type=int, default=config.PHOTO_REANALYSIS_CHUNK_SIZE,
+                                  help="Fotos processadas por lote")
+    reanalyze_parser.set_defaults(func=reanalyze_photo_analyses)
+
+    return parser
+
+def main(argv=None):
+    """Função principal do script de manutenção."""
+    args = build_parser().parse_args(argv)
+
+    try:
+        success = args.func(args)
+    finally:
+        db_manager.close_pool()
+
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
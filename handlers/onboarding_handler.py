@@ -10,6 +10,7 @@ from pathlib import Path
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 from database.user_repository import UserRepository
+from database.reminder_repository import ReminderRepository
 from utils.conversation_manager import ConversationManager
 from utils.calorie_calculator import CalorieCalculator
 import config
@@ -240,8 +241,7 @@ Use /ajuda para ver todos os comandos disponíveis.
             if state == ConversationManager.STATES['WAITING_NAME']:
                 # Salva o nome e avança para a próxima etapa
                 context_data['name'] = message_text
-                ConversationManager.update_context(user_id, {'name': message_text})
-                ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_AGE'], context_data)
+                ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_AGE'], {'name': message_text})
                 
                 # Retorna a mensagem solicitando a idade
                 return OnboardingHandler.MESSAGES['ask_age'].format(name=message_text)
@@ -253,9 +253,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     if age < 12 or age > 120:
                         return "Por favor, informe uma idade válida entre 12 e 120 anos."
                     
-                    ConversationManager.update_context(user_id, {'age': age})
                     context_data['age'] = age # Atualiza o contexto local
-                    ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_GENDER'], context_data)
+                    ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_GENDER'], {'age': age})
                     
                     # Retorna a mensagem solicitando o gênero
                     return OnboardingHandler.MESSAGES['ask_gender']
@@ -276,9 +275,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                 elif gender == 'f':
                     gender = 'feminino'
                 
-                ConversationManager.update_context(user_id, {'gender': gender})
                 context_data['gender'] = gender # Atualiza o contexto local
-                ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_WEIGHT'], context_data)
+                ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_WEIGHT'], {'gender': gender})
                 
                 # Retorna a mensagem solicitando o peso
                 return OnboardingHandler.MESSAGES['ask_weight']
@@ -290,9 +288,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     if weight < 30 or weight > 300:
                         return "Por favor, informe um peso válido entre 30 e 300 kg."
                     
-                    ConversationManager.update_context(user_id, {'weight': weight})
                     context_data['weight'] = weight # Atualiza o contexto local
-                    ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_HEIGHT'], context_data)
+                    ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_HEIGHT'], {'weight': weight})
                     
                     # Retorna a mensagem solicitando a altura
                     return OnboardingHandler.MESSAGES['ask_height']
@@ -307,9 +304,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     if height < 100 or height > 250:
                         return "Por favor, informe uma altura válida entre 100 e 250 cm."
                     
-                    ConversationManager.update_context(user_id, {'height': height})
                     context_data['height'] = height # Atualiza o contexto local
-                    ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_ACTIVITY'], context_data)
+                    ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_ACTIVITY'], {'height': height})
                     
                     # Retorna a mensagem solicitando o nível de atividade
                     return OnboardingHandler.MESSAGES['ask_activity']
@@ -323,9 +319,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     return "Por favor, responda com um número de 1 a 5 correspondente ao seu nível de atividade."
                 
                 activity = OnboardingHandler.ACTIVITY_MAPPING[message_text]
-                ConversationManager.update_context(user_id, {'activity_level': activity})
                 context_data['activity_level'] = activity # Atualiza o contexto local
-                ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_GOAL'], context_data)
+                ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_GOAL'], {'activity_level': activity})
                 
                 # Retorna a mensagem solicitando o objetivo
                 return OnboardingHandler.MESSAGES['ask_goal']
@@ -336,9 +331,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     return "Por favor, responda com um número de 1 a 3 correspondente ao seu objetivo."
                 
                 goal = OnboardingHandler.GOAL_MAPPING[message_text]
-                ConversationManager.update_context(user_id, {'goal': goal})
                 context_data['goal'] = goal # Atualiza o contexto local
-                ConversationManager.set_state(user_id, ConversationManager.STATES['WAITING_DIET_TYPE'], context_data)
+                ConversationManager.transition(user_id, ConversationManager.STATES['WAITING_DIET_TYPE'], {'goal': goal})
                 
                 # Retorna a mensagem solicitando o tipo de dieta
                 return OnboardingHandler.MESSAGES['ask_diet_type']
@@ -350,9 +344,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                 
                 diet_type = OnboardingHandler.DIET_MAPPING[message_text]
                 
-                # Atualiza o contexto com o tipo de dieta antes de completar o onboarding
+                # O tipo de dieta é gravado junto com o estado final, em complete_onboarding
                 context_data['diet_type'] = diet_type
-                ConversationManager.update_context(user_id, {'diet_type': diet_type})
                 
                 # Completa o onboarding
                 return OnboardingHandler.complete_onboarding(user_id, context_data)
@@ -385,8 +378,8 @@ Use /ajuda para ver todos os comandos disponíveis.
                     print(f"Campo obrigatório ausente: {field}")
                     return f"Erro: Informação de {field} ausente. Por favor, use /iniciar para recomeçar o cadastro."
             
-            # Atualiza o estado para concluído
-            ConversationManager.set_state(user_id, ConversationManager.STATES['COMPLETED'], context_data)
+            # Atualiza o estado para concluído e mescla os dados ao contexto em uma única instrução
+            ConversationManager.transition(user_id, ConversationManager.STATES['COMPLETED'], context_data)
             
             # Calcula as calorias diárias
             calorie_data = CalorieCalculator.calculate_daily_calories(
@@ -427,6 +420,9 @@ Use /ajuda para ver todos os comandos disponíveis.
             }
             UserRepository.update_user(user_id, user_data)
             
+            # Ativa os lembretes padrão de refeições
+            ReminderRepository.create_default_reminders(user_id)
+            
             # Formata a mensagem de conclusão
             # Adiciona uma verificação para garantir que os valores de macro existem antes de arredondar
             completion_message = OnboardingHandler.MESSAGES['completion'].format(
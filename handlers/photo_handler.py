@@ -5,13 +5,16 @@ Responsável por gerenciar o envio e análise de fotos corporais.
 
 import sys
 import os
+import datetime
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
+import config
 from database.user_repository import UserRepository
 from database.photo_repository import PhotoRepository
 from utils.photo_analyzer import PhotoAnalyzer
+from utils.photo_service import photo_service
 from utils.conversation_manager import ConversationManager
 
 class PhotoHandler:
@@ -137,8 +140,8 @@ Use /foto para enviar uma nova foto seguindo estas dicas!
         if not user or not user['onboarding_complete']:
             return "Você precisa completar o cadastro inicial antes de acessar suas fotos. Use /iniciar para começar."
         
-        # Obtém as fotos do usuário
-        photos = PhotoRepository.get_photos_by_user(user_id)
+        # Obtém as fotos do usuário com as análises salvas (sem abrir as imagens)
+        photos = PhotoRepository.get_photos_with_analysis(user_id, config.PHOTO_ANALYZER_VERSION)
         
         if not photos:
             return PhotoHandler.MESSAGES['no_photos']
@@ -148,7 +151,8 @@ Use /foto para enviar uma nova foto seguindo estas dicas!
         for i, photo in enumerate(photos):
             date_str = photo['photo_date'].strftime('%d/%m/%Y') if isinstance(photo['photo_date'], datetime.date) else photo['photo_date']
             description = f" - {photo['description']}" if photo['description'] else ""
-            photo_list += f"{i+1}. Foto de {date_str}{description}\n"
+            analysis = f" (qualidade {photo['quality_level']}, iluminação {photo['lighting_level']})" if photo['quality_level'] else ""
+            photo_list += f"{i+1}. Foto de {date_str}{description}{analysis}\n"
         
         # Retorna a mensagem com a lista de fotos
         return PhotoHandler.MESSAGES['photo_list'].format(
@@ -182,8 +186,8 @@ Use /foto para enviar uma nova foto seguindo estas dicas!
             index1 = int(context.args[0]) - 1
             index2 = int(context.args[1]) - 1
             
-            # Obtém as fotos do usuário
-            photos = PhotoRepository.get_photos_by_user(user_id)
+            # Obtém as fotos do usuário com as análises salvas
+            photos = PhotoRepository.get_photos_with_analysis(user_id, config.PHOTO_ANALYZER_VERSION)
             
             if not photos or len(photos) < 2:
                 return "Você precisa ter pelo menos duas fotos registradas para fazer uma comparação."
@@ -191,24 +195,28 @@ Use /foto para enviar uma nova foto seguindo estas dicas!
             if index1 < 0 or index1 >= len(photos) or index2 < 0 or index2 >= len(photos):
                 return f"Índices inválidos. Você tem {len(photos)} fotos registradas (1 a {len(photos)})."
             
-            # Obtém os caminhos das fotos
-            photo1_path = photos[index1]['photo_path']
-            photo2_path = photos[index2]['photo_path']
+            # Obtém os caminhos das fotos (versões já reduzidas, quando existirem)
+            photo1_path = photos[index1]['comparison_path'] or photos[index1]['photo_path']
+            photo2_path = photos[index2]['comparison_path'] or photos[index2]['photo_path']
             
-            # Cria a imagem de comparação
-            comparison_path = self.photo_analyzer.create_comparison_image(photo2_path, photo1_path, user_id)
+            # Cria a imagem de comparação e realiza a comparação no serviço de fotos
+            comparison_job = photo_service.submit(user_id, 'create_comparison_image', photo2_path, photo1_path, user_id)
+            compare_job = photo_service.submit(user_id, 'compare_photos', photo2_path, photo1_path)
             
-            if not comparison_path:
-                return "Não foi possível criar a comparação entre as fotos. Por favor, tente novamente."
+            comparison_path = photo_service.result(comparison_job)
+            comparison = photo_service.result(compare_job)
             
-            # Realiza a comparação
-            comparison = self.photo_analyzer.compare_photos(photo2_path, photo1_path)
+            if not comparison_path or not comparison:
+                return "Não foi possível criar a comparação entre as fotos. Por favor, tente novamente."
             
             # Prepara o texto de observações
             observations_text = ""
             for obs in comparison['observations']:
                 observations_text += f"• {obs}\n"
             
+            # Avisa quando as condições das fotos (análises salvas) dificultam a comparação
+            conditions_text = self._compare_conditions(photos[index1], photos[index2])
+            
             # Retorna a mensagem com a comparação
             return f"""
 📊 Comparação entre as fotos {index1+1} e {index2+1}:
@@ -217,7 +225,7 @@ Observações:
 {observations_text}
 
 {comparison['progress']['message']}
-
+{conditions_text}
 A imagem de comparação será enviada em seguida.
 """, comparison_path
             
@@ -227,6 +235,47 @@ A imagem de comparação será enviada em seguida.
             print(f"Erro ao comparar fotos: {e}")
             return "Ocorreu um erro ao comparar as fotos. Por favor, tente novamente."
     
+    @staticmethod
+    def _save_derivatives(photo_id, job):
+        """
+        Grava os caminhos das versões reduzidas de uma foto quando o trabalho termina.
+        
+        Comparações e listagens futuras usam essas versões no lugar do original.
+        
+        Args:
+            photo_id (int): ID da foto
+            job (Future): Trabalho create_derivatives concluído
+        """
+        if job.cancelled() or job.exception() is not None:
+            return
+        
+        derivatives = job.result()
+        if derivatives:
+            PhotoRepository.set_derivatives(photo_id, derivatives['thumbnail_path'], derivatives['comparison_path'])
+    
+    @staticmethod
+    def _compare_conditions(photo1, photo2):
+        """
+        Compara as condições de duas fotos a partir das análises salvas.
+        
+        Args:
+            photo1 (dict): Foto com as colunas de análise (get_photos_with_analysis)
+            photo2 (dict): Foto com as colunas de análise (get_photos_with_analysis)
+            
+        Returns:
+            str: Avisos sobre diferenças de iluminação e enquadramento (vazio se não houver)
+        """
+        warnings = ""
+        
+        if photo1['lighting_level'] and photo2['lighting_level'] and photo1['lighting_level'] != photo2['lighting_level']:
+            warnings += (f"\n⚠️ A iluminação das fotos é diferente ({photo1['lighting_level']} e "
+                         f"{photo2['lighting_level']}), o que pode afetar a comparação.\n")
+        
+        if photo1['framing_level'] and photo2['framing_level'] and photo1['framing_level'] != photo2['framing_level']:
+            warnings += "\n⚠️ O enquadramento das fotos é diferente, o que pode afetar a comparação.\n"
+        
+        return warnings
+    
     def handle_dicas_foto_command(self, update, context):
         """
         Manipula o comando /dicas_foto para mostrar dicas para tirar fotos.
@@ -277,17 +326,17 @@ A imagem de comparação será enviada em seguida.
         # Baixa a foto
         photo_file = context.bot.get_file(photo.file_id)
         
-        # Salva a foto
-        photo_path = self.photo_analyzer.save_photo(photo_file, user_id)
+        # Salva a foto (o hash do conteúdo é calculado durante a cópia)
+        saved_photo = self.photo_analyzer.ingest_photo(photo_file, user_id)
         
-        if not photo_path:
+        if not saved_photo:
             return "Ocorreu um erro ao salvar a foto. Por favor, tente novamente."
         
-        # Atualiza o contexto com o caminho da foto
-        ConversationManager.update_context(user_id, {'photo_path': photo_path})
-        
-        # Avança para o próximo estado
-        ConversationManager.set_state(user_id, PhotoHandler.STATES['WAITING_DESCRIPTION'])
+        # Avança para o próximo estado guardando o caminho e o hash da foto no contexto
+        ConversationManager.transition(user_id, PhotoHandler.STATES['WAITING_DESCRIPTION'], {
+            'photo_path': saved_photo['path'],
+            'photo_hash': saved_photo['sha256']
+        })
         
         # Retorna a mensagem solicitando a descrição
         return PhotoHandler.MESSAGES['ask_description']
@@ -323,42 +372,55 @@ A imagem de comparação será enviada em seguida.
         description = None if message_text.lower() == 'pular' else message_text
         
         # Registra a foto no banco de dados
-        PhotoRepository.add_photo(user_id, photo_path, description)
+        photo_id = PhotoRepository.add_photo(user_id, photo_path, description)
+        
+        # Analisa a foto e gera as versões reduzidas no serviço de fotos, fora desta thread
+        analysis_job = photo_service.submit(user_id, 'analyze_photo', photo_path, conversation['context'].get('photo_hash'))
+        derivatives_job = photo_service.submit(user_id, 'create_derivatives', photo_path)
         
-        # Analisa a foto
-        analysis = self.photo_analyzer.analyze_photo(photo_path)
+        # Verifica se há fotos anteriores para comparação
+        photos = PhotoRepository.get_photos_by_user(user_id)
+        
+        compare_job = None
+        if len(photos) > 1:
+            # A foto atual já está na lista, então a anterior é a segunda
+            previous_photo = photos[1]
+            compare_job = photo_service.submit(user_id, 'compare_photos', photo_path, previous_photo['photo_path'])
+        
+        # As versões reduzidas não fazem parte da resposta: são gravadas quando ficarem prontas
+        if photo_id and derivatives_job:
+            derivatives_job.add_done_callback(lambda job: PhotoHandler._save_derivatives(photo_id, job))
+        
+        # A resposta depende da análise e da comparação: esta thread aguarda os dois
+        # trabalhos (limitados por PHOTO_SERVICE_TIMEOUT), pois o handler devolve o texto
+        analysis = photo_service.result(analysis_job)
+        comparison = photo_service.result(compare_job)
         
         if not analysis:
             return "Ocorreu um erro ao analisar a foto. A foto foi salva, mas não foi possível gerar uma análise."
         
+        # Salva a análise para as próximas listagens e comparações
+        if photo_id:
+            PhotoRepository.save_analysis(photo_id, analysis)
+        
         # Prepara o texto de sugestões
         suggestions_text = ""
         for i, suggestion in enumerate(analysis['suggestions'][:3]):  # Limita a 3 sugestões
             suggestions_text += f"• {suggestion}\n"
         
-        # Verifica se há fotos anteriores para comparação
-        photos = PhotoRepository.get_photos_by_user(user_id)
-        
         comparison_text = PhotoHandler.MESSAGES['no_comparison']
         
-        if len(photos) > 1:
-            # A foto atual já está na lista, então a anterior é a segunda
-            previous_photo = photos[1]
-            
-            # Realiza a comparação
-            comparison = self.photo_analyzer.compare_photos(photo_path, previous_photo['photo_path'])
+        if comparison:
+            # Prepara o texto de observações
+            observations_text = ""
+            for obs in comparison['observations']:
+                observations_text += f"• {obs}\n"
             
-            if comparison:
-                # Prepara o texto de observações
-                observations_text = ""
-                for obs in comparison['observations']:
-                    observations_text += f"• {obs}\n"
-                
-                # Atualiza o texto de comparação
-                comparison_text = PhotoHandler.MESSAGES['comparison_text'].format(
-                    observations=observations_text,
-                    progress_message=comparison['progress']['message']
-                )
+            # Atualiza o texto de comparação
+            comparison_text = PhotoHandler.MESSAGES['comparison_text'].format(
+                observations=observations_text,
+                progress_message=comparison['progress']['message']
+            )
         
         # Finaliza o estado de conversação
         ConversationManager.set_state(user_id, PhotoHandler.STATES['COMPLETED'])
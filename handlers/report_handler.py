@@ -75,6 +75,7 @@ Use /premium para conhecer os benefícios e ativar sua assinatura.
         """Inicializa o manipulador de relatórios."""
         self.report_generator = ReportGenerator()
     
+    @UserRepository.request_scope()
     def handle_relatorio_command(self, update, context):
         """
         Manipula o comando /relatorio para gerar um relatório semanal.
@@ -119,14 +120,15 @@ Use /premium para conhecer os benefícios e ativar sua assinatura.
             insights=insights_text
         )
         
-        # Prepara os caminhos para os gráficos
+        # Prepara os caminhos para os gráficos (os que não puderam ser gerados são omitidos)
         chart_paths = [
-            report['charts']['calorie_chart'],
-            report['charts']['macro_chart']
+            path for path in (report['charts']['calorie_chart'], report['charts']['macro_chart'])
+            if path
         ]
         
         return message, chart_paths
     
+    @UserRepository.request_scope()
     def handle_relatorio_mensal_command(self, update, context):
         """
         Manipula o comando /relatorio_mensal para gerar um relatório mensal (premium).
@@ -175,10 +177,10 @@ Use /premium para conhecer os benefícios e ativar sua assinatura.
             insights=insights_text
         )
         
-        # Prepara os caminhos para os gráficos
+        # Prepara os caminhos para os gráficos (os que não puderam ser gerados são omitidos)
         chart_paths = [
-            report['charts']['calorie_chart'],
-            report['charts']['macro_chart']
+            path for path in (report['charts']['calorie_chart'], report['charts']['macro_chart'])
+            if path
         ]
         
         # Gera o PDF (recurso premium)
@@ -188,6 +190,7 @@ Use /premium para conhecer os benefícios e ativar sua assinatura.
         
         return message, chart_paths
     
+    @UserRepository.request_scope()
     def handle_exportar_command(self, update, context):
         """
         Manipula o comando /exportar para exportar relatórios em PDF (premium).
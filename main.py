@@ -5,6 +5,7 @@ Ponto de entrada da aplicação.
 
 import os
 import logging
+import datetime
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import (
     Updater,
@@ -20,6 +21,12 @@ from database.db_manager import db_manager
 from database.user_repository import UserRepository
 from utils.conversation_manager import ConversationManager
 from handlers.onboarding_handler import OnboardingHandler
+from handlers.suggestion_handler import SuggestionHandler
+from utils.chart_renderer import chart_renderer
+from utils.photo_service import photo_service
+from utils.photo_reanalysis import reanalyze_photos
+from utils.report_batch import ReportBatch
+from utils.reminder_scheduler import ReminderScheduler
 
 # Configuração de logging
 logging.basicConfig(
@@ -28,11 +35,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@UserRepository.request_scope()
 def start(update: Update, context: CallbackContext):
     """Manipula o comando /start."""
     response = OnboardingHandler.handle_start(update, context)
     update.message.reply_text(response)
 
+@UserRepository.request_scope()
 def iniciar(update: Update, context: CallbackContext):
     """Manipula o comando /iniciar para começar o onboarding."""
     response = OnboardingHandler.handle_iniciar(update, context)
@@ -42,6 +51,7 @@ def ajuda(update: Update, context: CallbackContext):
     """Manipula o comando /ajuda."""
     update.message.reply_text(config.HELP_MESSAGE)
 
+@UserRepository.request_scope()
 def handle_message(update: Update, context: CallbackContext):
     """Manipula mensagens de texto."""
     user_id = update.effective_user.id
@@ -65,6 +75,48 @@ def handle_message(update: Update, context: CallbackContext):
         "Use /ajuda para ver os comandos disponíveis."
     )
 
+def generate_reports_job(context: CallbackContext):
+    """Gera antecipadamente os relatórios semanais de todos os usuários."""
+    def run_batch():
+        metrics = ReportBatch('weekly').run(resume=True)
+        logger.info(
+            f"Relatórios em lote: {metrics['generated']} gerados, {metrics['skipped']} ignorados, "
+            f"{metrics['failed']} falhas em {metrics['elapsed']:.1f} s ({metrics['reports_per_second']:.1f} relatórios/s)"
+        )
+    
+    # Executa fora da thread da fila de tarefas, que também dispara os demais jobs
+    context.dispatcher.run_async(run_batch)
+
+def reanalyze_photos_job(context: CallbackContext):
+    """Refaz as análises de fotos salvas por versões anteriores do analisador."""
+    def run_reanalysis():
+        metrics = reanalyze_photos()
+        if metrics['processed']:
+            logger.info(
+                f"Reanálise de fotos: {metrics['analyzed']} analisadas, "
+                f"{metrics['failed']} falhas em {metrics['elapsed']:.1f} s"
+            )
+        if not metrics['completed']:
+            logger.warning("Reanálise de fotos incompleta: o restante será analisado na próxima inicialização")
+    
+    # Executa fora da thread da fila de tarefas, que também dispara os demais jobs
+    context.dispatcher.run_async(run_reanalysis)
+
+@UserRepository.request_scope()
+def send_reminder(bot, suggestion_handler, user_id, reminder_type):
+    """Envia um lembrete programado ao usuário."""
+    message = suggestion_handler.get_reminder_message(user_id, reminder_type)
+    if not message:
+        return False
+    
+    bot.send_message(chat_id=user_id, text=message)
+    return True
+
+def reminders_job(context: CallbackContext):
+    """Dispara os lembretes do minuto atual."""
+    # O envio respeita o limite de taxa e pode levar mais de um minuto nos horários cheios
+    context.dispatcher.run_async(context.job.context.tick)
+
 def error_handler(update: Update, context: CallbackContext):
     """Manipula erros."""
     logger.error(f"Erro: {context.error} - Update: {update}")
@@ -80,6 +132,12 @@ def main():
     # Inicializa o banco de dados
     db_manager.initialize_database()
     
+    # Inicia os processos de renderização de gráficos com o matplotlib já carregado
+    chart_renderer.start()
+    
+    # Inicia os processos de análise de fotos
+    photo_service.start()
+    
     # Cria o updater e o dispatcher
     updater = Updater(token=config.TOKEN)
     dispatcher = updater.dispatcher
@@ -95,10 +153,38 @@ def main():
     # Adiciona manipulador de erros
     dispatcher.add_error_handler(error_handler)
     
+    # Carrega os lembretes ativos e verifica a roda de tempo a cada minuto
+    suggestion_handler = SuggestionHandler()
+    reminder_scheduler = ReminderScheduler(
+        lambda user_id, reminder_type: send_reminder(updater.bot, suggestion_handler, user_id, reminder_type)
+    )
+    logger.info(f"{reminder_scheduler.load()} lembretes ativos carregados")
+    
+    next_minute = (datetime.datetime.now() + datetime.timedelta(minutes=1)).replace(second=0, microsecond=0)
+    updater.job_queue.run_repeating(reminders_job, interval=60, first=next_minute, context=reminder_scheduler)
+    
+    # Atualiza as análises de fotos se a versão do analisador mudou
+    updater.job_queue.run_once(reanalyze_photos_job, when=0)
+    
+    # Agenda a geração dos relatórios em lote fora do horário de pico
+    batch_hour, batch_minute = map(int, config.REPORT_BATCH_TIME.split(':'))
+    updater.job_queue.run_repeating(
+        generate_reports_job,
+        interval=datetime.timedelta(days=config.REPORT_FREQUENCY),
+        first=datetime.time(batch_hour, batch_minute)
+    )
+    
     # Inicia o bot
     updater.start_polling()
     updater.idle()
     
+    # Encerra o envio de lembretes, os processos de gráficos e de fotos e, por último,
+    # a fila de escrita e as conexões do banco de dados
+    reminder_scheduler.stop()
+    chart_renderer.shutdown()
+    photo_service.shutdown()
+    db_manager.close_pool()
+    
     logger.info("Bot iniciado!")
 
 if __name__ == "__main__":
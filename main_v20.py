@@ -18,8 +18,11 @@ from telegram.ext import (
 import config
 from database.db_manager import db_manager
 from database.user_repository import UserRepository
-from utils.conversation_manager import ConversationManager
+from database.async_executor import db_executor
+from utils.conversation_manager import ConversationManager, AsyncConversationManager
 from handlers.onboarding_handler import OnboardingHandler
+from utils.chart_renderer import chart_renderer
+from utils.photo_service import photo_service
 
 # Configuração de logging
 logging.basicConfig(
@@ -30,12 +33,15 @@ logger = logging.getLogger(__name__)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manipula o comando /start."""
-    response = OnboardingHandler.handle_start(update, context)
+    # Os handlers de onboarding acessam o banco de dados: executa fora do event loop
+    with UserRepository.request_scope():
+        response = await db_executor.run(OnboardingHandler.handle_start, update, context)
     await update.message.reply_text(response)
 
 async def iniciar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Manipula o comando /iniciar para começar o onboarding."""
-    response = OnboardingHandler.handle_iniciar(update, context)
+    with UserRepository.request_scope():
+        response = await db_executor.run(OnboardingHandler.handle_iniciar, update, context)
     await update.message.reply_text(response)
 
 async def ajuda(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -47,11 +53,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     
     # Verifica se o usuário está em processo de onboarding
-    conversation = ConversationManager.get_state(user_id)
+    conversation = await AsyncConversationManager.get_state(user_id)
     
     if conversation and conversation['state'] != ConversationManager.STATES['COMPLETED']:
         # Usuário está em processo de onboarding
-        response = OnboardingHandler.handle_message(update, context)
+        with UserRepository.request_scope():
+            response = await db_executor.run(OnboardingHandler.handle_message, update, context)
         if response:
             await update.message.reply_text(response)
         return
@@ -80,6 +87,12 @@ def main():
     # Inicializa o banco de dados
     db_manager.initialize_database()
     
+    # Inicia os processos de renderização de gráficos com o matplotlib já carregado
+    chart_renderer.start()
+    
+    # Inicia os processos de análise de fotos
+    photo_service.start()
+    
     # Cria a aplicação
     application = Application.builder().token(config.TOKEN).build()
     
@@ -97,6 +110,12 @@ def main():
     # Inicia o bot
     application.run_polling()
     
+    # Libera os executores e as conexões do banco de dados ao encerrar
+    db_executor.shutdown()
+    chart_renderer.shutdown()
+    photo_service.shutdown()
+    db_manager.close_pool()
+    
     logger.info("Bot iniciado!")
 
 if __name__ == "__main__":
@@ -43,42 +43,39 @@ def memoize(func):
 def optimize_database():
     """Otimiza o banco de dados SQLite."""
     from database.db_manager import db_manager
+    from database.migrations import apply_migrations
     
     logger.info("Otimizando banco de dados...")
     
     try:
-        conn = db_manager.connect()
-        
-        # Executa VACUUM para otimizar o banco de dados
-        conn.execute("VACUUM")
-        
-        # Executa ANALYZE para otimizar estatísticas
-        conn.execute("ANALYZE")
-        
-        # Cria índices para melhorar performance de consultas frequentes
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_users_user_id ON users(user_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_user_id ON meals(user_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_meal_date ON meals(meal_date)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_photos_user_id ON photos(user_id)")
+        with db_manager.connection() as conn:
+            # Executa VACUUM para otimizar o banco de dados
+            conn.execute("VACUUM")
+            
+            # Os índices das consultas frequentes são criados pelas migrações de esquema;
+            # garante que estejam aplicadas caso o banco tenha sido copiado de outra instalação
+            apply_migrations(conn)
+            
+            # Executa ANALYZE para otimizar estatísticas
+            conn.execute("ANALYZE")
         
-        conn.commit()
         logger.info("Banco de dados otimizado com sucesso.")
         return True
     except Exception as e:
         logger.error(f"Erro ao otimizar banco de dados: {e}")
         return False
-    finally:
-        db_manager.close()
 
 # Otimizações para o analisador de refeições
 def optimize_meal_analyzer():
     """Otimiza o analisador de refeições."""
-    from utils.meal_analyzer import MealAnalyzer
+    from utils.meal_analyzer import meal_analysis_cache
     
     logger.info("Otimizando analisador de refeições...")
     
-    # Aplica o decorador de cache ao método de análise
-    MealAnalyzer.analyze_meal_text = memoize(MealAnalyzer.analyze_meal_text)
+    # analyze_meal_text já usa um cache LRU limitado (MEAL_ANALYSIS_CACHE_*), invalidado
+    # quando o catálogo de alimentos é recarregado; memoize aqui duplicaria resultados sem limite
+    stats = meal_analysis_cache.get_stats()
+    logger.info(f"Cache de análises: {stats['size']}/{stats['maxsize']} entradas, taxa de acertos {stats['hit_rate']:.0%}")
     
     logger.info("Analisador de refeições otimizado com sucesso.")
     return True
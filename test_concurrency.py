@@ -0,0 +1,262 @@
+"""
+Teste de estresse de concorrência para o NutriBot Evolve.
+Este script simula vários workers do dispatcher registrando refeições e
+consultando os totais diários ao mesmo tempo, verificando que nenhuma escrita
+se perde e que nenhum cursor é fechado por outra thread, além dos totais de
+um dia que ainda não tem linha em daily_totals, do tempo limite
+e do encerramento da fila de escrita e do executor usado pelos handlers
+assíncronos.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import db_manager
+from database.meal_repository import MealRepository
+from database.write_queue import WriteQueue
+from database.user_repository import UserRepository
+from database.async_executor import db_executor
+from utils.conversation_manager import AsyncConversationManager
+
+# Dados de teste
+TEST_USER_ID = 987654321
+NUM_THREADS = 16
+MEALS_PER_THREAD = 50
+MEAL_CALORIES = 100
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def reset_test_data():
+    """Remove as refeições e os totais diários do usuário de teste."""
+    db_manager.delete('meals', {'user_id': TEST_USER_ID})
+    db_manager.delete('daily_totals', {'user_id': TEST_USER_ID})
+
+def test_concurrent_meal_registration():
+    """Testa o registro e a consulta de refeições por várias threads simultâneas."""
+    print_header("Testando registro concorrente de refeições")
+
+    reset_test_data()
+
+    errors = []
+    failed_inserts = []
+    barrier = threading.Barrier(NUM_THREADS)
+
+    def worker():
+        try:
+            # Todas as threads começam juntas para maximizar a concorrência
+            barrier.wait()
+            for _ in range(MEALS_PER_THREAD):
+                meal_id = MealRepository.add_meal(
+                    user_id=TEST_USER_ID,
+                    meal_type="almoco",
+                    description="Teste de concorrência",
+                    calories=MEAL_CALORIES,
+                    protein=10,
+                    carbs=10,
+                    fat=1
+                )
+                if meal_id is None:
+                    failed_inserts.append(1)
+
+                totals = MealRepository.get_daily_totals(TEST_USER_ID)
+                if totals['calories'] < MEAL_CALORIES:
+                    errors.append(f"Totais inconsistentes após inserção: {totals}")
+        except sqlite3.ProgrammingError as e:
+            errors.append(f"ProgrammingError: {e}")
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=worker) for _ in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected_meals = NUM_THREADS * MEALS_PER_THREAD
+    meals = MealRepository.get_meals_by_user_and_date(TEST_USER_ID)
+    totals = MealRepository.get_daily_totals(TEST_USER_ID)
+    divergences = MealRepository.verify_daily_totals(TEST_USER_ID)
+
+    print(f"Threads: {NUM_THREADS}, refeições por thread: {MEALS_PER_THREAD}")
+    print(f"Refeições esperadas: {expected_meals}, registradas: {len(meals)}")
+    print(f"Calorias esperadas: {expected_meals * MEAL_CALORIES}, calculadas: {totals['calories']}")
+    print(f"Inserções com falha: {len(failed_inserts)}")
+    print(f"Divergências em daily_totals: {len(divergences)}")
+    print(f"Erros: {len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+    reset_test_data()
+
+    return (not errors and not failed_inserts and not divergences and
+            len(meals) == expected_meals and
+            totals['calories'] == expected_meals * MEAL_CALORIES)
+
+def test_missing_daily_totals():
+    """Testa que alterar uma refeição de um dia sem totais não grava totais negativos."""
+    print_header("Testando refeições de um dia sem totais diários")
+
+    reset_test_data()
+
+    meal_ids = [MealRepository.add_meal(TEST_USER_ID, "almoco", "Teste", MEAL_CALORIES, 10, 10, 1)
+                for _ in range(3)]
+
+    # Simula um dia sem linha em daily_totals (ex.: perdida antes de uma reconstrução)
+    db_manager.delete('daily_totals', {'user_id': TEST_USER_ID})
+    MealRepository.delete_meal(meal_ids[0])
+    after_delete = MealRepository.get_daily_totals(TEST_USER_ID)
+
+    db_manager.delete('daily_totals', {'user_id': TEST_USER_ID})
+    MealRepository.update_meal(meal_ids[1], {'calories': 2 * MEAL_CALORIES})
+    after_update = MealRepository.get_daily_totals(TEST_USER_ID)
+    divergences = MealRepository.verify_daily_totals(TEST_USER_ID)
+
+    # Sem totais e sem refeições restantes, o dia continua sem linha
+    db_manager.delete('daily_totals', {'user_id': TEST_USER_ID})
+    db_manager.delete('meals', {'id': meal_ids[2]})
+    MealRepository.delete_meal(meal_ids[1])
+    rows = db_manager.fetch_all("SELECT * FROM daily_totals WHERE user_id = ?", (TEST_USER_ID,))
+
+    print(f"Totais após remover uma refeição: {after_delete}")
+    print(f"Totais após alterar uma refeição: {after_update}")
+    print(f"Divergências em daily_totals: {len(divergences)}")
+    print(f"Linhas após remover a última refeição: {len(rows)}")
+
+    reset_test_data()
+
+    return (after_delete['calories'] == 2 * MEAL_CALORIES and
+            after_update['calories'] == 3 * MEAL_CALORIES and
+            not divergences and not rows)
+
+def create_write_queue(timeout=None):
+    """Cria uma fila de escrita em um banco de dados temporário."""
+    db_path = os.path.join(tempfile.mkdtemp(), "write_queue_test.db")
+
+    def connect():
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    write_queue = WriteQueue(connect, timeout=timeout)
+    write_queue.submit(lambda conn: conn.execute("CREATE TABLE items (value INTEGER)"))
+    return write_queue
+
+def test_write_queue_shutdown():
+    """Testa que a fila de escrita não deixa quem envia uma escrita esperando para sempre."""
+    print_header("Testando o encerramento e o tempo limite da fila de escrita")
+
+    # Thread escritora ocupada: a escrita seguinte desiste ao fim do tempo limite
+    write_queue = create_write_queue(timeout=0.2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_operation(conn):
+        started.set()
+        release.wait()
+        return conn.execute("INSERT INTO items VALUES (1)").rowcount
+
+    slow = threading.Thread(target=write_queue.submit, args=(slow_operation,))
+    slow.start()
+    started.wait()
+
+    timed_out = False
+    try:
+        write_queue.submit(lambda conn: conn.execute("INSERT INTO items VALUES (2)").rowcount)
+    except sqlite3.OperationalError:
+        timed_out = True
+
+    release.set()
+    slow.join()
+    count = write_queue.submit(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+
+    # Depois do encerramento, novas escritas são recusadas sem esperar
+    write_queue.stop()
+    rejected = False
+    try:
+        write_queue.submit(lambda conn: conn.execute("INSERT INTO items VALUES (3)").rowcount)
+    except sqlite3.OperationalError:
+        rejected = True
+
+    print(f"Escrita com a thread escritora ocupada desistiu no tempo limite: {timed_out}")
+    print(f"Registros gravados: {count} (a escrita abandonada não é executada)")
+    print(f"Escrita após o encerramento recusada: {rejected}")
+
+    return timed_out and count == 1 and rejected
+
+def test_async_executor():
+    """Testa as chamadas de banco dos handlers assíncronos feitas pelo db_executor."""
+    print_header("Testando o executor de banco de dados assíncrono")
+
+    num_calls = 4
+    delay = 0.2
+
+    async def run():
+        loop_thread = threading.current_thread()
+
+        # Chamadas bloqueantes simultâneas rodam em paralelo, fora da thread do event loop
+        start_time = time.perf_counter()
+        threads = await asyncio.gather(*(db_executor.run(lambda: time.sleep(delay) or threading.current_thread())
+                                         for _ in range(num_calls)))
+        elapsed = time.perf_counter() - start_time
+
+        await AsyncConversationManager.transition(TEST_USER_ID, 'waiting_age', {'name': 'Ana'})
+        state = await AsyncConversationManager.get_state(TEST_USER_ID)
+        await AsyncConversationManager.clear_state(TEST_USER_ID)
+
+        # O escopo da requisição aberto no handler chega à thread do executor
+        with UserRepository.request_scope():
+            scoped = await db_executor.run(UserRepository._request_cache.get)
+
+        return loop_thread not in threads, elapsed, state, scoped
+
+    outside_loop, elapsed, state, scoped = asyncio.run(run())
+
+    print(f"{num_calls} chamadas de {delay} s fora do event loop: {outside_loop}, duração total: {elapsed:.2f} s")
+    print(f"Estado gravado e lido pelo ConversationManager assíncrono: {state}")
+    print(f"Escopo da requisição propagado: {scoped is not None}")
+
+    return (outside_loop and
+            elapsed < num_calls * delay and
+            state == {'state': 'waiting_age', 'context': {'name': 'Ana'}} and
+            scoped is not None)
+
+def main():
+    """Função principal para executar o teste de estresse."""
+    print_header("TESTE DE CONCORRÊNCIA DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "stress_test.db"))
+
+    results = {
+        "Registro concorrente de refeições": test_concurrent_meal_registration(),
+        "Refeições de um dia sem totais": test_missing_daily_totals(),
+        "Encerramento da fila de escrita": test_write_queue_shutdown(),
+        "Executor de banco de dados assíncrono": test_async_executor(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+
+    if success:
+        print("\n✅ Nenhuma escrita perdida e nenhum erro de cursor compartilhado.")
+    else:
+        print("\n❌ O teste de concorrência falhou. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
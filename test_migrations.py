@@ -0,0 +1,199 @@
+"""
+Script para testar as migrações de esquema do NutriBot Evolve.
+Verifica, com EXPLAIN QUERY PLAN, que as consultas frequentes dos repositórios
+usam os índices compostos criados na inicialização, e a recusa de bibliotecas
+SQLite anteriores à versão mínima.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import DatabaseManager, check_sqlite_version
+from database.migrations import get_schema_version, get_latest_version
+
+# Consultas frequentes dos repositórios e o índice que cada uma deve usar
+QUERY_PLANS = [
+    (
+        "MealRepository.get_meals_by_user_and_date",
+        "SELECT * FROM meals WHERE user_id = ? AND meal_date = ? ORDER BY created_at",
+        (1, '2024-01-01'),
+        "USING INDEX idx_meals_user_date_created"
+    ),
+    (
+        "MealRepository.get_meals_by_user_and_date_range",
+        "SELECT * FROM meals WHERE user_id = ? AND meal_date BETWEEN ? AND ? ORDER BY meal_date, created_at",
+        (1, '2024-01-01', '2024-01-07'),
+        "USING INDEX idx_meals_user_date_created"
+    ),
+    (
+        "MealRepository.get_daily_totals",
+        "SELECT calories, protein, carbs, fat FROM daily_totals WHERE user_id = ? AND date = ?",
+        (1, '2024-01-01'),
+        "USING PRIMARY KEY"
+    ),
+    (
+        "MealRepository.get_daily_totals_by_date_range",
+        "SELECT date, calories, protein, carbs, fat, meal_count FROM daily_totals "
+        "WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+        (1, '2024-01-01', '2024-01-07'),
+        "USING PRIMARY KEY"
+    ),
+    (
+        "MealRepository.rebuild_daily_totals",
+        "SELECT user_id, meal_date, SUM(calories), SUM(protein), SUM(carbs), SUM(fat), COUNT(*) "
+        "FROM meals WHERE user_id = ? GROUP BY user_id, meal_date",
+        (1,),
+        "USING COVERING INDEX idx_meals_user_date_totals"
+    ),
+    (
+        "UserRepository.get_onboarded_user_ids",
+        "SELECT user_id FROM users WHERE onboarding_complete = 1 AND user_id > ? ORDER BY user_id LIMIT ?",
+        (0, 200),
+        "USING INDEX sqlite_autoindex_users_1 (user_id>?)"
+    ),
+    (
+        "ReportRepository.get_snapshot",
+        "SELECT start_date, end_date, report_data, created_at FROM reports WHERE user_id = ? AND report_type = ?",
+        (1, 'weekly'),
+        "USING INDEX idx_reports_user_type"
+    ),
+    (
+        "ReportRepository.get_changed_daily_totals",
+        "SELECT date, calories, protein, carbs, fat, meal_count FROM daily_totals "
+        "WHERE user_id = ? AND date BETWEEN ? AND ? AND (updated_at > ? OR date < ? OR date > ?)",
+        (1, '2024-01-01', '2024-01-07', '2024-01-06 12:00:00', '2024-01-01', '2024-01-06'),
+        "USING PRIMARY KEY"
+    ),
+    (
+        "ReminderRepository.get_reminders_by_user",
+        "SELECT * FROM reminders WHERE user_id = ?",
+        (1,),
+        "USING INDEX idx_reminders_user_type"
+    ),
+    (
+        "ReminderRepository.get_active_reminders",
+        "SELECT id, user_id, reminder_type, reminder_time FROM reminders WHERE is_active = 1 AND id > ? ORDER BY id LIMIT ?",
+        (0, 1000),
+        "USING INTEGER PRIMARY KEY (rowid>?)"
+    ),
+    (
+        "PhotoRepository.get_photos_by_user",
+        "SELECT * FROM photos WHERE user_id = ? ORDER BY photo_date DESC, created_at DESC LIMIT ?",
+        (1, 10),
+        "USING INDEX idx_photos_user_date_created"
+    ),
+    (
+        "PhotoRepository.get_photos_with_analysis",
+        "SELECT p.*, a.width, a.height, a.brightness, a.quality_level, a.lighting_level, a.framing_level "
+        "FROM photos p LEFT JOIN photo_analyses a ON a.photo_id = p.id AND a.analyzer_version = ? "
+        "WHERE p.user_id = ? ORDER BY p.photo_date DESC, p.created_at DESC LIMIT ?",
+        (1, 1, 10),
+        "SEARCH a USING INTEGER PRIMARY KEY (rowid=?)"
+    ),
+    (
+        "PhotoRepository.get_photos_needing_analysis",
+        "SELECT p.id, p.user_id, p.photo_path, a.content_hash FROM photos p "
+        "LEFT JOIN photo_analyses a ON a.photo_id = p.id "
+        "WHERE p.id > ? AND (a.photo_id IS NULL OR a.analyzer_version != ?) ORDER BY p.id LIMIT ?",
+        (0, 1, 100),
+        "SEARCH a USING INTEGER PRIMARY KEY (rowid=?)"
+    ),
+]
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def test_schema_version(manager):
+    """Testa se todas as migrações foram aplicadas na inicialização."""
+    print_header("Testando versão do esquema")
+
+    with manager.connection() as conn:
+        version = get_schema_version(conn)
+
+    print(f"Versão aplicada: {version}, versão mais recente: {get_latest_version()}")
+    return version == get_latest_version()
+
+def test_query_plans(manager):
+    """Testa se as consultas frequentes usam os índices compostos."""
+    print_header("Testando planos de consulta")
+
+    success = True
+    with manager.connection() as conn:
+        for name, query, params, expected in QUERY_PLANS:
+            plan = " | ".join(row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+
+            # A ordenação deve vir do índice, sem uma etapa de ordenação temporária
+            ok = expected in plan and "TEMP B-TREE" not in plan
+            success = success and ok
+
+            print(f"{'✅' if ok else '❌'} {name}: {plan}")
+
+    return success
+
+def test_migrations_idempotent(manager):
+    """Testa se reinicializar o banco não reaplica migrações."""
+    print_header("Testando reinicialização do banco")
+
+    manager.initialize_database()
+    with manager.connection() as conn:
+        version = get_schema_version(conn)
+
+    print(f"Versão após reinicializar: {version}")
+    return version == get_latest_version()
+
+def test_sqlite_version_check():
+    """Testa a recusa de bibliotecas SQLite sem suporte a RETURNING."""
+    print_header("Testando a versão mínima do SQLite")
+
+    # A biblioteca instalada é aceita
+    check_sqlite_version()
+
+    try:
+        check_sqlite_version((3, 34, 1))
+        error = None
+    except RuntimeError as e:
+        error = str(e)
+
+    print(f"Versão do SQLite: {sqlite3.sqlite_version}")
+    print(f"Erro com o SQLite 3.34.1: {error}")
+    return error is not None and "3.35.0" in error
+
+def main():
+    """Função principal para testar as migrações."""
+    print_header("TESTE DAS MIGRAÇÕES DO NUTRIBOT EVOLVE")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = DatabaseManager(os.path.join(temp_dir, "migrations_test.db"))
+
+        results = {
+            "Versão do esquema": test_schema_version(manager),
+            "Planos de consulta": test_query_plans(manager),
+            "Reinicialização": test_migrations_idempotent(manager),
+            "Versão mínima do SQLite": test_sqlite_version_check(),
+        }
+
+        manager.close_pool()
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    all_tests_passed = all(results.values())
+    if all_tests_passed:
+        print("\n✅ Todas as consultas frequentes usam os índices compostos.")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os planos de consulta acima.")
+
+    return all_tests_passed
+
+if __name__ == "__main__":
+    main()
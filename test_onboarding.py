@@ -74,6 +74,9 @@ def reset_database():
         conn.commit()
         conn.close()
         
+        # O estado foi removido fora do ConversationManager: descarta o cache em memória
+        ConversationManager.invalidate_cache(TEST_USER_ID)
+        
         print("Dados de teste removidos com sucesso.")
         return True
     except Exception as e:
@@ -12,10 +12,17 @@ from pathlib import Path
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(os.getcwd())
 
-# Substitui o módulo photo_analyzer pelo photo_analyzer_test
+# Substitui o módulo photo_analyzer pelo photo_analyzer_test durante a importação dos handlers
+# (e restaura o original, para não afetar os demais testes executados no mesmo processo)
+original_photo_analyzer = sys.modules.get('utils.photo_analyzer')
 sys.modules['utils.photo_analyzer'] = __import__('utils.photo_analyzer_test', fromlist=['PhotoAnalyzer'])
 
 from handlers.onboarding_handler import OnboardingHandler
+
+if original_photo_analyzer is not None:
+    sys.modules['utils.photo_analyzer'] = original_photo_analyzer
+else:
+    del sys.modules['utils.photo_analyzer']
 from utils.conversation_manager import ConversationManager
 from database.db_manager import db_manager
 from database.user_repository import UserRepository
@@ -77,6 +84,9 @@ def reset_database():
         conn.commit()
         conn.close()
         
+        # O estado foi removido fora do ConversationManager: descarta o cache em memória
+        ConversationManager.invalidate_cache(TEST_USER_ID)
+        
         print("Dados de teste removidos com sucesso.")
         return True
     except Exception as e:
@@ -0,0 +1,186 @@
+"""
+Testes do analisador de fotos do NutriBot Evolve.
+Este script verifica a cópia das fotos recebidas (hash, nomes únicos no mesmo
+segundo, recusa de fotos grandes demais sem deixar arquivos para trás) e o
+tamanho das imagens decodificadas para análise e das versões reduzidas.
+"""
+
+import os
+import io
+import sys
+import hashlib
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from utils.photo_analyzer import PhotoAnalyzer
+
+# Dados de teste
+TEST_USER_ID = 987654321
+LARGE_SIZE = (3000, 2000)
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def create_analyzer():
+    """Cria um analisador que grava as fotos em um diretório temporário."""
+    analyzer = PhotoAnalyzer()
+    analyzer.photos_dir = tempfile.mkdtemp()
+    return analyzer
+
+def create_photo_bytes(size=(640, 480), image_format='JPEG'):
+    """Cria o conteúdo de uma foto de teste."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (120, 110, 100)).save(buffer, image_format)
+    return buffer.getvalue()
+
+def user_files(analyzer):
+    """Lista os arquivos do diretório do usuário de teste."""
+    user_dir = os.path.join(analyzer.photos_dir, str(TEST_USER_ID))
+    return sorted(os.listdir(user_dir)) if os.path.isdir(user_dir) else []
+
+def test_ingest_photo():
+    """Testa o hash e o tamanho calculados durante a cópia da foto."""
+    print_header("Testando a cópia da foto recebida")
+
+    analyzer = create_analyzer()
+    data = create_photo_bytes()
+    saved = analyzer.ingest_photo(io.BytesIO(data), TEST_USER_ID)
+
+    print(f"Foto salva: {saved}")
+    print(f"Arquivos no diretório do usuário: {user_files(analyzer)}")
+
+    return (saved is not None and
+            saved['sha256'] == hashlib.sha256(data).hexdigest() and
+            saved['sha256'] == PhotoAnalyzer.file_sha256(saved['path']) and
+            saved['size'] == len(data) and
+            user_files(analyzer) == [os.path.basename(saved['path'])])
+
+def test_same_second_names():
+    """Testa que a mesma foto enviada no mesmo segundo recebe outro nome."""
+    print_header("Testando nomes de fotos enviadas no mesmo segundo")
+
+    user_dir = tempfile.mkdtemp()
+    paths = [PhotoAnalyzer._reserve_photo_path(user_dir, "photo_20240101_120000_abcdef") for _ in range(3)]
+    names = [os.path.basename(path) for path in paths]
+
+    print(f"Nomes reservados: {names}")
+
+    return names == ["photo_20240101_120000_abcdef.jpg",
+                     "photo_20240101_120000_abcdef_1.jpg",
+                     "photo_20240101_120000_abcdef_2.jpg"]
+
+def test_rejected_photos_leave_no_files():
+    """Testa que fotos recusadas ou com falha na gravação não deixam arquivos para trás."""
+    print_header("Testando a recusa de fotos grandes demais")
+
+    analyzer = create_analyzer()
+    data = create_photo_bytes()
+
+    # Foto maior que o limite
+    original_max_bytes = config.PHOTO_MAX_BYTES
+    config.PHOTO_MAX_BYTES = len(data) - 1
+    try:
+        too_large = analyzer.ingest_photo(io.BytesIO(data), TEST_USER_ID)
+    finally:
+        config.PHOTO_MAX_BYTES = original_max_bytes
+    after_rejection = user_files(analyzer)
+
+    # Falha ao mover o temporário para o nome reservado
+    original_replace = os.replace
+
+    def failing_replace(source, destination):
+        raise OSError("disco cheio")
+
+    os.replace = failing_replace
+    try:
+        failed = analyzer.ingest_photo(io.BytesIO(data), TEST_USER_ID)
+    finally:
+        os.replace = original_replace
+    after_failure = user_files(analyzer)
+
+    print(f"Foto maior que o limite: {too_large}, arquivos: {after_rejection}")
+    print(f"Falha ao gravar: {failed}, arquivos: {after_failure}")
+
+    return too_large is None and after_rejection == [] and failed is None and after_failure == []
+
+def test_working_image_size():
+    """Testa que a imagem decodificada para análise respeita PHOTO_ANALYSIS_MAX_SIZE."""
+    print_header("Testando o tamanho da imagem de análise")
+
+    max_width, max_height = config.PHOTO_ANALYSIS_MAX_SIZE
+    temp_dir = tempfile.mkdtemp()
+    success = True
+
+    # JPEG usa o modo draft; PNG (inclusive com paleta) usa reduce()
+    for name, image_format, mode in [("foto.jpg", 'JPEG', 'RGB'), ("foto.png", 'PNG', 'RGB'), ("paleta.png", 'PNG', 'P')]:
+        photo_path = os.path.join(temp_dir, name)
+        Image.new('RGB', LARGE_SIZE, (120, 110, 100)).convert(mode).save(photo_path, image_format)
+
+        width, height, image = PhotoAnalyzer._load_working_image(photo_path)
+        ok = ((width, height) == LARGE_SIZE and image.mode == 'L' and
+              image.width <= max_width and image.height <= max_height)
+        success = success and ok
+
+        print(f"{'✅' if ok else '❌'} {name}: original {width}x{height}, análise {image.width}x{image.height}")
+
+    return success
+
+def test_derivative_sizes():
+    """Testa o tamanho e os caminhos das versões reduzidas."""
+    print_header("Testando as versões reduzidas da foto")
+
+    analyzer = create_analyzer()
+    photo_path = os.path.join(analyzer.photos_dir, "foto.jpg")
+    with open(photo_path, 'wb') as f:
+        f.write(create_photo_bytes(LARGE_SIZE))
+
+    paths = analyzer.create_derivatives(photo_path)
+    with Image.open(paths['thumbnail_path']) as thumbnail, Image.open(paths['comparison_path']) as comparison:
+        thumbnail_size = thumbnail.size
+        comparison_size = comparison.size
+
+    print(f"Miniatura: {thumbnail_size} (máximo {config.PHOTO_THUMBNAIL_SIZE})")
+    print(f"Versão de comparação: {comparison_size} (máximo {config.PHOTO_COMPARISON_SIZE})")
+
+    return (paths == PhotoAnalyzer.derivative_paths(photo_path) and
+            thumbnail_size[0] <= config.PHOTO_THUMBNAIL_SIZE[0] and
+            thumbnail_size[1] <= config.PHOTO_THUMBNAIL_SIZE[1] and
+            comparison_size[0] <= config.PHOTO_COMPARISON_SIZE[0] and
+            comparison_size[1] <= config.PHOTO_COMPARISON_SIZE[1] and
+            not [name for name in os.listdir(analyzer.photos_dir) if name.endswith('.tmp')])
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DO ANALISADOR DE FOTOS DO NUTRIBOT EVOLVE")
+
+    results = {
+        "Cópia da foto recebida": test_ingest_photo(),
+        "Nomes no mesmo segundo": test_same_second_names(),
+        "Recusa de fotos grandes demais": test_rejected_photos_leave_no_files(),
+        "Tamanho da imagem de análise": test_working_image_size(),
+        "Versões reduzidas": test_derivative_sizes(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Testes do manipulador de fotos do NutriBot Evolve.
+Este script verifica, em um banco de dados temporário, a listagem das fotos
+com as análises salvas (/fotos), a comparação entre duas fotos (/comparar) e
+o registro de uma foto após a descrição, com as versões reduzidas gravadas
+quando ficam prontas.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+
+from PIL import Image
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from database.db_manager import db_manager
+from database.user_repository import UserRepository
+from database.photo_repository import PhotoRepository
+from handlers.photo_handler import PhotoHandler
+from utils.photo_service import photo_service
+from utils.conversation_manager import ConversationManager
+
+# Dados de teste
+TEST_USER_ID = 987654321
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def create_update(user_id):
+    """Cria uma atualização do Telegram com apenas o usuário."""
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id))
+
+def create_context(*args):
+    """Cria um contexto do Telegram com os argumentos do comando."""
+    return SimpleNamespace(args=list(args))
+
+def create_test_photos():
+    """Cria o usuário de teste e duas fotos com as análises salvas."""
+    if UserRepository.get_user_by_id(TEST_USER_ID) is None:
+        UserRepository.create_user(TEST_USER_ID, full_name="Usuário de Teste")
+        UserRepository.update_onboarding_status(TEST_USER_ID, True)
+
+    temp_dir = tempfile.mkdtemp()
+    photo_ids = []
+    for index, color in enumerate([(120, 110, 100), (200, 190, 180)]):
+        photo_path = os.path.join(temp_dir, f"test_photo_{index}.jpg")
+        Image.new('RGB', (640, 480), color).save(photo_path, 'JPEG')
+
+        photo_id = PhotoRepository.add_photo(TEST_USER_ID, photo_path, f"Foto {index + 1}")
+        analysis = photo_service.result(photo_service.submit(TEST_USER_ID, 'analyze_photo', photo_path))
+        PhotoRepository.save_analysis(photo_id, analysis)
+        photo_ids.append(photo_id)
+    return photo_ids
+
+def test_photo_commands():
+    """Testa os comandos /fotos e /comparar."""
+    print_header("Testando os comandos /fotos e /comparar")
+
+    handler = PhotoHandler()
+    photo_ids = create_test_photos()
+    comparison_path = None
+
+    try:
+        photo_list = handler.handle_fotos_command(create_update(TEST_USER_ID), create_context())
+        response = handler.handle_comparar_command(create_update(TEST_USER_ID), create_context('1', '2'))
+        invalid = handler.handle_comparar_command(create_update(TEST_USER_ID), create_context('1', '5'))
+
+        if isinstance(response, tuple):
+            comparison_text, comparison_path = response
+        else:
+            comparison_text = response
+    finally:
+        photo_service.shutdown()
+        for photo_id in photo_ids:
+            PhotoRepository.delete_photo(photo_id)
+        if comparison_path and os.path.exists(comparison_path):
+            os.remove(comparison_path)
+            if not os.listdir(os.path.dirname(comparison_path)):
+                os.rmdir(os.path.dirname(comparison_path))
+
+    print(f"Resposta do /fotos: {photo_list}")
+    print(f"Resposta do /comparar: {comparison_text}")
+    print(f"Imagem de comparação: {comparison_path}")
+    print(f"Resposta com índice inválido: {invalid}")
+
+    return ("1. Foto de" in photo_list and "Foto 2" in photo_list and "qualidade" in photo_list and
+            "Comparação entre as fotos 1 e 2" in comparison_text and
+            comparison_path is not None and
+            invalid.startswith("Índices inválidos"))
+
+def test_description_flow():
+    """Testa o registro de uma foto após a descrição, com as versões reduzidas gravadas depois."""
+    print_header("Testando o registro da foto após a descrição")
+
+    handler = PhotoHandler()
+    photo_ids = create_test_photos()
+
+    photo_path = os.path.join(tempfile.mkdtemp(), "test_photo_new.jpg")
+    Image.new('RGB', (640, 480), (150, 140, 130)).save(photo_path, 'JPEG')
+    ConversationManager.transition(TEST_USER_ID, PhotoHandler.STATES['WAITING_DESCRIPTION'], {'photo_path': photo_path})
+
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=TEST_USER_ID),
+                             message=SimpleNamespace(text="Foto 3"))
+    try:
+        response = handler.handle_description_message(update, create_context())
+        photo = PhotoRepository.get_latest_photo(TEST_USER_ID)
+        photo_ids.append(photo['id'])
+        analysis = PhotoRepository.get_analysis(photo['id'], config.PHOTO_ANALYZER_VERSION)
+
+        # As versões reduzidas são gravadas quando o trabalho termina, depois da resposta
+        deadline = time.monotonic() + config.PHOTO_SERVICE_TIMEOUT
+        while not photo['thumbnail_path'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+            photo = PhotoRepository.get_photo_by_id(photo['id'])
+        derivatives_saved = all(photo[column] and os.path.exists(photo[column])
+                                for column in ('thumbnail_path', 'comparison_path'))
+        state = ConversationManager.get_state(TEST_USER_ID)
+    finally:
+        photo_service.shutdown()
+        ConversationManager.clear_state(TEST_USER_ID)
+        for photo_id in photo_ids:
+            PhotoRepository.delete_photo(photo_id)
+
+    print(f"Resposta: {response}")
+    print(f"Análise salva: {analysis is not None}")
+    print(f"Versões reduzidas: {photo['thumbnail_path']}, {photo['comparison_path']}")
+    print(f"Estado da conversação: {state}")
+
+    return ("Foto registrada com sucesso" in response and
+            analysis is not None and
+            derivatives_saved and
+            state['state'] == PhotoHandler.STATES['COMPLETED'])
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DO MANIPULADOR DE FOTOS DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "photo_handler_test.db"))
+
+    results = {
+        "Comandos /fotos e /comparar": test_photo_commands(),
+        "Registro da foto após a descrição": test_description_flow(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Testes do serviço de processamento de fotos do NutriBot Evolve.
+Este script verifica que os trabalhos de um usuário terminam na ordem de envio,
+que o cancelamento dos trabalhos de um usuário não deixa nenhum pendente e,
+em um banco de dados temporário, que a reanálise salva as análises e reenvia as
+fotos recusadas pela fila cheia.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+import config
+config.PHOTO_REANALYSIS_RETRY_DELAY = 0
+
+from database.db_manager import db_manager
+from database.photo_repository import PhotoRepository
+from utils.photo_service import PhotoService
+from utils.photo_reanalysis import reanalyze_photos
+
+# Dados de teste
+TEST_USER_ID = 987654321
+NUM_JOBS = 5
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def create_test_photo():
+    """Cria uma foto de teste em um diretório temporário."""
+    photo_path = os.path.join(tempfile.mkdtemp(), "test_photo.jpg")
+    Image.new('RGB', (640, 480), (120, 110, 100)).save(photo_path, 'JPEG')
+    return photo_path
+
+def test_job_order():
+    """Testa que os trabalhos de um mesmo usuário terminam na ordem de envio."""
+    print_header("Testando a ordem dos trabalhos por usuário")
+
+    service = PhotoService(1, timeout=60)
+    photo_path = create_test_photo()
+    finished = []
+
+    try:
+        jobs = []
+        for index in range(NUM_JOBS):
+            job = service.submit(TEST_USER_ID, 'analyze_photo', photo_path)
+            job.add_done_callback(lambda _, index=index: finished.append(index))
+            jobs.append(job)
+
+        results = [service.result(job) for job in jobs]
+        stats = service.get_stats()
+    finally:
+        service.shutdown()
+
+    print(f"Ordem de conclusão: {finished}")
+    print(f"Estatísticas: {stats}")
+
+    return (finished == list(range(NUM_JOBS)) and
+            all(result is not None for result in results) and
+            stats['pending'] == 0)
+
+def test_cancel_user():
+    """Testa o cancelamento de todos os trabalhos pendentes de um usuário."""
+    print_header("Testando o cancelamento dos trabalhos de um usuário")
+
+    service = PhotoService(1, timeout=60)
+    photo_path = create_test_photo()
+
+    try:
+        jobs = [service.submit(TEST_USER_ID, 'analyze_photo', photo_path) for _ in range(NUM_JOBS)]
+        cancelled = service.cancel_user(TEST_USER_ID)
+        results = [service.result(job) for job in jobs]
+        stats = service.get_stats()
+
+        # O serviço continua atendendo o usuário depois do cancelamento
+        after = service.result(service.submit(TEST_USER_ID, 'analyze_photo', photo_path))
+    finally:
+        service.shutdown()
+
+    print(f"Trabalhos cancelados: {cancelled} de {NUM_JOBS}")
+    print(f"Estatísticas: {stats}")
+    print(f"Análise após o cancelamento: {'OK' if after else 'falhou'}")
+
+    return (cancelled == NUM_JOBS and
+            all(result is None for result in results) and
+            stats['pending'] == 0 and
+            after is not None)
+
+def test_queue_limit():
+    """Testa a recusa de trabalhos quando a fila do serviço está cheia."""
+    print_header("Testando o limite de trabalhos pendentes")
+
+    service = PhotoService(1, timeout=60, max_pending=2)
+    photo_path = create_test_photo()
+
+    try:
+        jobs = [service.submit(TEST_USER_ID, 'analyze_photo', photo_path) for _ in range(3)]
+        rejected = service.get_stats()['rejected']
+        service.cancel_user(TEST_USER_ID)
+    finally:
+        service.shutdown()
+
+    print(f"Trabalhos aceitos: {sum(1 for job in jobs if job is not None)}, recusados: {rejected}")
+
+    return jobs[2] is None and rejected == 1
+
+class RejectingPhotoService(PhotoService):
+    """Serviço de fotos que recusa alguns envios, como se a fila estivesse cheia."""
+
+    def __init__(self, rejections):
+        super().__init__(0)
+        self.rejections = set(rejections)
+        self.submissions = 0
+
+    def submit(self, user_id, method, *args):
+        self.submissions += 1
+        if self.submissions in self.rejections:
+            return None
+        return super().submit(user_id, method, *args)
+
+def test_reanalysis_persistence():
+    """Testa que a reanálise salva as análises e reenvia as fotos recusadas."""
+    print_header("Testando a reanálise e a persistência das análises")
+
+    photo_path = create_test_photo()
+    photo_ids = [PhotoRepository.add_photo(TEST_USER_ID, photo_path) for _ in range(NUM_JOBS)]
+
+    # A terceira foto do primeiro lote é recusada e reenviada na tentativa seguinte
+    service = RejectingPhotoService(rejections={3})
+    metrics = reanalyze_photos(chunk_size=NUM_JOBS, service=service)
+    analyses = [PhotoRepository.get_analysis(photo_id, config.PHOTO_ANALYZER_VERSION) for photo_id in photo_ids]
+
+    # Com as análises salvas, uma nova execução não tem nada a refazer
+    second = reanalyze_photos(chunk_size=NUM_JOBS, service=PhotoService(0))
+
+    print(f"Métricas: {metrics}")
+    print(f"Análises salvas: {sum(1 for analysis in analyses if analysis)} de {NUM_JOBS}")
+    print(f"Fotos processadas na segunda execução: {second['processed']}")
+
+    for photo_id in photo_ids:
+        PhotoRepository.delete_photo(photo_id)
+
+    return (metrics['completed'] and
+            metrics['analyzed'] == NUM_JOBS and
+            metrics['failed'] == 0 and
+            all(analysis and analysis['analyzer_version'] == config.PHOTO_ANALYZER_VERSION
+                for analysis in analyses) and
+            second['processed'] == 0)
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DO SERVIÇO DE FOTOS DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "photo_service_test.db"))
+
+    results = {
+        "Ordem dos trabalhos por usuário": test_job_order(),
+        "Cancelamento dos trabalhos de um usuário": test_cancel_user(),
+        "Limite de trabalhos pendentes": test_queue_limit(),
+        "Reanálise e persistência das análises": test_reanalysis_persistence(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Testes do agendador de lembretes do NutriBot Evolve.
+Este script verifica, em um banco de dados temporário, que a roda de tempo
+dispara cada lembrete no seu minuto (inclusive os minutos perdidos), que as
+alterações dos lembretes são acompanhadas e que o balde de fichas limita a
+taxa de envio.
+"""
+
+import os
+import sys
+import time
+import datetime
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import db_manager
+from database.reminder_repository import ReminderRepository
+from utils.reminder_scheduler import ReminderScheduler, TokenBucket
+
+# Dados de teste
+TEST_USER_ID = 987654321
+TEST_DAY = datetime.datetime(2024, 1, 1)
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def at(hour, minute):
+    """Retorna o instante de teste no horário informado."""
+    return TEST_DAY.replace(hour=hour, minute=minute)
+
+def test_timing_wheel():
+    """Testa o disparo dos lembretes no minuto certo e o acompanhamento das alterações."""
+    print_header("Testando a roda de tempo dos lembretes")
+
+    sent = []
+    scheduler = ReminderScheduler(lambda user_id, reminder_type: sent.append((reminder_type, user_id)),
+                                  rate=1000, burst=100)
+
+    breakfast_id = ReminderRepository.set_reminder(TEST_USER_ID, 'cafe_da_manha', '08:00')
+    ReminderRepository.set_reminder(TEST_USER_ID, 'almoco', '12:30')
+    ReminderRepository.set_reminder(TEST_USER_ID, 'jantar', '19:00', is_active=False)
+
+    try:
+        loaded = scheduler.load()
+
+        scheduler.tick(at(7, 59))
+        before = list(sent)
+        scheduler.tick(at(8, 0))
+        at_breakfast = list(sent)
+
+        # Minutos perdidos entre duas verificações são recuperados
+        scheduler.tick(at(12, 35))
+        after_delay = list(sent)
+
+        # Alterações no banco de dados movem ou retiram os lembretes da roda
+        ReminderRepository.set_reminder(TEST_USER_ID, 'jantar', '13:00')
+        ReminderRepository.set_reminder_active(breakfast_id, False)
+        del sent[:]
+        scheduler.tick(at(13, 0))
+        after_change = list(sent)
+        remaining = len(scheduler.wheel)
+    finally:
+        scheduler.stop()
+        for reminder in ReminderRepository.get_reminders_by_user(TEST_USER_ID):
+            ReminderRepository.delete_reminder(reminder['id'])
+
+    print(f"Lembretes carregados: {loaded}")
+    print(f"Enviados às 08:00: {at_breakfast}")
+    print(f"Enviados até 12:35: {after_delay}")
+    print(f"Enviados às 13:00 após as alterações: {after_change}, lembretes na roda: {remaining}")
+
+    return (loaded == 2 and
+            before == [] and
+            at_breakfast == [('cafe_da_manha', TEST_USER_ID)] and
+            after_delay == [('cafe_da_manha', TEST_USER_ID), ('almoco', TEST_USER_ID)] and
+            after_change == [('jantar', TEST_USER_ID)] and
+            remaining == 2)
+
+def test_token_bucket():
+    """Testa que o balde de fichas permite a rajada inicial e depois limita a taxa."""
+    print_header("Testando o limite de taxa dos envios")
+
+    rate, capacity, total = 20, 5, 15
+    bucket = TokenBucket(rate, capacity)
+
+    start_time = time.perf_counter()
+    for _ in range(capacity):
+        bucket.acquire()
+    burst_elapsed = time.perf_counter() - start_time
+
+    for _ in range(total - capacity):
+        bucket.acquire()
+    elapsed = time.perf_counter() - start_time
+
+    # Depois da rajada, cada ficha leva 1 / rate segundos para ser reposta
+    expected = (total - capacity) / rate
+    print(f"Rajada de {capacity} envios: {burst_elapsed:.3f} s")
+    print(f"{total} envios: {elapsed:.3f} s (mínimo esperado: {expected:.3f} s)")
+
+    return burst_elapsed < 0.05 and expected * 0.9 <= elapsed < expected + 0.5
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DO AGENDADOR DE LEMBRETES DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "reminders_test.db"))
+
+    results = {
+        "Roda de tempo dos lembretes": test_timing_wheel(),
+        "Limite de taxa dos envios": test_token_bucket(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
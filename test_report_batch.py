@@ -0,0 +1,193 @@
+"""
+Testes da geração de relatórios em lote do NutriBot Evolve.
+Este script verifica, em um banco de dados temporário, que uma execução
+interrompida é retomada do último usuário concluído e que o progresso de um
+período já encerrado é descartado, além do prazo único na espera pelos gráficos
+e do instantâneo usado na atualização incremental dos relatórios.
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+import tempfile
+from concurrent.futures import Future
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import db_manager
+from database.user_repository import UserRepository
+from database.meal_repository import MealRepository
+from database.report_repository import ReportRepository
+from utils.report_data import ReportData
+from utils.report_batch import ReportBatch
+from utils.chart_renderer import ChartRenderer
+
+# Dados de teste
+TEST_USER_IDS = list(range(1001, 1008))
+
+class FakeReportGenerator:
+    """Gerador de relatórios que apenas registra os usuários atendidos."""
+
+    def __init__(self):
+        self.user_ids = []
+
+    def generate_weekly_report(self, user_id):
+        self.user_ids.append(user_id)
+        return {'charts': {'calories': f"/tmp/{user_id}.png"}}
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def create_test_users():
+    """Cria os usuários de teste com onboarding completo."""
+    for user_id in TEST_USER_IDS:
+        if UserRepository.get_user_by_id(user_id) is None:
+            UserRepository.create_user(user_id, full_name=f"Usuário {user_id}")
+            UserRepository.update_onboarding_status(user_id, True)
+
+def create_batch(checkpoint_path):
+    """Cria um lote semanal com o gerador de teste."""
+    return ReportBatch('weekly', chunk_size=2, workers=2, checkpoint_path=checkpoint_path,
+                       report_generator=FakeReportGenerator())
+
+def test_resume():
+    """Testa a retomada de uma execução interrompida."""
+    print_header("Testando a retomada da geração em lote")
+
+    create_test_users()
+    checkpoint_path = os.path.join(tempfile.mkdtemp(), "report_batch_weekly.json")
+
+    first = create_batch(checkpoint_path)
+    interrupted = first.run(max_users=3)
+    checkpoint = first.load_checkpoint()
+
+    second = create_batch(checkpoint_path)
+    resumed = second.run()
+
+    print(f"Primeira execução: {first.report_generator.user_ids}, concluída: {interrupted['completed']}")
+    print(f"Progresso salvo: último usuário {checkpoint and checkpoint['last_user_id']}")
+    print(f"Execução retomada: {second.report_generator.user_ids}, concluída: {resumed['completed']}")
+
+    return (not interrupted['completed'] and
+            checkpoint['last_user_id'] == TEST_USER_IDS[2] and
+            first.report_generator.user_ids + second.report_generator.user_ids == TEST_USER_IDS and
+            resumed['completed'] and resumed['processed'] == len(TEST_USER_IDS) and
+            not os.path.exists(checkpoint_path))
+
+def test_stale_checkpoint():
+    """Testa que o progresso de um período já encerrado não é retomado."""
+    print_header("Testando o descarte de progresso antigo")
+
+    create_test_users()
+    checkpoint_path = os.path.join(tempfile.mkdtemp(), "report_batch_weekly.json")
+
+    started_at = datetime.datetime.now() - ReportBatch.REPORT_PERIODS['weekly'] - datetime.timedelta(hours=1)
+    with open(checkpoint_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'report_type': 'weekly',
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'last_user_id': TEST_USER_IDS[-2],
+            'processed': len(TEST_USER_IDS) - 1,
+            'generated': len(TEST_USER_IDS) - 1,
+            'skipped': 0,
+            'failed': 0
+        }, f)
+
+    batch = create_batch(checkpoint_path)
+    metrics = batch.run()
+
+    print(f"Usuários processados: {batch.report_generator.user_ids}")
+    print(f"Métricas: processados {metrics['processed']}, concluída: {metrics['completed']}")
+
+    return (batch.report_generator.user_ids == TEST_USER_IDS and
+            metrics['processed'] == len(TEST_USER_IDS) and
+            metrics['completed'])
+
+def test_chart_wait_deadline():
+    """Testa que a espera pelos gráficos usa um único prazo para todos."""
+    print_header("Testando o prazo da espera pelos gráficos")
+
+    renderer = ChartRenderer(0, timeout=0.5)
+    done = Future()
+    done.set_result("/tmp/calorie_chart.png")
+    futures = {'calorie_chart': done, 'macro_chart': Future(), 'extra_chart': Future()}
+
+    start_time = time.perf_counter()
+    paths = renderer.wait(futures)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Caminhos: {paths}")
+    print(f"Espera: {elapsed:.2f} s (prazo de {renderer.timeout} s)")
+
+    return (paths == {'calorie_chart': "/tmp/calorie_chart.png", 'macro_chart': None, 'extra_chart': None} and
+            elapsed < 2 * renderer.timeout)
+
+def test_report_snapshot():
+    """Testa que o instantâneo guarda apenas os totais diários e basta para a atualização incremental."""
+    print_header("Testando o instantâneo dos relatórios")
+
+    user_id = TEST_USER_IDS[0]
+    end_date = datetime.date.today()
+    start_date = end_date - datetime.timedelta(days=6)
+
+    meal_ids = [MealRepository.add_meal(user_id, "almoco", "Teste", 500, 30, 60, 10,
+                                        meal_date=end_date - datetime.timedelta(days=offset))
+                for offset in (1, 3)]
+    try:
+        report_data = ReportData.load(user_id, start_date, end_date)
+        ReportRepository.save_snapshot(user_id, 'weekly', start_date, end_date,
+                                       report_data.to_days(), report_data.as_of)
+        row = db_manager.fetch_one("SELECT report_data FROM reports WHERE user_id = ? AND report_type = ?",
+                                   (user_id, 'weekly'))
+        payload = json.loads(row['report_data'])
+
+        # Uma refeição registrada depois do instantâneo entra na atualização incremental
+        meal_ids.append(MealRepository.add_meal(user_id, "jantar", "Teste", 700, 40, 80, 20, meal_date=end_date))
+        incremental = ReportData.load_incremental(user_id, 'weekly', start_date, end_date).to_days()
+        full = ReportData.load(user_id, start_date, end_date).to_days()
+    finally:
+        for meal_id in meal_ids:
+            MealRepository.delete_meal(meal_id)
+        db_manager.delete('reports', {'user_id': user_id})
+
+    print(f"Chaves do instantâneo: {sorted(payload)}")
+    print(f"Dias na atualização incremental: {sorted(incremental)}")
+    print(f"Dias na leitura completa: {sorted(full)}")
+
+    return list(payload) == ['days'] and len(payload['days']) == 2 and incremental == full and len(full) == 3
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DA GERAÇÃO DE RELATÓRIOS EM LOTE DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "report_batch_test.db"))
+
+    results = {
+        "Retomada da geração em lote": test_resume(),
+        "Descarte de progresso antigo": test_stale_checkpoint(),
+        "Prazo da espera pelos gráficos": test_chart_wait_deadline(),
+        "Instantâneo dos relatórios": test_report_snapshot(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
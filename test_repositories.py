@@ -0,0 +1,298 @@
+"""
+Testes dos repositórios e caches do NutriBot Evolve.
+Este script verifica, em um banco de dados temporário, a mesclagem de JSON
+das gravações atômicas, a invalidação dos caches de estados de conversação
+e de perfis de usuários e a independência das gravações de usuários
+diferentes, além do fechamento das conexões do catálogo de alimentos em
+SQLite quando ele é recarregado e da busca de alimentos nesse catálogo.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent))
+
+from database.db_manager import db_manager
+from database.user_repository import UserRepository
+from utils.conversation_manager import ConversationManager
+from utils.food_catalog import FoodCatalog, BASIC_FOOD_DATABASE
+from utils.food_catalog_sqlite import convert_json_to_sqlite
+
+# Dados de teste
+TEST_USER_ID = 987654321
+
+def print_header(message):
+    """Imprime um cabeçalho formatado."""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def test_upsert_json_merge():
+    """Testa a mesclagem do contexto por upsert, incluindo a remoção de chaves."""
+    print_header("Testando mesclagem de JSON no upsert")
+
+    ConversationManager.clear_state(TEST_USER_ID)
+
+    ConversationManager.transition(TEST_USER_ID, 'waiting_age', {'name': 'Ana', 'photo_path': '/tmp/a.jpg'})
+    ConversationManager.transition(TEST_USER_ID, 'waiting_gender', {'age': 30, 'photo_path': None})
+
+    # Lê do banco, e não do cache, para verificar o que foi gravado
+    ConversationManager.invalidate_cache(TEST_USER_ID)
+    conversation = ConversationManager.get_state(TEST_USER_ID)
+    print(f"Estado gravado: {conversation}")
+
+    ConversationManager.clear_state(TEST_USER_ID)
+
+    return (conversation is not None and
+            conversation['state'] == 'waiting_gender' and
+            conversation['context'] == {'name': 'Ana', 'age': 30})
+
+def write_during_read(write):
+    """
+    Substitui db_manager.fetch_one para executar uma gravação logo após a próxima leitura,
+    reproduzindo uma alteração concluída entre a leitura do banco e o preenchimento do cache.
+
+    Args:
+        write (callable): Gravação a executar
+
+    Returns:
+        callable: Função que restaura o fetch_one original
+    """
+    original = db_manager.fetch_one
+
+    def fetch_one(*args, **kwargs):
+        db_manager.fetch_one = original
+        row = original(*args, **kwargs)
+        write()
+        return row
+
+    db_manager.fetch_one = fetch_one
+    return lambda: setattr(db_manager, 'fetch_one', original)
+
+def test_state_cache_invalidation():
+    """Testa que um estado lido antes de uma gravação concorrente não fica no cache."""
+    print_header("Testando a invalidação do cache de estados")
+
+    ConversationManager.clear_state(TEST_USER_ID)
+    ConversationManager.set_state(TEST_USER_ID, 'waiting_name')
+    ConversationManager.invalidate_cache(TEST_USER_ID)
+
+    restore = write_during_read(lambda: ConversationManager.transition(TEST_USER_ID, 'waiting_age', {'name': 'Ana'}))
+    try:
+        during = ConversationManager.get_state(TEST_USER_ID)
+    finally:
+        restore()
+
+    after = ConversationManager.get_state(TEST_USER_ID)
+    print(f"Estado lido durante a gravação: {during}")
+    print(f"Estado lido depois da gravação: {after}")
+
+    ConversationManager.clear_state(TEST_USER_ID)
+    cleared = ConversationManager.get_state(TEST_USER_ID)
+    print(f"Estado depois de removido: {cleared}")
+
+    return (during['state'] == 'waiting_name' and
+            after == {'state': 'waiting_age', 'context': {'name': 'Ana'}} and
+            cleared is None)
+
+def test_user_cache_invalidation():
+    """Testa que um perfil lido antes de uma alteração concorrente não fica no cache."""
+    print_header("Testando a invalidação do cache de perfis")
+
+    db_manager.delete('users', {'user_id': TEST_USER_ID})
+    UserRepository.create_user(TEST_USER_ID, full_name='Ana')
+    UserRepository.invalidate_cache(TEST_USER_ID)
+
+    restore = write_during_read(lambda: UserRepository.update_user(TEST_USER_ID, {'full_name': 'Ana Souza'}))
+    try:
+        during = UserRepository.get_user_by_id(TEST_USER_ID)
+    finally:
+        restore()
+
+    after = UserRepository.get_user_by_id(TEST_USER_ID)
+    print(f"Nome lido durante a alteração: {during['full_name']}")
+    print(f"Nome lido depois da alteração: {after['full_name']}")
+
+    db_manager.delete('users', {'user_id': TEST_USER_ID})
+    UserRepository.invalidate_cache(TEST_USER_ID)
+
+    return during['full_name'] == 'Ana' and after['full_name'] == 'Ana Souza'
+
+def test_user_cache_query_error():
+    """Testa que um erro na consulta do perfil não é guardado como usuário inexistente."""
+    print_header("Testando o cache de perfis após um erro na consulta")
+
+    db_manager.delete('users', {'user_id': TEST_USER_ID})
+    UserRepository.create_user(TEST_USER_ID, full_name='Ana')
+    UserRepository.invalidate_cache(TEST_USER_ID)
+
+    original = db_manager.fetch_one
+
+    def failing_fetch_one(query, params=None, raise_errors=False):
+        if raise_errors:
+            raise sqlite3.OperationalError("database is locked")
+        return None
+
+    db_manager.fetch_one = failing_fetch_one
+    try:
+        during = UserRepository.get_user_by_id(TEST_USER_ID)
+    finally:
+        db_manager.fetch_one = original
+
+    after = UserRepository.get_user_by_id(TEST_USER_ID)
+    print(f"Perfil lido durante o erro: {during}")
+    print(f"Perfil lido depois do erro: {after and after['full_name']}")
+
+    db_manager.delete('users', {'user_id': TEST_USER_ID})
+    UserRepository.invalidate_cache(TEST_USER_ID)
+
+    return during is None and after is not None and after['full_name'] == 'Ana'
+
+def test_state_write_locks():
+    """Testa que a gravação do estado de um usuário não espera a de outro usuário."""
+    print_header("Testando os locks de gravação de estados")
+
+    other_user_id = TEST_USER_ID + 1
+    locked = threading.Event()
+    release = threading.Event()
+
+    # Uma gravação do usuário de teste em andamento mantém o lock dele
+    def hold_lock():
+        with ConversationManager._write_lock(TEST_USER_ID):
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+
+    writer = threading.Thread(target=ConversationManager.set_state, args=(other_user_id, 'waiting_name'))
+    writer.start()
+    writer.join(timeout=5)
+    independent = not writer.is_alive()
+
+    release.set()
+    holder.join()
+    writer.join()
+
+    state = ConversationManager.get_state(other_user_id)
+    ConversationManager.clear_state(other_user_id)
+
+    print(f"Gravação de outro usuário concluída com o lock ocupado: {independent}")
+    print(f"Estado gravado: {state}")
+
+    return independent and state == {'state': 'waiting_name', 'context': {}}
+
+def test_catalog_reload_closes_connections():
+    """Testa que a recarga do catálogo SQLite fecha as conexões com o arquivo anterior."""
+    print_header("Testando as conexões do catálogo de alimentos")
+
+    temp_dir = tempfile.mkdtemp()
+    json_path = os.path.join(temp_dir, "food_database.json")
+    db_path = os.path.join(temp_dir, "food_catalog.db")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(BASIC_FOOD_DATABASE, f, ensure_ascii=False)
+    convert_json_to_sqlite(json_path, db_path)
+
+    catalog = FoodCatalog(path=db_path, reload_interval=3600, backend='sqlite')
+    previous = catalog.snapshot()
+
+    # Uma thread que continua ativa depois de consultar o catálogo
+    queried = threading.Event()
+    finish = threading.Event()
+
+    def worker():
+        'arroz' in previous.foods
+        queried.set()
+        finish.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    queried.wait()
+    len(previous.foods)
+    before = len(previous.foods._connections)
+
+    # Substitui o arquivo e recarrega o catálogo
+    convert_json_to_sqlite(json_path, db_path)
+    current = catalog.reload()
+    after = len(previous.foods._connections)
+
+    # Quem ainda usa o catálogo anterior continua funcionando, sem manter conexões
+    still_readable = 'arroz' in previous.foods
+    after_use = len(previous.foods._connections)
+
+    finish.set()
+    thread.join()
+
+    print(f"Conexões do catálogo anterior: {before} antes da recarga, {after} depois, {after_use} após nova consulta")
+    print(f"Catálogo anterior ainda legível: {still_readable}, versão atual: {current.version}")
+
+    return (before == 2 and after == 0 and after_use == 0 and still_readable and
+            current.version != previous.version and 'arroz' in current.foods)
+
+def test_sqlite_catalog_matcher():
+    """Testa que o catálogo SQLite encontra os mesmos alimentos que o catálogo JSON."""
+    print_header("Testando o localizador de alimentos do catálogo SQLite")
+
+    temp_dir = tempfile.mkdtemp()
+    json_path = os.path.join(temp_dir, "food_database.json")
+    db_path = os.path.join(temp_dir, "food_catalog.db")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(BASIC_FOOD_DATABASE, f, ensure_ascii=False)
+    convert_json_to_sqlite(json_path, db_path)
+
+    json_matcher = FoodCatalog(path=json_path, reload_interval=3600, backend='json').snapshot().matcher
+    sqlite_matcher = FoodCatalog(path=db_path, reload_interval=3600, backend='sqlite').snapshot().matcher
+
+    texts = [
+        "almocei 100g de arroz, feijão (150g) e salada",
+        "2 fatias de pão com ovo e café",
+        "nada de comida aqui",
+    ]
+    success = not hasattr(sqlite_matcher, 'food_names')
+    for text in texts:
+        expected = json_matcher.find_all(text)
+        found = sqlite_matcher.find_all(text)
+        ok = found == expected
+        success = success and ok
+        print(f"{'✅' if ok else '❌'} {text!r}: {found}")
+
+    return success
+
+def main():
+    """Função principal para executar os testes."""
+    print_header("TESTES DE REPOSITÓRIOS DO NUTRIBOT EVOLVE")
+
+    # Usa um banco de dados temporário para não alterar os dados reais
+    db_manager.reopen(os.path.join(tempfile.mkdtemp(), "repositories_test.db"))
+
+    results = {
+        "Mesclagem de JSON no upsert": test_upsert_json_merge(),
+        "Invalidação do cache de estados": test_state_cache_invalidation(),
+        "Invalidação do cache de perfis": test_user_cache_invalidation(),
+        "Cache de perfis após erro na consulta": test_user_cache_query_error(),
+        "Locks de gravação de estados": test_state_write_locks(),
+        "Conexões do catálogo de alimentos": test_catalog_reload_closes_connections(),
+        "Localizador do catálogo SQLite": test_sqlite_catalog_matcher(),
+    }
+
+    print_header("RESUMO DOS TESTES")
+    for name, success in results.items():
+        print(f"{name}: {'✅ OK' if success else '❌ FALHA'}")
+
+    success = all(results.values())
+    if success:
+        print("\n✅ Todos os testes foram concluídos com sucesso!")
+    else:
+        print("\n❌ Alguns testes falharam. Verifique os logs para mais detalhes.")
+
+    return success
+
+if __name__ == "__main__":
+    main()
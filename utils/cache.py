@@ -0,0 +1,175 @@
+"""
+Cache em memória para o NutriBot Evolve.
+Fornece um cache LRU limitado, com expiração opcional e contadores de acertos,
+seguro para uso por várias threads.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Classe para armazenar resultados recentes com limite de tamanho e tempo de vida."""
+
+    # Valor retornado por get() quando a chave não está no cache
+    MISSING = object()
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        Inicializa o cache.
+
+        Args:
+            maxsize (int): Número máximo de entradas (as menos usadas são descartadas)
+            ttl (float, optional): Tempo de vida (s) de cada entrada (None = sem expiração)
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Leituras da origem em andamento (ver reserve): chave -> ficha da reserva
+        self._reservations = {}
+        self._next_reservation = 0
+
+        # Contadores para acompanhamento da taxa de acertos
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def get(self, key, default=MISSING):
+        """
+        Busca um valor no cache, marcando-o como usado recentemente.
+
+        Args:
+            key: Chave do valor
+            default: Valor retornado se a chave não existir ou tiver expirado
+
+        Returns:
+            O valor armazenado ou default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._data.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+
+                del self._data[key]
+                self.stats['expirations'] += 1
+
+            self.stats['misses'] += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Armazena um valor no cache.
+
+        Args:
+            key: Chave do valor
+            value: Valor a armazenar
+            ttl (float, optional): Tempo de vida (s) desta entrada (padrão: ttl do cache)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            # Um valor gravado agora é mais novo que o de qualquer leitura reservada antes
+            self._reservations.pop(key, None)
+            self._store(key, value, expires_at)
+
+    def _store(self, key, value, expires_at):
+        """Armazena uma entrada, descartando as menos usadas (chamado com o lock)."""
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def reserve(self, key):
+        """
+        Reserva o preenchimento de uma chave antes de ler o valor da origem.
+
+        Se a chave for alterada ou removida do cache enquanto a leitura está em
+        andamento, a reserva é cancelada e set_reserved() descarta o valor lido,
+        que pode ser anterior à alteração.
+
+        Args:
+            key: Chave do valor
+
+        Returns:
+            int: Ficha da reserva, a ser passada para set_reserved()
+        """
+        with self._lock:
+            self._next_reservation += 1
+            self._reservations[key] = self._next_reservation
+            return self._next_reservation
+
+    def set_reserved(self, key, value, reservation, ttl=None):
+        """
+        Armazena um valor lido da origem, se a reserva ainda for válida.
+
+        Args:
+            key: Chave do valor
+            value: Valor a armazenar
+            reservation (int): Ficha devolvida por reserve()
+            ttl (float, optional): Tempo de vida (s) desta entrada (padrão: ttl do cache)
+
+        Returns:
+            bool: True se o valor foi armazenado
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if self._reservations.get(key) != reservation:
+                return False
+            del self._reservations[key]
+            self._store(key, value, expires_at)
+            return True
+
+    def delete(self, key):
+        """
+        Remove uma entrada do cache.
+
+        Args:
+            key: Chave do valor
+
+        Returns:
+            bool: True se a entrada existia
+        """
+        with self._lock:
+            self._reservations.pop(key, None)
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        """Remove todas as entradas do cache (os contadores são mantidos)."""
+        with self._lock:
+            self._reservations.clear()
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self):
+        """
+        Retorna estatísticas do cache.
+
+        Returns:
+            dict: Acertos, falhas, descartes, tamanho e taxa de acertos
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._data)
+            stats['maxsize'] = self.maxsize
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0
+        return stats
@@ -0,0 +1,239 @@
+"""
+Renderização de gráficos para o NutriBot Evolve.
+Desenha os gráficos dos relatórios com a API orientada a objetos do matplotlib
+(Figure + canvas Agg, sem o estado global do pyplot) em um pool de processos
+com o matplotlib já carregado, fora das threads que atendem as mensagens.
+"""
+
+import io
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, wait as wait_futures
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+
+
+def _new_figure():
+    """
+    Cria uma figura independente com canvas Agg.
+
+    Returns:
+        matplotlib.figure.Figure: Figura pronta para desenho
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _save(figure, chart_path):
+    """
+    Grava a figura de forma atômica (outros leitores nunca veem um arquivo parcial).
+
+    Args:
+        figure (matplotlib.figure.Figure): Figura desenhada
+        chart_path (str): Caminho do arquivo PNG de destino
+    """
+    temp_path = f"{chart_path}.{os.getpid()}.tmp"
+    figure.savefig(temp_path, format='png')
+    os.replace(temp_path, chart_path)
+
+
+def _warm_up():
+    """Carrega o matplotlib e o cache de fontes no processo de renderização."""
+    figure = _new_figure()
+    axes = figure.add_subplot()
+    axes.plot([0, 1], [0, 1], label='aquecimento')
+    axes.set_title('Aquecimento')
+    axes.legend()
+    figure.savefig(io.BytesIO(), format='png')
+
+
+def render_calorie_chart(chart_path, labels, calories, daily_target):
+    """
+    Desenha o gráfico de consumo calórico diário.
+
+    Args:
+        chart_path (str): Caminho do arquivo PNG de destino
+        labels (list): Rótulos dos dias
+        calories (list): Calorias consumidas por dia
+        daily_target (float): Meta calórica diária
+
+    Returns:
+        str: Caminho do arquivo gerado
+    """
+    figure = _new_figure()
+    axes = figure.add_subplot()
+
+    # Barras de calorias e linha da meta
+    axes.bar(labels, calories, color='#4CAF50', alpha=0.7, label='Calorias consumidas')
+    axes.plot(labels, [daily_target] * len(labels), 'r--', label='Meta diária')
+
+    # Configura o layout
+    axes.set_title('Consumo Calórico Diário')
+    axes.set_xlabel('Data')
+    axes.set_ylabel('Calorias')
+    axes.legend()
+    axes.grid(axis='y', linestyle='--', alpha=0.7)
+    axes.tick_params(axis='x', labelrotation=45)
+    figure.tight_layout()
+
+    _save(figure, chart_path)
+    return chart_path
+
+
+def render_macro_chart(chart_path, labels, protein, carbs, fat):
+    """
+    Desenha o gráfico de consumo de macronutrientes.
+
+    Args:
+        chart_path (str): Caminho do arquivo PNG de destino
+        labels (list): Rótulos dos dias
+        protein (list): Proteínas (g) por dia
+        carbs (list): Carboidratos (g) por dia
+        fat (list): Gorduras (g) por dia
+
+    Returns:
+        str: Caminho do arquivo gerado
+    """
+    figure = _new_figure()
+    axes = figure.add_subplot()
+
+    # Linhas de cada macronutriente
+    axes.plot(labels, protein, 'b-', marker='o', label='Proteínas (g)')
+    axes.plot(labels, carbs, 'g-', marker='s', label='Carboidratos (g)')
+    axes.plot(labels, fat, 'r-', marker='^', label='Gorduras (g)')
+
+    # Configura o layout
+    axes.set_title('Consumo de Macronutrientes')
+    axes.set_xlabel('Data')
+    axes.set_ylabel('Gramas')
+    axes.legend()
+    axes.grid(linestyle='--', alpha=0.7)
+    axes.tick_params(axis='x', labelrotation=45)
+    figure.tight_layout()
+
+    _save(figure, chart_path)
+    return chart_path
+
+
+class ChartRenderer:
+    """Classe para renderizar gráficos em um pool de processos dedicado."""
+
+    def __init__(self, max_workers, timeout=None):
+        """
+        Inicializa o renderizador (o pool é criado sob demanda).
+
+        Args:
+            max_workers (int): Número de processos de renderização (0 = renderiza na thread chamadora)
+            timeout (float, optional): Tempo máximo (s) de espera por um gráfico em wait()
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """
+        Cria o pool de processos na primeira utilização.
+
+        Returns:
+            ProcessPoolExecutor: Pool de processos de renderização
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # "spawn": os processos não herdam as threads e conexões do bot
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_warm_up
+                    )
+        return self._executor
+
+    def start(self):
+        """Cria os processos de renderização antecipadamente, já com o matplotlib carregado."""
+        if self.max_workers > 0:
+            executor = self._get_executor()
+            for future in [executor.submit(_warm_up) for _ in range(self.max_workers)]:
+                future.result()
+
+    def submit(self, render_func, *args):
+        """
+        Agenda a renderização de um gráfico.
+
+        Args:
+            render_func (callable): Função de desenho (ex.: render_calorie_chart)
+            *args: Argumentos da função (serializáveis entre processos)
+
+        Returns:
+            concurrent.futures.Future: Futuro com o caminho do arquivo gerado
+        """
+        if self.max_workers > 0:
+            return self._get_executor().submit(render_func, *args)
+
+        # Sem pool: a API orientada a objetos também é segura entre threads
+        future = Future()
+        try:
+            future.set_result(render_func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def wait(self, futures):
+        """
+        Aguarda um conjunto de gráficos, com um único prazo (timeout) para todos.
+
+        Args:
+            futures (dict): Nome do gráfico -> futuro retornado por submit()
+
+        Returns:
+            dict: Nome do gráfico -> caminho do arquivo ou None em caso de erro
+        """
+        wait_futures(futures.values(), timeout=self.timeout)
+
+        paths = {}
+        for name, future in futures.items():
+            if not future.done():
+                # Só remove da fila os gráficos ainda não iniciados; um gráfico já em
+                # desenho não pode ser interrompido e termina no processo de trabalho
+                future.cancel()
+                print(f"Tempo esgotado ao gerar o gráfico {name}")
+                paths[name] = None
+                continue
+
+            try:
+                paths[name] = future.result()
+            except Exception as e:
+                print(f"Erro ao gerar o gráfico {name}: {e}")
+                paths[name] = None
+        return paths
+
+    def shutdown(self, wait=True):
+        """
+        Encerra o pool de processos.
+
+        Args:
+            wait (bool): Se True, aguarda os gráficos em andamento
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            # cancel_futures (descartar os gráficos na fila) só existe a partir do Python 3.9
+            if sys.version_info >= (3, 9):
+                executor.shutdown(wait=wait, cancel_futures=not wait)
+            else:
+                executor.shutdown(wait=wait)
+
+
+# Instância global do renderizador de gráficos
+chart_renderer = ChartRenderer(config.CHART_RENDER_WORKERS, timeout=config.CHART_RENDER_TIMEOUT)
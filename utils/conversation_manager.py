@@ -4,13 +4,18 @@ Responsável por controlar o fluxo de onboarding e outras conversações.
 """
 
 import sys
+import copy
 import json
 import datetime
+import threading
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
+import config
 from database.db_manager import db_manager
+from database.async_executor import async_method
+from utils.cache import LRUCache
 
 class ConversationManager:
     """Classe para gerenciar estados de conversação."""
@@ -29,6 +34,32 @@ class ConversationManager:
         'COMPLETED': 'completed'
     }
     
+    # Cache em memória dos estados, gravado no banco a cada alteração (write-through).
+    # Conversas abandonadas expiram pelo TTL; o banco continua sendo a fonte definitiva.
+    _state_cache = LRUCache(config.CONVERSATION_CACHE_SIZE, config.CONVERSATION_CACHE_TTL)
+    
+    # Marca usuários sem estado salvo, evitando consultar o banco a cada mensagem
+    _NO_STATE = object()
+    
+    # Mantém a ordem entre a gravação no banco e a atualização do cache de cada usuário.
+    # Os locks são divididos por user_id, para que gravações de usuários diferentes
+    # cheguem juntas à fila de escrita e sejam confirmadas no mesmo commit
+    _WRITE_LOCK_STRIPES = 64
+    _write_locks = [threading.RLock() for _ in range(_WRITE_LOCK_STRIPES)]
+    
+    @staticmethod
+    def _write_lock(user_id):
+        """
+        Retorna o lock que ordena as gravações de um usuário.
+        
+        Args:
+            user_id (int): ID do usuário no Telegram
+            
+        Returns:
+            threading.RLock: Lock compartilhado pelos usuários da mesma faixa
+        """
+        return ConversationManager._write_locks[hash(user_id) % ConversationManager._WRITE_LOCK_STRIPES]
+    
     @staticmethod
     def get_state(user_id):
         """
@@ -40,18 +71,81 @@ class ConversationManager:
         Returns:
             dict: Estado atual e contexto ou None se não existir
         """
+        cached = ConversationManager._state_cache.get(user_id)
+        if cached is ConversationManager._NO_STATE:
+            return None
+        if cached is not LRUCache.MISSING:
+            # Cópia para que alterações no contexto não afetem o cache
+            return copy.deepcopy(cached)
+        
+        # Uma gravação concluída durante a leitura cancela a reserva, e o registro
+        # lido (possivelmente anterior a ela) não é guardado no cache
+        reservation = ConversationManager._state_cache.reserve(user_id)
+        
         query = "SELECT * FROM conversation_states WHERE user_id = ?"
         result = db_manager.fetch_one(query, (user_id,))
         
         if result:
             # Converte o contexto de JSON para dicionário
             context = json.loads(result['context']) if result['context'] else {}
-            return {
+            conversation = {
                 'state': result['state'],
                 'context': context
             }
+            ConversationManager._state_cache.set_reserved(user_id, conversation, reservation)
+            return copy.deepcopy(conversation)
+        
+        ConversationManager._state_cache.set_reserved(user_id, ConversationManager._NO_STATE, reservation)
         return None
     
+    @staticmethod
+    def _cache_row(user_id, row):
+        """
+        Atualiza o cache com o registro retornado por uma gravação no banco.
+        
+        Args:
+            user_id (int): ID do usuário no Telegram
+            row (sqlite3.Row): Registro gravado ou None se a gravação falhou
+            
+        Returns:
+            bool: True se a gravação foi bem-sucedida
+        """
+        if row is None:
+            # Em caso de falha, a próxima leitura consulta o banco
+            ConversationManager.invalidate_cache(user_id)
+            return False
+        
+        ConversationManager._state_cache.set(user_id, {
+            'state': row['state'],
+            'context': json.loads(row['context']) if row['context'] else {}
+        })
+        return True
+    
+    @staticmethod
+    def invalidate_cache(user_id=None):
+        """
+        Descarta o estado em cache, forçando a próxima leitura a consultar o banco.
+        
+        Deve ser chamado quando conversation_states é alterada fora do ConversationManager.
+        
+        Args:
+            user_id (int, optional): ID do usuário no Telegram (padrão: todos os usuários)
+        """
+        if user_id is None:
+            ConversationManager._state_cache.clear()
+        else:
+            ConversationManager._state_cache.delete(user_id)
+    
+    @staticmethod
+    def get_cache_stats():
+        """
+        Retorna estatísticas do cache de estados.
+        
+        Returns:
+            dict: Acertos, falhas, tamanho e taxa de acertos
+        """
+        return ConversationManager._state_cache.get_stats()
+    
     @staticmethod
     def set_state(user_id, state, context=None):
         """
@@ -70,35 +164,26 @@ class ConversationManager:
         # Converte o contexto para JSON
         context_json = json.dumps(context) if context else None
         
-        # Verifica se o usuário já tem um estado
-        current_state = ConversationManager.get_state(user_id)
+        data = {
+            'user_id': user_id,
+            'state': state,
+            'context': context_json,
+            'updated_at': now
+        }
         
-        if current_state:
-            # Atualiza o estado existente
-            data = {
-                'state': state,
-                'context': context_json,
-                'updated_at': now
-            }
-            condition = {'user_id': user_id}
-            rows_updated = db_manager.update('conversation_states', data, condition)
-            return rows_updated > 0
-        else:
-            # Cria um novo estado
-            data = {
-                'user_id': user_id,
-                'state': state,
-                'context': context_json,
-                'updated_at': now
-            }
-            result = db_manager.insert('conversation_states', data)
-            return result is not None
+        with ConversationManager._write_lock(user_id):
+            # Cria ou substitui o estado em uma única instrução
+            row = db_manager.upsert('conversation_states', data, ['user_id'])
+            return ConversationManager._cache_row(user_id, row)
     
     @staticmethod
     def update_context(user_id, new_context_data):
         """
         Atualiza o contexto da conversação de um usuário.
         
+        A mesclagem é feita pelo SQLite (json_patch) em uma única instrução;
+        chaves com valor None são removidas do contexto.
+        
         Args:
             user_id (int): ID do usuário no Telegram
             new_context_data (dict): Novos dados de contexto
@@ -106,17 +191,47 @@ class ConversationManager:
         Returns:
             bool: True se bem-sucedido, False caso contrário
         """
-        current_state = ConversationManager.get_state(user_id)
+        with ConversationManager._write_lock(user_id):
+            row = db_manager.merge_json(
+                'conversation_states', 'context', new_context_data,
+                condition={'user_id': user_id},
+                data={'updated_at': datetime.datetime.now()}
+            )
+            
+            if row is None:
+                # Usuário sem estado (ou erro): a próxima leitura consulta o banco
+                ConversationManager.invalidate_cache(user_id)
+                return False
+            
+            return ConversationManager._cache_row(user_id, row)
+    
+    @staticmethod
+    def transition(user_id, state, context_patch=None):
+        """
+        Avança a conversação para um novo estado mesclando dados ao contexto.
         
-        if not current_state:
-            return False
+        Estado e contexto são gravados em uma única instrução atômica
+        (INSERT ... ON CONFLICT DO UPDATE com json_patch), de modo que mensagens
+        simultâneas do mesmo usuário não sobrescrevem os dados uma da outra.
         
-        # Mescla o contexto atual com os novos dados
-        context = current_state['context'] or {}
-        context.update(new_context_data)
+        Args:
+            user_id (int): ID do usuário no Telegram
+            state (str): Novo estado
+            context_patch (dict, optional): Dados a mesclar no contexto atual
+            
+        Returns:
+            bool: True se bem-sucedido, False caso contrário
+        """
+        data = {
+            'user_id': user_id,
+            'state': state,
+            'context': context_patch or {},
+            'updated_at': datetime.datetime.now()
+        }
         
-        # Atualiza o estado com o novo contexto
-        return ConversationManager.set_state(user_id, current_state['state'], context)
+        with ConversationManager._write_lock(user_id):
+            row = db_manager.upsert('conversation_states', data, ['user_id'], json_merge_columns=('context',))
+            return ConversationManager._cache_row(user_id, row)
     
     @staticmethod
     def clear_state(user_id):
@@ -130,7 +245,10 @@ class ConversationManager:
             bool: True se bem-sucedido, False caso contrário
         """
         condition = {'user_id': user_id}
-        rows_deleted = db_manager.delete('conversation_states', condition)
+        with ConversationManager._write_lock(user_id):
+            rows_deleted = db_manager.delete('conversation_states', condition)
+            # O usuário fica sem estado; em caso de erro, a próxima leitura consulta o banco
+            ConversationManager.invalidate_cache(user_id)
         return rows_deleted > 0
     
     @staticmethod
@@ -166,3 +284,15 @@ class ConversationManager:
         except ValueError:
             # Se o estado atual não estiver na sequência, retorna o estado inicial
             return ConversationManager.STATES['INITIAL']
+
+
+class AsyncConversationManager:
+    """Versão assíncrona do ConversationManager, para os handlers do python-telegram-bot v20."""
+    
+    STATES = ConversationManager.STATES
+    
+    get_state = async_method(ConversationManager.get_state)
+    set_state = async_method(ConversationManager.set_state)
+    update_context = async_method(ConversationManager.update_context)
+    transition = async_method(ConversationManager.transition)
+    clear_state = async_method(ConversationManager.clear_state)
@@ -0,0 +1,452 @@
+"""
+Catálogo de alimentos compartilhado para o NutriBot Evolve.
+Carrega o banco de dados de alimentos uma única vez por processo, em um
+instantâneo imutável, e o recarrega de forma atômica quando o arquivo muda.
+Os alimentos podem vir do arquivo JSON (carregado inteiro em memória) ou do
+catálogo SQLite (consultado por nome sob demanda), conforme FOOD_CATALOG_BACKEND.
+"""
+
+import os
+import sys
+import json
+import itertools
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from utils.food_matcher import FoodMatcher
+from utils.food_catalog_sqlite import SQLiteFoodMapping, SQLiteFoodMatcher, convert_json_to_sqlite
+
+# Caminho padrão do banco de dados de alimentos
+FOOD_DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                  'resources', 'food_database.json')
+
+# Caminho padrão do catálogo SQLite, gerado a partir do arquivo JSON
+FOOD_CATALOG_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                        'resources', 'food_catalog.db')
+
+# Versões dos instantâneos, únicas entre todos os catálogos do processo
+_snapshot_versions = itertools.count(1)
+
+# Banco de dados básico de alimentos, gravado quando o arquivo não existe
+BASIC_FOOD_DATABASE = {
+    "arroz": {
+        "calorias": 130,
+        "proteinas": 2.7,
+        "carboidratos": 28.2,
+        "gorduras": 0.3,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "feijão": {
+        "calorias": 77,
+        "proteinas": 5.0,
+        "carboidratos": 13.6,
+        "gorduras": 0.5,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "frango": {
+        "calorias": 165,
+        "proteinas": 31.0,
+        "carboidratos": 0.0,
+        "gorduras": 3.6,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "carne": {
+        "calorias": 250,
+        "proteinas": 26.0,
+        "carboidratos": 0.0,
+        "gorduras": 17.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "peixe": {
+        "calorias": 140,
+        "proteinas": 20.0,
+        "carboidratos": 0.0,
+        "gorduras": 6.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "ovo": {
+        "calorias": 155,
+        "proteinas": 13.0,
+        "carboidratos": 1.1,
+        "gorduras": 11.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "leite": {
+        "calorias": 42,
+        "proteinas": 3.4,
+        "carboidratos": 5.0,
+        "gorduras": 1.0,
+        "porcao": 100,
+        "unidade": "ml"
+    },
+    "pão": {
+        "calorias": 265,
+        "proteinas": 9.0,
+        "carboidratos": 49.0,
+        "gorduras": 3.2,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "maçã": {
+        "calorias": 52,
+        "proteinas": 0.3,
+        "carboidratos": 14.0,
+        "gorduras": 0.2,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "banana": {
+        "calorias": 89,
+        "proteinas": 1.1,
+        "carboidratos": 22.8,
+        "gorduras": 0.3,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "laranja": {
+        "calorias": 47,
+        "proteinas": 0.9,
+        "carboidratos": 11.8,
+        "gorduras": 0.1,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "alface": {
+        "calorias": 15,
+        "proteinas": 1.4,
+        "carboidratos": 2.9,
+        "gorduras": 0.2,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "tomate": {
+        "calorias": 18,
+        "proteinas": 0.9,
+        "carboidratos": 3.9,
+        "gorduras": 0.2,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "cenoura": {
+        "calorias": 41,
+        "proteinas": 0.9,
+        "carboidratos": 9.6,
+        "gorduras": 0.2,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "batata": {
+        "calorias": 77,
+        "proteinas": 2.0,
+        "carboidratos": 17.0,
+        "gorduras": 0.1,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "azeite": {
+        "calorias": 884,
+        "proteinas": 0.0,
+        "carboidratos": 0.0,
+        "gorduras": 100.0,
+        "porcao": 100,
+        "unidade": "ml"
+    },
+    "manteiga": {
+        "calorias": 717,
+        "proteinas": 0.9,
+        "carboidratos": 0.1,
+        "gorduras": 81.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "queijo": {
+        "calorias": 350,
+        "proteinas": 25.0,
+        "carboidratos": 2.0,
+        "gorduras": 27.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "iogurte": {
+        "calorias": 59,
+        "proteinas": 3.5,
+        "carboidratos": 4.7,
+        "gorduras": 3.3,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "chocolate": {
+        "calorias": 546,
+        "proteinas": 4.9,
+        "carboidratos": 61.0,
+        "gorduras": 31.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "refrigerante": {
+        "calorias": 42,
+        "proteinas": 0.0,
+        "carboidratos": 10.6,
+        "gorduras": 0.0,
+        "porcao": 100,
+        "unidade": "ml"
+    },
+    "suco": {
+        "calorias": 45,
+        "proteinas": 0.5,
+        "carboidratos": 10.0,
+        "gorduras": 0.1,
+        "porcao": 100,
+        "unidade": "ml"
+    },
+    "café": {
+        "calorias": 2,
+        "proteinas": 0.1,
+        "carboidratos": 0.0,
+        "gorduras": 0.0,
+        "porcao": 100,
+        "unidade": "ml"
+    },
+    "açúcar": {
+        "calorias": 387,
+        "proteinas": 0.0,
+        "carboidratos": 100.0,
+        "gorduras": 0.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "sal": {
+        "calorias": 0,
+        "proteinas": 0.0,
+        "carboidratos": 0.0,
+        "gorduras": 0.0,
+        "porcao": 100,
+        "unidade": "g"
+    },
+    "salada": {
+        "calorias": 20,
+        "proteinas": 1.5,
+        "carboidratos": 3.0,
+        "gorduras": 0.3,
+        "porcao": 100,
+        "unidade": "g"
+    }
+}
+
+
+class FoodCatalogSnapshot:
+    """Versão imutável do catálogo de alimentos carregada em memória."""
+
+    __slots__ = ('foods', 'matcher', 'version', 'mtime')
+
+    def __init__(self, foods, version, mtime):
+        """
+        Inicializa o instantâneo do catálogo.
+
+        Args:
+            foods (Mapping): Alimentos indexados pelo nome (somente leitura)
+            version (int): Número sequencial da carga
+            mtime (int): Data de modificação (ns) do arquivo carregado (None se não houver arquivo)
+        """
+        # Somente leitura: o mesmo instantâneo é compartilhado por todas as threads
+        self.foods = foods
+        # No SQLite, os nomes são consultados a cada texto em vez de compilados em memória
+        if isinstance(foods, SQLiteFoodMapping):
+            self.matcher = SQLiteFoodMatcher(foods)
+        else:
+            self.matcher = FoodMatcher(self.foods.keys())
+        self.version = version
+        self.mtime = mtime
+
+
+class FoodCatalog:
+    """Classe para compartilhar o banco de dados de alimentos entre todos os analisadores."""
+
+    def __init__(self, path=None, reload_interval=None, backend=None):
+        """
+        Inicializa o catálogo sem carregar o arquivo (a carga ocorre no primeiro uso).
+
+        Args:
+            path (str, optional): Caminho do arquivo de alimentos (JSON ou SQLite, conforme o backend)
+            reload_interval (float, optional): Intervalo mínimo (s) entre verificações do arquivo
+            backend (str, optional): "json" ou "sqlite" (padrão: config.FOOD_CATALOG_BACKEND)
+        """
+        self.backend = backend or config.FOOD_CATALOG_BACKEND
+        if self.backend not in ('json', 'sqlite'):
+            raise ValueError(f"Backend de catálogo de alimentos desconhecido: {self.backend}")
+
+        self.path = path or (FOOD_CATALOG_SQLITE_PATH if self.backend == 'sqlite' else FOOD_DATABASE_PATH)
+        self.reload_interval = config.FOOD_CATALOG_RELOAD_INTERVAL if reload_interval is None else reload_interval
+
+        self._snapshot = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+        self._reload_listeners = []
+
+    def _get_mtime(self):
+        """
+        Retorna a data de modificação do arquivo de alimentos.
+
+        Returns:
+            int: mtime (ns) do arquivo ou None se ele não existir
+        """
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _create_basic_food_database(json_path):
+        """
+        Cria o arquivo de alimentos com o banco de dados básico.
+
+        Args:
+            json_path (str): Caminho do arquivo JSON a criar
+        """
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+
+        # Grava em um arquivo temporário para que outro processo nunca leia um JSON incompleto
+        temp_path = f"{json_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(BASIC_FOOD_DATABASE, file, ensure_ascii=False, indent=4)
+        os.replace(temp_path, json_path)
+
+    def _read_foods(self):
+        """
+        Abre a fonte de alimentos conforme o backend configurado.
+
+        Returns:
+            Mapping: Alimentos indexados pelo nome (somente leitura)
+        """
+        if self.backend == 'sqlite':
+            if not os.path.exists(self.path):
+                # Primeira execução: gera o catálogo a partir do arquivo JSON
+                if not os.path.exists(FOOD_DATABASE_PATH):
+                    self._create_basic_food_database(FOOD_DATABASE_PATH)
+                convert_json_to_sqlite(FOOD_DATABASE_PATH, self.path)
+            return SQLiteFoodMapping(self.path)
+
+        if not os.path.exists(self.path):
+            self._create_basic_food_database(self.path)
+
+        with open(self.path, 'r', encoding='utf-8') as file:
+            foods = json.load(file)
+        return MappingProxyType({name: MappingProxyType(dict(info)) for name, info in foods.items()})
+
+    def _load(self):
+        """
+        Lê o arquivo de alimentos e monta um novo instantâneo.
+
+        Returns:
+            FoodCatalogSnapshot: Instantâneo carregado ou None em caso de erro
+        """
+        try:
+            # mtime lido antes do conteúdo: uma alteração durante a leitura gera nova recarga
+            mtime = self._get_mtime()
+            foods = self._read_foods()
+            if mtime is None:
+                mtime = self._get_mtime()
+            return FoodCatalogSnapshot(foods, next(_snapshot_versions), mtime)
+        except Exception as e:
+            print(f"Erro ao carregar banco de dados de alimentos: {e}")
+            return None
+
+    def _swap(self, new_snapshot):
+        """
+        Publica um novo instantâneo e avisa os interessados na recarga.
+
+        Args:
+            new_snapshot (FoodCatalogSnapshot): Instantâneo recém-carregado
+        """
+        previous = self._snapshot
+        self._snapshot = new_snapshot
+
+        if previous is not None:
+            # As conexões do catálogo anterior manteriam aberto o arquivo substituído
+            if isinstance(previous.foods, SQLiteFoodMapping):
+                previous.foods.close()
+
+            for listener in self._reload_listeners:
+                listener(new_snapshot)
+
+    def add_reload_listener(self, listener):
+        """
+        Registra uma função chamada sempre que o catálogo é recarregado.
+
+        Args:
+            listener (callable): Função que recebe o novo FoodCatalogSnapshot
+        """
+        with self._lock:
+            self._reload_listeners.append(listener)
+
+    def snapshot(self):
+        """
+        Retorna o instantâneo atual do catálogo, carregando ou recarregando se necessário.
+
+        O arquivo é verificado no máximo uma vez a cada reload_interval segundos.
+        A troca do instantâneo é uma única atribuição, de modo que quem já obteve
+        o anterior continua usando-o até terminar.
+
+        Returns:
+            FoodCatalogSnapshot: Catálogo em uso
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() < self._next_check:
+                return snapshot
+
+            self._next_check = time.monotonic() + self.reload_interval
+
+            if snapshot is None or self._get_mtime() != snapshot.mtime:
+                new_snapshot = self._load()
+                if new_snapshot is not None:
+                    self._swap(new_snapshot)
+                elif snapshot is None:
+                    # Sem arquivo válido: usa um catálogo vazio até a próxima verificação
+                    self._snapshot = FoodCatalogSnapshot(MappingProxyType({}), 0, None)
+
+            return self._snapshot
+
+    def reload(self):
+        """
+        Força a releitura do arquivo de alimentos.
+
+        Returns:
+            FoodCatalogSnapshot: Catálogo em uso após a recarga
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            new_snapshot = self._load()
+            if new_snapshot is not None:
+                self._swap(new_snapshot)
+
+        return self.snapshot()
+
+    @property
+    def foods(self):
+        """Alimentos do catálogo atual (somente leitura)."""
+        return self.snapshot().foods
+
+    @property
+    def version(self):
+        """Versão do catálogo atual."""
+        return self.snapshot().version
+
+
+# Instância global do catálogo de alimentos
+food_catalog = FoodCatalog()
@@ -0,0 +1,242 @@
+"""
+Armazenamento do catálogo de alimentos em SQLite para o NutriBot Evolve.
+Mantém os alimentos em uma tabela indexada pelo nome, de modo que cada
+processo lê do disco (via memória mapeada, compartilhada pelo sistema
+operacional) apenas os alimentos que consulta, em vez de carregar a tabela
+inteira em um dicionário.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import contextlib
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+from utils.food_matcher import FoodMatcher
+
+# Campos obrigatórios de cada alimento, armazenados em colunas próprias
+FOOD_COLUMNS = ('calorias', 'proteinas', 'carboidratos', 'gorduras', 'porcao', 'unidade')
+
+# Tamanho máximo (bytes) do arquivo mapeado em memória por conexão
+CATALOG_MMAP_SIZE = 268435456
+
+
+class SQLiteFoodMapping(Mapping):
+    """Dicionário somente leitura de alimentos consultado diretamente no SQLite."""
+
+    def __init__(self, db_path):
+        """
+        Inicializa o acesso ao catálogo (as conexões são abertas sob demanda).
+
+        Args:
+            db_path (str): Caminho do arquivo SQLite do catálogo
+        """
+        self.db_path = db_path
+        self._uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._local = threading.local()
+
+        # Conexões abertas (thread -> conexão) e as que estão executando uma consulta
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._busy = set()
+        self._closed = False
+
+    @contextlib.contextmanager
+    def _connection(self):
+        """
+        Empresta a conexão somente leitura da thread atual durante uma consulta.
+
+        Depois de close(), a conexão é fechada ao fim da consulta.
+
+        Yields:
+            sqlite3.Connection: Conexão com o catálogo
+        """
+        thread = threading.current_thread()
+        conn = getattr(self._local, 'conn', None)
+        with self._lock:
+            # A conexão da thread pode ter sido fechada por close()
+            if conn is not None and self._connections.get(thread) is conn:
+                self._busy.add(conn)
+            else:
+                conn = None
+
+        if conn is None:
+            # Usada por uma única thread; check_same_thread=False apenas permite que a
+            # conexão seja fechada por outra thread enquanto estiver ociosa
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute(f"PRAGMA mmap_size = {CATALOG_MMAP_SIZE}")
+            self._local.conn = conn
+            with self._lock:
+                # Conexões de threads já encerradas não serão mais usadas
+                finished = [owner for owner in self._connections if not owner.is_alive()]
+                dead = [self._connections.pop(owner) for owner in finished]
+                self._connections[thread] = conn
+                self._busy.add(conn)
+            for stale_conn in dead:
+                stale_conn.close()
+
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                self._busy.discard(conn)
+                stale = self._closed and self._connections.get(thread) is conn
+                if stale:
+                    del self._connections[thread]
+            if stale:
+                conn.close()
+
+    def close(self):
+        """
+        Fecha as conexões com o arquivo do catálogo (chamado quando ele é substituído).
+
+        As conexões ociosas são fechadas imediatamente; as que estão em uso, ao fim
+        da consulta. Quem ainda usa este catálogo continua funcionando, com uma
+        conexão aberta e fechada a cada consulta.
+        """
+        with self._lock:
+            self._closed = True
+            idle = [thread for thread, conn in self._connections.items() if conn not in self._busy]
+            idle = [self._connections.pop(thread) for thread in idle]
+
+        for conn in idle:
+            conn.close()
+
+    @staticmethod
+    def _row_to_food(row):
+        """
+        Converte uma linha da tabela foods no formato do banco de dados JSON.
+
+        Args:
+            row (tuple): Colunas de FOOD_COLUMNS seguidas do JSON de campos extras
+
+        Returns:
+            MappingProxyType: Dados do alimento (somente leitura)
+        """
+        food = dict(zip(FOOD_COLUMNS, row))
+        if row[-1]:
+            # Campos adicionais (ex.: micronutrientes) ficam em uma coluna JSON
+            food.update(json.loads(row[-1]))
+        return MappingProxyType(food)
+
+    def __getitem__(self, name):
+        with self._connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(FOOD_COLUMNS)}, extra FROM foods WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return self._row_to_food(row)
+
+    def __contains__(self, name):
+        with self._connection() as conn:
+            return conn.execute("SELECT 1 FROM foods WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self):
+        # Lista materializada: apenas os nomes, sem os dados nutricionais
+        with self._connection() as conn:
+            names = conn.execute("SELECT name FROM foods ORDER BY name").fetchall()
+        return iter([row[0] for row in names])
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM foods").fetchone()[0]
+
+    def names_in(self, text):
+        """
+        Lista os alimentos cujo nome aparece em um texto.
+
+        Args:
+            text (str): Texto a verificar
+
+        Returns:
+            list: Nomes dos alimentos contidos no texto
+        """
+        with self._connection() as conn:
+            rows = conn.execute("SELECT name FROM foods WHERE instr(?, name) > 0", (text,)).fetchall()
+        return [row[0] for row in rows]
+
+
+class SQLiteFoodMatcher:
+    """Localizador de alimentos que não mantém os nomes do catálogo SQLite em memória."""
+
+    def __init__(self, foods):
+        """
+        Inicializa o localizador.
+
+        Args:
+            foods (SQLiteFoodMapping): Catálogo consultado a cada texto
+        """
+        self.foods = foods
+
+    def find_all(self, text):
+        """
+        Encontra os alimentos mencionados no texto, na ordem em que aparecem.
+
+        O catálogo devolve os nomes contidos no texto, e só eles são compilados:
+        o resultado é o mesmo do FoodMatcher com o catálogo inteiro.
+
+        Args:
+            text (str): Texto descrevendo a refeição (já normalizado)
+
+        Returns:
+            list: Tuplas (nome do alimento, string de quantidade ou "")
+        """
+        return FoodMatcher(self.foods.names_in(text)).find_all(text)
+
+
+def convert_json_to_sqlite(json_path, db_path):
+    """
+    Converte o banco de dados de alimentos em JSON para o catálogo SQLite.
+
+    O arquivo é montado em um caminho temporário e substitui o anterior de
+    uma só vez, para que processos em execução nunca leiam um catálogo incompleto.
+
+    Args:
+        json_path (str): Caminho do arquivo food_database.json
+        db_path (str): Caminho do arquivo SQLite de destino
+
+    Returns:
+        int: Número de alimentos convertidos
+    """
+    with open(json_path, 'r', encoding='utf-8') as file:
+        foods = json.load(file)
+
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    temp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("""
+        CREATE TABLE foods (
+            name TEXT PRIMARY KEY,
+            calorias REAL NOT NULL,
+            proteinas REAL NOT NULL,
+            carboidratos REAL NOT NULL,
+            gorduras REAL NOT NULL,
+            porcao REAL NOT NULL,
+            unidade TEXT NOT NULL,
+            extra TEXT
+        ) WITHOUT ROWID
+        """)
+
+        rows = []
+        for name, info in foods.items():
+            extra = {key: value for key, value in info.items() if key not in FOOD_COLUMNS}
+            rows.append((name, *(info[column] for column in FOOD_COLUMNS),
+                         json.dumps(extra, ensure_ascii=False) if extra else None))
+
+        conn.executemany(f"INSERT INTO foods VALUES ({', '.join(['?'] * (len(FOOD_COLUMNS) + 2))})", rows)
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(temp_path, db_path)
+    return len(rows)
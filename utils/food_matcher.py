@@ -0,0 +1,118 @@
+"""
+Localizador de alimentos para o NutriBot Evolve.
+Compila todos os nomes do banco de dados de alimentos em uma única expressão
+regular (em forma de árvore de prefixos) e encontra alimentos e quantidades
+em uma só passagem pelo texto.
+"""
+
+import re
+
+# Quantidade com unidade, como "100g", "2 colheres" ou "1,5 xícaras"
+QUANTITY_PATTERN = r'\d+(?:[.,]\d+)?\s*(?:g|ml|unidades?|colheres?|xícaras?|fatias?|pedaços?)'
+
+
+class FoodMatcher:
+    """Classe para localizar nomes de alimentos e suas quantidades em um texto."""
+
+    def __init__(self, food_names):
+        """
+        Inicializa o localizador compilando os nomes de alimentos.
+
+        Args:
+            food_names (iterable): Nomes dos alimentos (chaves do banco de dados de alimentos)
+        """
+        self.food_names = frozenset(name for name in food_names if name)
+        self.pattern = self._compile(self.food_names)
+
+    @staticmethod
+    def _build_trie(food_names):
+        """
+        Monta a árvore de prefixos dos nomes de alimentos.
+
+        Args:
+            food_names (iterable): Nomes dos alimentos
+
+        Returns:
+            dict: Árvore de prefixos (a chave '' marca o fim de um nome)
+        """
+        trie = {}
+        for name in food_names:
+            node = trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node[''] = True
+        return trie
+
+    @staticmethod
+    def _trie_to_regex(node):
+        """
+        Converte um nó da árvore de prefixos em expressão regular.
+
+        Em cada ponto de decisão a regex testa apenas os caracteres seguintes
+        possíveis, e a continuação mais longa é tentada antes de encerrar o nome.
+
+        Args:
+            node (dict): Nó da árvore de prefixos
+
+        Returns:
+            str: Expressão regular equivalente ao nó
+        """
+        is_end = '' in node
+        branches = [re.escape(char) + FoodMatcher._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char]
+
+        if not branches:
+            return ''
+
+        if len(branches) == 1:
+            body = branches[0]
+            grouped = len(body) > 1
+        else:
+            body = '|'.join(branches)
+            grouped = True
+
+        if is_end:
+            # Quantificador guloso: prefere o nome mais longo (ex.: "arroz integral" a "arroz")
+            return f'(?:{body})?' if grouped else f'{body}?'
+        return f'(?:{body})' if grouped and len(branches) > 1 else body
+
+    @staticmethod
+    def _compile(food_names):
+        """
+        Compila a expressão regular única com todos os alimentos.
+
+        Args:
+            food_names (iterable): Nomes dos alimentos
+
+        Returns:
+            re.Pattern: Expressão compilada ou None se não houver alimentos
+        """
+        if not food_names:
+            return None
+
+        names_regex = FoodMatcher._trie_to_regex(FoodMatcher._build_trie(food_names))
+
+        # Exemplo: "100g de arroz", "arroz (100g)" ou apenas "arroz"
+        return re.compile(
+            r'(?:(?P<quantity_before>' + QUANTITY_PATTERN + r')\s*(?:de\s+)?)?'
+            r'(?<!\w)(?P<food>' + names_regex + r')'
+            r'(?:\s*\((?P<quantity_after>' + QUANTITY_PATTERN + r')\))?'
+        )
+
+    def find_all(self, text):
+        """
+        Encontra os alimentos mencionados no texto, na ordem em que aparecem.
+
+        Args:
+            text (str): Texto descrevendo a refeição (já normalizado)
+
+        Returns:
+            list: Tuplas (nome do alimento, string de quantidade ou "")
+        """
+        if self.pattern is None:
+            return []
+
+        return [
+            (match.group('food'), match.group('quantity_before') or match.group('quantity_after') or "")
+            for match in self.pattern.finditer(text)
+        ]
@@ -5,264 +5,38 @@ Responsável por processar texto natural e identificar alimentos e valores nutri
 
 import sys
 import re
-import json
-import os
+import copy
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 import config
+from utils.food_catalog import food_catalog
+from utils.cache import LRUCache
+
+# Resultados recentes de analyze_meal_text, indexados por (versão do catálogo, texto normalizado)
+meal_analysis_cache = LRUCache(config.MEAL_ANALYSIS_CACHE_SIZE, config.MEAL_ANALYSIS_CACHE_TTL)
+
+# Resultados calculados com o catálogo anterior deixam de ser válidos após uma recarga
+food_catalog.add_reload_listener(lambda snapshot: meal_analysis_cache.clear())
 
 class MealAnalyzer:
     """Classe para analisar texto natural e identificar alimentos e valores nutricionais."""
     
     def __init__(self):
         """Inicializa o analisador de refeições."""
-        # Carrega o banco de dados de alimentos
-        self.food_db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                         'resources', 'food_database.json')
-        self.food_database = self._load_food_database()
+        # O banco de dados de alimentos é compartilhado por todas as instâncias
+        self.food_catalog = food_catalog
     
-    def _load_food_database(self):
-        """
-        Carrega o banco de dados de alimentos.
-        
-        Returns:
-            dict: Banco de dados de alimentos
-        """
-        # Verifica se o arquivo existe
-        if not os.path.exists(self.food_db_path):
-            # Cria um banco de dados básico se não existir
-            self._create_basic_food_database()
-        
-        try:
-            with open(self.food_db_path, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except Exception as e:
-            print(f"Erro ao carregar banco de dados de alimentos: {e}")
-            return {}
+    @property
+    def food_database(self):
+        """Banco de dados de alimentos em uso (somente leitura)."""
+        return self.food_catalog.foods
     
-    def _create_basic_food_database(self):
-        """Cria um banco de dados básico de alimentos."""
-        # Diretório de recursos
-        resources_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
-        os.makedirs(resources_dir, exist_ok=True)
-        
-        # Banco de dados básico de alimentos
-        basic_food_db = {
-            "arroz": {
-                "calorias": 130,
-                "proteinas": 2.7,
-                "carboidratos": 28.2,
-                "gorduras": 0.3,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "feijão": {
-                "calorias": 77,
-                "proteinas": 5.0,
-                "carboidratos": 13.6,
-                "gorduras": 0.5,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "frango": {
-                "calorias": 165,
-                "proteinas": 31.0,
-                "carboidratos": 0.0,
-                "gorduras": 3.6,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "carne": {
-                "calorias": 250,
-                "proteinas": 26.0,
-                "carboidratos": 0.0,
-                "gorduras": 17.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "peixe": {
-                "calorias": 140,
-                "proteinas": 20.0,
-                "carboidratos": 0.0,
-                "gorduras": 6.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "ovo": {
-                "calorias": 155,
-                "proteinas": 13.0,
-                "carboidratos": 1.1,
-                "gorduras": 11.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "leite": {
-                "calorias": 42,
-                "proteinas": 3.4,
-                "carboidratos": 5.0,
-                "gorduras": 1.0,
-                "porcao": 100,
-                "unidade": "ml"
-            },
-            "pão": {
-                "calorias": 265,
-                "proteinas": 9.0,
-                "carboidratos": 49.0,
-                "gorduras": 3.2,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "maçã": {
-                "calorias": 52,
-                "proteinas": 0.3,
-                "carboidratos": 14.0,
-                "gorduras": 0.2,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "banana": {
-                "calorias": 89,
-                "proteinas": 1.1,
-                "carboidratos": 22.8,
-                "gorduras": 0.3,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "laranja": {
-                "calorias": 47,
-                "proteinas": 0.9,
-                "carboidratos": 11.8,
-                "gorduras": 0.1,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "alface": {
-                "calorias": 15,
-                "proteinas": 1.4,
-                "carboidratos": 2.9,
-                "gorduras": 0.2,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "tomate": {
-                "calorias": 18,
-                "proteinas": 0.9,
-                "carboidratos": 3.9,
-                "gorduras": 0.2,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "cenoura": {
-                "calorias": 41,
-                "proteinas": 0.9,
-                "carboidratos": 9.6,
-                "gorduras": 0.2,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "batata": {
-                "calorias": 77,
-                "proteinas": 2.0,
-                "carboidratos": 17.0,
-                "gorduras": 0.1,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "azeite": {
-                "calorias": 884,
-                "proteinas": 0.0,
-                "carboidratos": 0.0,
-                "gorduras": 100.0,
-                "porcao": 100,
-                "unidade": "ml"
-            },
-            "manteiga": {
-                "calorias": 717,
-                "proteinas": 0.9,
-                "carboidratos": 0.1,
-                "gorduras": 81.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "queijo": {
-                "calorias": 350,
-                "proteinas": 25.0,
-                "carboidratos": 2.0,
-                "gorduras": 27.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "iogurte": {
-                "calorias": 59,
-                "proteinas": 3.5,
-                "carboidratos": 4.7,
-                "gorduras": 3.3,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "chocolate": {
-                "calorias": 546,
-                "proteinas": 4.9,
-                "carboidratos": 61.0,
-                "gorduras": 31.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "refrigerante": {
-                "calorias": 42,
-                "proteinas": 0.0,
-                "carboidratos": 10.6,
-                "gorduras": 0.0,
-                "porcao": 100,
-                "unidade": "ml"
-            },
-            "suco": {
-                "calorias": 45,
-                "proteinas": 0.5,
-                "carboidratos": 10.0,
-                "gorduras": 0.1,
-                "porcao": 100,
-                "unidade": "ml"
-            },
-            "café": {
-                "calorias": 2,
-                "proteinas": 0.1,
-                "carboidratos": 0.0,
-                "gorduras": 0.0,
-                "porcao": 100,
-                "unidade": "ml"
-            },
-            "açúcar": {
-                "calorias": 387,
-                "proteinas": 0.0,
-                "carboidratos": 100.0,
-                "gorduras": 0.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "sal": {
-                "calorias": 0,
-                "proteinas": 0.0,
-                "carboidratos": 0.0,
-                "gorduras": 0.0,
-                "porcao": 100,
-                "unidade": "g"
-            },
-            "salada": {
-                "calorias": 20,
-                "proteinas": 1.5,
-                "carboidratos": 3.0,
-                "gorduras": 0.3,
-                "porcao": 100,
-                "unidade": "g"
-            }
-        }
-        
-        # Salva o banco de dados básico
-        with open(self.food_db_path, 'w', encoding='utf-8') as file:
-            json.dump(basic_food_db, file, ensure_ascii=False, indent=4)
+    @property
+    def food_matcher(self):
+        """Localizador de alimentos compilado para o catálogo em uso."""
+        return self.food_catalog.snapshot().matcher
     
     def analyze_meal_text(self, text):
         """
@@ -276,22 +50,34 @@ class MealAnalyzer:
         """
         # Normaliza o texto
         text = text.lower()
+        normalized_text = ' '.join(text.split())
         
-        # Identifica o tipo de refeição
-        meal_type = self._identify_meal_type(text)
+        # Usa o mesmo instantâneo do catálogo durante toda a análise, mesmo que ele seja recarregado
+        catalog = self.food_catalog.snapshot()
+        cache_key = (catalog.version, normalized_text)
         
-        # Identifica alimentos e quantidades
-        food_items = self._identify_food_items(text)
-        
-        # Calcula valores nutricionais
-        nutrition = self._calculate_nutrition(food_items)
+        analysis = meal_analysis_cache.get(cache_key)
+        if analysis is LRUCache.MISSING:
+            # Identifica o tipo de refeição
+            meal_type = self._identify_meal_type(normalized_text)
+            
+            # Identifica alimentos e quantidades
+            food_items = self._identify_food_items(normalized_text, catalog)
+            
+            # Calcula valores nutricionais
+            nutrition = self._calculate_nutrition(food_items)
+            
+            analysis = {
+                'meal_type': meal_type,
+                'food_items': food_items,
+                'nutrition': nutrition
+            }
+            meal_analysis_cache.set(cache_key, analysis)
         
-        return {
-            'meal_type': meal_type,
-            'food_items': food_items,
-            'nutrition': nutrition,
-            'description': text
-        }
+        # Cópia para que alterações feitas por quem chamou não afetem o cache
+        result = copy.deepcopy(analysis)
+        result['description'] = text
+        return result
     
     def _identify_meal_type(self, text):
         """
@@ -323,48 +109,42 @@ class MealAnalyzer:
         # Por enquanto, retorna um valor padrão
         return 'refeicao'
     
-    def _identify_food_items(self, text):
+    def _identify_food_items(self, text, catalog=None):
         """
         Identifica alimentos e quantidades no texto.
         
         Args:
             text (str): Texto descrevendo a refeição
+            catalog (FoodCatalogSnapshot, optional): Instantâneo do catálogo (padrão: o atual)
             
         Returns:
             list: Lista de itens alimentares identificados
         """
         food_items = []
         
-        # Procura por alimentos do banco de dados no texto
-        for food_name, food_info in self.food_database.items():
-            # Padrão para encontrar o alimento e possíveis quantidades
-            # Exemplo: "100g de arroz" ou "arroz (100g)" ou "2 ovos"
-            pattern = r'(\d+(?:[.,]\d+)?\s*(?:g|ml|unidades?|colheres?|xícaras?|fatias?|pedaços?))?\s*(?:de\s+)?(' + food_name + r')|\b(' + food_name + r')\s*(?:\((\d+(?:[.,]\d+)?\s*(?:g|ml|unidades?|colheres?|xícaras?|fatias?|pedaços?))\))?'
+        if catalog is None:
+            catalog = self.food_catalog.snapshot()
+        
+        # Procura todos os alimentos do banco de dados em uma única passagem pelo texto
+        for food, quantity_str in catalog.matcher.find_all(text):
+            food_info = catalog.foods[food]
+            
+            # Processa a quantidade
+            quantity, unit = self._parse_quantity(quantity_str, food_info['unidade'])
+            
+            # Calcula a proporção em relação à porção padrão
+            proportion = quantity / food_info['porcao'] if food_info['porcao'] > 0 else 1
             
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                # Extrai a quantidade e a unidade, se presentes
-                quantity_str = match.group(1) or match.group(4) or ""
-                
-                # Determina o nome do alimento (pode estar no grupo 2 ou 3)
-                food = match.group(2) or match.group(3)
-                
-                # Processa a quantidade
-                quantity, unit = self._parse_quantity(quantity_str, food_info['unidade'])
-                
-                # Calcula a proporção em relação à porção padrão
-                proportion = quantity / food_info['porcao'] if food_info['porcao'] > 0 else 1
-                
-                # Adiciona o item à lista
-                food_items.append({
-                    'name': food,
-                    'quantity': quantity,
-                    'unit': unit,
-                    'calories': food_info['calorias'] * proportion,
-                    'protein': food_info['proteinas'] * proportion,
-                    'carbs': food_info['carboidratos'] * proportion,
-                    'fat': food_info['gorduras'] * proportion
-                })
+            # Adiciona o item à lista
+            food_items.append({
+                'name': food,
+                'quantity': quantity,
+                'unit': unit,
+                'calories': food_info['calorias'] * proportion,
+                'protein': food_info['proteinas'] * proportion,
+                'carbs': food_info['carboidratos'] * proportion,
+                'fat': food_info['gorduras'] * proportion
+            })
         
         return food_items
     
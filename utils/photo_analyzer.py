@@ -6,14 +6,40 @@ Responsável por processar e comparar fotos corporais.
 import sys
 import os
 import datetime
+import hashlib
+import tempfile
+import functools
+import contextlib
+import urllib.request
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import random
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 import config
 
+# Níveis de cinza (0 a 255) usados para o brilho médio a partir do histograma
+GRAY_LEVELS = np.arange(256, dtype=np.float64)
+
+
+@functools.lru_cache(maxsize=None)
+def _label_font(size=20):
+    """
+    Carrega (uma vez por processo) a fonte dos rótulos das comparações.
+
+    Args:
+        size (int): Tamanho da fonte
+
+    Returns:
+        ImageFont: Fonte TrueType ou a fonte padrão se não estiver disponível
+    """
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
 class PhotoAnalyzer:
     """Classe para analisar e comparar fotos corporais."""
     
@@ -28,59 +54,246 @@ class PhotoAnalyzer:
         Salva uma foto no sistema de arquivos.
         
         Args:
-            photo_file: Objeto de arquivo da foto
+            photo_file: Objeto de arquivo da foto (arquivo aberto ou telegram.File)
             user_id (int): ID do usuário no Telegram
             
         Returns:
             str: Caminho para o arquivo salvo ou None em caso de erro
         """
+        saved = self.ingest_photo(photo_file, user_id)
+        return saved['path'] if saved else None
+    
+    def ingest_photo(self, photo_file, user_id):
+        """
+        Copia uma foto em blocos para o diretório do usuário.
+        
+        Os blocos são gravados em um arquivo temporário e o hash do conteúdo é
+        calculado durante a cópia; o arquivo só recebe o nome definitivo depois
+        de sincronizado com o disco, de modo que a memória usada não depende do
+        tamanho da foto e nunca existe uma foto gravada pela metade.
+        
+        Args:
+            photo_file: Objeto de arquivo da foto (arquivo aberto ou telegram.File)
+            user_id (int): ID do usuário no Telegram
+            
+        Returns:
+            dict: Caminho (path), hash SHA-256 (sha256) e tamanho em bytes (size),
+                ou None em caso de erro
+        """
+        temp_path = None
+        reserved_path = None
         try:
             # Cria diretório específico para o usuário
             user_dir = os.path.join(self.photos_dir, str(user_id))
             os.makedirs(user_dir, exist_ok=True)
             
-            # Gera nome de arquivo único
+            # O temporário fica no mesmo diretório para que a renomeação seja atômica
+            fd, temp_path = tempfile.mkstemp(prefix='.photo_', suffix='.tmp', dir=user_dir)
+            digest = hashlib.sha256()
+            size = 0
+            
+            with os.fdopen(fd, 'wb') as out, self._open_photo_source(photo_file) as source:
+                while True:
+                    chunk = source.read(config.PHOTO_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    
+                    size += len(chunk)
+                    if size > config.PHOTO_MAX_BYTES:
+                        raise ValueError(f"foto maior que {config.PHOTO_MAX_BYTES} bytes")
+                    
+                    digest.update(chunk)
+                    out.write(chunk)
+                
+                out.flush()
+                os.fsync(out.fileno())
+            
+            if size == 0:
+                raise ValueError("foto vazia")
+            
+            # Nome único: instante do envio e início do hash do conteúdo
+            sha256 = digest.hexdigest()
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"photo_{timestamp}.jpg"
-            file_path = os.path.join(user_dir, filename)
+            reserved_path = self._reserve_photo_path(user_dir, f"photo_{timestamp}_{sha256[:16]}")
             
-            # Salva o arquivo
-            with open(file_path, 'wb') as f:
-                f.write(photo_file.read())
+            os.replace(temp_path, reserved_path)
+            file_path, temp_path, reserved_path = reserved_path, None, None
             
-            return file_path
+            return {
+                'path': file_path,
+                'sha256': sha256,
+                'size': size
+            }
         except Exception as e:
             print(f"Erro ao salvar foto: {e}")
             return None
+        finally:
+            # Nem o temporário nem o arquivo vazio reservado ficam para trás em caso de erro
+            for path in (temp_path, reserved_path):
+                if path:
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+    
+    @staticmethod
+    def _open_photo_source(photo_file):
+        """
+        Abre a origem de uma foto para leitura em blocos.
+        
+        Args:
+            photo_file: Arquivo aberto (com read), caminho local ou telegram.File
+            
+        Returns:
+            Gerenciador de contexto que fornece um objeto com read(n)
+        """
+        # Arquivos já abertos pertencem a quem chamou e não são fechados aqui
+        if hasattr(photo_file, 'read'):
+            return contextlib.nullcontext(photo_file)
+        
+        file_path = getattr(photo_file, 'file_path', photo_file)
+        if not file_path:
+            raise ValueError("foto sem caminho para download")
+        
+        # Servidor da API de bots em modo local: o arquivo já está no disco
+        if os.path.isfile(file_path):
+            return open(file_path, 'rb')
+        
+        # O download é lido do socket aos poucos, sem carregar a resposta inteira
+        return urllib.request.urlopen(file_path, timeout=config.PHOTO_DOWNLOAD_TIMEOUT)
+    
+    @staticmethod
+    def _reserve_photo_path(user_dir, base_name):
+        """
+        Reserva um nome de arquivo ainda não utilizado no diretório do usuário.
+        
+        Args:
+            user_dir (str): Diretório do usuário
+            base_name (str): Nome do arquivo sem extensão
+            
+        Returns:
+            str: Caminho reservado (arquivo vazio criado de forma exclusiva)
+        """
+        # A mesma foto reenviada no mesmo segundo recebe um sufixo em vez de sobrescrever a anterior
+        suffix = 0
+        while True:
+            name = f"{base_name}.jpg" if suffix == 0 else f"{base_name}_{suffix}.jpg"
+            file_path = os.path.join(user_dir, name)
+            try:
+                with open(file_path, 'xb'):
+                    return file_path
+            except FileExistsError:
+                suffix += 1
+    
+    @staticmethod
+    def derivative_paths(photo_path):
+        """
+        Caminhos das versões reduzidas de uma foto (ao lado do original).
+        
+        Args:
+            photo_path (str): Caminho para o arquivo da foto
+            
+        Returns:
+            dict: Caminhos da miniatura (thumbnail_path) e da versão de comparação (comparison_path)
+        """
+        base_path = os.path.splitext(photo_path)[0]
+        return {
+            'thumbnail_path': f"{base_path}_thumb.jpg",
+            'comparison_path': f"{base_path}_compare.jpg"
+        }
+    
+    def create_derivatives(self, photo_path):
+        """
+        Gera a miniatura e a versão de comparação de uma foto, decodificando o original uma vez.
+        
+        Args:
+            photo_path (str): Caminho para o arquivo da foto
+            
+        Returns:
+            dict: Caminhos gerados (ver derivative_paths) ou None em caso de erro
+        """
+        try:
+            paths = self.derivative_paths(photo_path)
+            
+            comparison_image = self._load_comparison_image(photo_path)
+            thumbnail_image = comparison_image.copy()
+            thumbnail_image.thumbnail(config.PHOTO_THUMBNAIL_SIZE)
+            
+            self._save_image(comparison_image, paths['comparison_path'])
+            self._save_image(thumbnail_image, paths['thumbnail_path'])
+            
+            return paths
+        except Exception as e:
+            print(f"Erro ao gerar versões reduzidas da foto: {e}")
+            return None
     
-    def analyze_photo(self, photo_path):
+    @staticmethod
+    def _save_image(image, image_path):
+        """
+        Grava uma imagem JPEG de forma atômica (leitores nunca veem um arquivo parcial).
+        
+        Args:
+            image: Objeto de imagem PIL
+            image_path (str): Caminho de destino
+        """
+        temp_path = f"{image_path}.{os.getpid()}.tmp"
+        try:
+            image.save(temp_path, format='JPEG', quality=85)
+            os.replace(temp_path, image_path)
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+    
+    @staticmethod
+    def file_sha256(photo_path):
+        """
+        Calcula o hash SHA-256 de uma foto lendo o arquivo em blocos.
+        
+        Args:
+            photo_path (str): Caminho para o arquivo da foto
+            
+        Returns:
+            str: Hash em hexadecimal
+        """
+        digest = hashlib.sha256()
+        with open(photo_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(config.PHOTO_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def analyze_photo(self, photo_path, content_hash=None):
         """
         Realiza uma análise básica da foto.
         
+        A imagem é decodificada uma única vez, já reduzida (ver _load_working_image),
+        e todas as métricas e sugestões são calculadas a partir dessa leitura.
+        
         Args:
             photo_path (str): Caminho para o arquivo da foto
+            content_hash (str, optional): Hash SHA-256 já calculado no envio (ver ingest_photo)
             
         Returns:
             dict: Resultados da análise
         """
         try:
-            # Abre a imagem
-            image = Image.open(photo_path)
-            
-            # Obtém dimensões
-            width, height = image.size
+            # Dimensões originais e imagem de trabalho em escala de cinza
+            width, height, gray_image = self._load_working_image(photo_path)
             
             # Análise básica (simulada)
             # Em uma implementação real, aqui seria usado um modelo de visão computacional
+            quality = self._analyze_image_quality(width, height)
+            lighting = self._analyze_lighting(gray_image)
+            framing = self._analyze_framing(width, height)
+            
             analysis = {
                 'dimensions': {
                     'width': width,
                     'height': height
                 },
-                'quality': self._analyze_image_quality(image),
-                'lighting': self._analyze_lighting(image),
-                'framing': self._analyze_framing(image),
-                'suggestions': self._generate_suggestions(image)
+                'quality': quality,
+                'lighting': lighting,
+                'framing': framing,
+                'suggestions': self._generate_suggestions(lighting, framing),
+                'content_hash': content_hash or self.file_sha256(photo_path),
+                'analyzer_version': config.PHOTO_ANALYZER_VERSION
             }
             
             return analysis
@@ -88,19 +301,53 @@ class PhotoAnalyzer:
             print(f"Erro ao analisar foto: {e}")
             return None
     
-    def _analyze_image_quality(self, image):
+    @staticmethod
+    def _load_working_image(photo_path, max_size=None):
+        """
+        Decodifica a foto em resolução reduzida e em escala de cinza.
+        
+        Em JPEG, o modo draft faz o próprio decodificador entregar a imagem já
+        reduzida (1/2, 1/4 ou 1/8) e em tons de cinza, sem montar os pixels em
+        resolução total; nos demais formatos a imagem é reduzida com reduce()
+        antes da conversão.
+        
+        Args:
+            photo_path (str): Caminho para o arquivo da foto
+            max_size (tuple, optional): Tamanho máximo de trabalho (padrão: PHOTO_ANALYSIS_MAX_SIZE)
+            
+        Returns:
+            tuple: Largura e altura originais e imagem PIL de trabalho (modo L)
+        """
+        max_width, max_height = max_size or config.PHOTO_ANALYSIS_MAX_SIZE
+        
+        with Image.open(photo_path) as image:
+            width, height = image.size
+            
+            # Sem efeito em formatos que não sejam JPEG
+            image.draft('L', (max_width, max_height))
+            
+            # Menor fator inteiro que deixa a imagem dentro do tamanho máximo
+            factor = max(-(-image.width // max_width), -(-image.height // max_height))
+            if factor <= 1:
+                return width, height, image.convert('L')
+            
+            # reduce() não aceita imagens com paleta ou de 1 bit
+            if image.mode in ('1', 'P', 'I;16'):
+                return width, height, image.convert('L').reduce(factor)
+            return width, height, image.reduce(factor).convert('L')
+    
+    def _analyze_image_quality(self, width, height):
         """
         Analisa a qualidade da imagem.
         
         Args:
-            image: Objeto de imagem PIL
+            width (int): Largura original da imagem
+            height (int): Altura original da imagem
             
         Returns:
             dict: Resultados da análise de qualidade
         """
         # Em uma implementação real, aqui seria feita uma análise mais sofisticada
-        width, height = image.size
-        
         # Verifica resolução
         if width < 500 or height < 500:
             quality = "baixa"
@@ -117,12 +364,12 @@ class PhotoAnalyzer:
             'message': message
         }
     
-    def _analyze_lighting(self, image):
+    def _analyze_lighting(self, gray_image):
         """
         Analisa a iluminação da imagem.
         
         Args:
-            image: Objeto de imagem PIL
+            gray_image: Objeto de imagem PIL em escala de cinza
             
         Returns:
             dict: Resultados da análise de iluminação
@@ -130,13 +377,9 @@ class PhotoAnalyzer:
         # Em uma implementação real, aqui seria feita uma análise mais sofisticada
         # Simulação simples de análise de brilho
         try:
-            # Converte para escala de cinza
-            gray_image = image.convert('L')
-            
-            # Calcula brilho médio
-            histogram = gray_image.histogram()
-            pixels = sum(histogram)
-            brightness = sum(i * histogram[i] for i in range(256)) / pixels
+            # Brilho médio ponderado pelo histograma (256 posições, independente do tamanho da imagem)
+            histogram = np.asarray(gray_image.histogram(), dtype=np.float64)
+            brightness = float(np.dot(GRAY_LEVELS, histogram) / histogram.sum())
             
             if brightness < 80:
                 lighting = "escura"
@@ -150,28 +393,29 @@ class PhotoAnalyzer:
             
             return {
                 'level': lighting,
-                'message': message
+                'message': message,
+                'brightness': round(brightness, 1)
             }
-        except:
+        except Exception:
             # Fallback em caso de erro
             return {
                 'level': "indefinida",
                 'message': "Não foi possível analisar a iluminação da imagem."
             }
     
-    def _analyze_framing(self, image):
+    def _analyze_framing(self, width, height):
         """
         Analisa o enquadramento da imagem.
         
         Args:
-            image: Objeto de imagem PIL
+            width (int): Largura original da imagem
+            height (int): Altura original da imagem
             
         Returns:
             dict: Resultados da análise de enquadramento
         """
         # Em uma implementação real, aqui seria usado um modelo para detectar a pessoa na imagem
         # Simulação simples
-        width, height = image.size
         aspect_ratio = width / height
         
         if aspect_ratio < 0.5 or aspect_ratio > 2:
@@ -186,12 +430,13 @@ class PhotoAnalyzer:
             'message': message
         }
     
-    def _generate_suggestions(self, image):
+    def _generate_suggestions(self, lighting, framing):
         """
         Gera sugestões para melhorar a foto.
         
         Args:
-            image: Objeto de imagem PIL
+            lighting (dict): Resultado de _analyze_lighting
+            framing (dict): Resultado de _analyze_framing
             
         Returns:
             list: Lista de sugestões
@@ -199,14 +444,12 @@ class PhotoAnalyzer:
         suggestions = []
         
         # Sugestões de iluminação
-        lighting = self._analyze_lighting(image)
         if lighting['level'] == "escura":
             suggestions.append("Tire a foto em um ambiente mais iluminado ou use iluminação adicional.")
         elif lighting['level'] == "clara":
             suggestions.append("Evite luz direta ou muito intensa. Prefira iluminação difusa.")
         
         # Sugestões de enquadramento
-        framing = self._analyze_framing(image)
         if framing['level'] == "inadequado":
             suggestions.append("Mantenha a câmera a aproximadamente 2 metros de distância e enquadre todo o corpo.")
         
@@ -297,25 +540,21 @@ class PhotoAnalyzer:
         """
         Cria uma imagem de comparação entre duas fotos.
         
+        As versões de comparação geradas no envio (create_derivatives) já estão no
+        tamanho final; originais são decodificados em escala reduzida.
+        
         Args:
-            current_photo_path (str): Caminho para a foto atual
-            previous_photo_path (str): Caminho para a foto anterior
+            current_photo_path (str): Caminho para a foto atual (ou sua versão de comparação)
+            previous_photo_path (str): Caminho para a foto anterior (ou sua versão de comparação)
             user_id (int): ID do usuário no Telegram
             
         Returns:
             str: Caminho para a imagem de comparação ou None em caso de erro
         """
         try:
-            # Abre as imagens
-            current_image = Image.open(current_photo_path)
-            previous_image = Image.open(previous_photo_path)
-            
-            # Redimensiona as imagens para o mesmo tamanho
-            max_width = 800
-            max_height = 600
-            
-            current_image.thumbnail((max_width, max_height))
-            previous_image.thumbnail((max_width, max_height))
+            # Abre as imagens já no tamanho de comparação
+            current_image = self._load_comparison_image(current_photo_path)
+            previous_image = self._load_comparison_image(previous_photo_path)
             
             # Cria uma nova imagem para a comparação
             comparison_width = current_image.width * 2 + 20  # Espaço entre as imagens
@@ -329,17 +568,15 @@ class PhotoAnalyzer:
             # Adiciona texto
             draw = ImageDraw.Draw(comparison_image)
             
-            # Tenta usar uma fonte, ou usa a fonte padrão se não disponível
-            try:
-                font = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
+            # Fonte carregada uma vez por processo
+            font = _label_font()
             
             draw.text((10, 5), "Antes", fill=(0, 0, 0), font=font)
             draw.text((previous_image.width + 30, 5), "Depois", fill=(0, 0, 0), font=font)
             
             # Salva a imagem de comparação
             user_dir = os.path.join(self.photos_dir, str(user_id))
+            os.makedirs(user_dir, exist_ok=True)
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             comparison_filename = f"comparison_{timestamp}.jpg"
             comparison_path = os.path.join(user_dir, comparison_filename)
@@ -351,6 +588,25 @@ class PhotoAnalyzer:
             print(f"Erro ao criar imagem de comparação: {e}")
             return None
     
+    @staticmethod
+    def _load_comparison_image(photo_path):
+        """
+        Abre uma foto reduzida ao tamanho de comparação.
+        
+        Args:
+            photo_path (str): Caminho para o arquivo da foto
+            
+        Returns:
+            Objeto de imagem PIL (RGB) dentro de PHOTO_COMPARISON_SIZE
+        """
+        with Image.open(photo_path) as image:
+            # Em JPEG, decodifica direto na menor escala que ainda cobre o tamanho de comparação
+            image.draft('RGB', config.PHOTO_COMPARISON_SIZE)
+            comparison_image = image.convert('RGB')
+        
+        comparison_image.thumbnail(config.PHOTO_COMPARISON_SIZE)
+        return comparison_image
+    
     def generate_photo_tips(self):
         """
         Gera dicas para tirar melhores fotos corporais.
@@ -0,0 +1,104 @@
+"""
+Reanálise de fotos para o NutriBot Evolve.
+Percorre as fotos sem análise salva ou analisadas por outra versão do
+analisador (PHOTO_ANALYZER_VERSION), em lotes paginados pelo ID, e grava o novo
+resultado em photo_analyses usando o serviço de fotos.
+
+Os trabalhos da reanálise formam uma fila própria no serviço (REANALYSIS_KEY),
+executada um de cada vez: as fotos enviadas pelos usuários continuam sendo
+processadas pelos demais processos, e cancelar os trabalhos de um usuário
+(cancel_user) não cancela a reanálise das fotos dele.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+from database.photo_repository import PhotoRepository
+import config
+from utils.photo_service import photo_service
+
+# Chave da fila de trabalhos da reanálise no serviço de fotos
+REANALYSIS_KEY = 'reanalysis'
+
+
+def reanalyze_photos(chunk_size=None, progress=None, service=None):
+    """
+    Analisa novamente as fotos cuja análise falta ou está desatualizada.
+
+    Fotos recusadas pela fila cheia ou canceladas antes da análise são reenviadas
+    após PHOTO_REANALYSIS_RETRY_DELAY segundos; se nenhuma foto for concluída em
+    PHOTO_REANALYSIS_MAX_RETRIES tentativas seguidas, as restantes ficam para a
+    próxima execução.
+
+    Args:
+        chunk_size (int, optional): Fotos enviadas ao serviço por lote (padrão: PHOTO_REANALYSIS_CHUNK_SIZE)
+        progress (callable, optional): Função chamada com as métricas após cada lote
+        service (PhotoService, optional): Serviço de fotos a utilizar (padrão: photo_service)
+
+    Returns:
+        dict: Métricas da execução (fotos processadas, analisadas, falhas, duração
+            e se todas as fotos foram processadas)
+    """
+    service = service or photo_service
+    chunk_size = chunk_size or config.PHOTO_REANALYSIS_CHUNK_SIZE
+    metrics = {
+        'processed': 0,
+        'analyzed': 0,
+        'failed': 0,
+        'elapsed': 0.0,
+        'completed': True
+    }
+    start_time = time.perf_counter()
+    last_id = 0
+    retries = 0
+
+    while True:
+        photos = PhotoRepository.get_photos_needing_analysis(config.PHOTO_ANALYZER_VERSION, last_id, chunk_size)
+        if not photos:
+            break
+
+        # O hash já salvo evita ler o arquivo novamente
+        jobs = []
+        for photo in photos:
+            job = service.submit(REANALYSIS_KEY, 'analyze_photo', photo['photo_path'], photo['content_hash'])
+            if job is None:
+                # Fila cheia: esta foto e as seguintes são reenviadas na próxima tentativa
+                break
+            jobs.append((photo, job))
+
+        # O lote só avança até a primeira foto não processada; as que vêm depois dela
+        # e foram analisadas já não são devolvidas na próxima consulta
+        deferred = len(jobs) < len(photos)
+        for photo, job in jobs:
+            analysis = service.result(job)
+            if job.cancelled():
+                deferred = True
+                continue
+
+            if analysis and PhotoRepository.save_analysis(photo['id'], analysis):
+                metrics['analyzed'] += 1
+            else:
+                metrics['failed'] += 1
+            metrics['processed'] += 1
+
+            if not deferred:
+                last_id = photo['id']
+                retries = 0
+
+        metrics['elapsed'] = time.perf_counter() - start_time
+        if progress:
+            progress(dict(metrics))
+
+        if deferred:
+            retries += 1
+            if retries > config.PHOTO_REANALYSIS_MAX_RETRIES:
+                metrics['completed'] = False
+                print("Reanálise de fotos interrompida: serviço de fotos ocupado, o restante fica para a próxima execução")
+                break
+            time.sleep(config.PHOTO_REANALYSIS_RETRY_DELAY)
+
+    metrics['elapsed'] = time.perf_counter() - start_time
+    return metrics
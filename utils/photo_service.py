@@ -0,0 +1,350 @@
+"""
+Serviço de processamento de fotos para o NutriBot Evolve.
+Executa as análises e comparações de fotos (trabalho de CPU com o Pillow) em
+um pool de processos limitado, fora das threads que atendem as mensagens.
+Os trabalhos de um mesmo usuário são executados na ordem de envio; os de
+usuários diferentes, em paralelo. Cada trabalho devolve um futuro, que pode
+ser aguardado com tempo limite ou cancelado.
+"""
+
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, InvalidStateError, TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from utils.photo_analyzer import PhotoAnalyzer
+
+# Métodos do PhotoAnalyzer que podem ser executados pelo serviço
+JOB_METHODS = ('analyze_photo', 'create_derivatives', 'compare_photos', 'create_comparison_image')
+
+# Analisador do processo de trabalho (criado uma vez por processo)
+_analyzer = None
+
+
+def _warm_up():
+    """Cria o analisador do processo, com o Pillow e o NumPy já carregados."""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = PhotoAnalyzer()
+
+
+def _run_job(method, *args):
+    """
+    Executa um método do analisador no processo de trabalho.
+
+    Args:
+        method (str): Nome do método (um de JOB_METHODS)
+        *args: Argumentos do método (serializáveis entre processos)
+
+    Returns:
+        Resultado do método
+    """
+    _warm_up()
+    return getattr(_analyzer, method)(*args)
+
+
+class PhotoService:
+    """Classe para processar fotos em um pool de processos, com ordem por usuário."""
+
+    def __init__(self, max_workers, timeout=None, max_pending=None):
+        """
+        Inicializa o serviço (o pool é criado sob demanda).
+
+        Args:
+            max_workers (int): Número de processos (0 = processa na thread chamadora)
+            timeout (float, optional): Tempo máximo (s) de espera por um trabalho em result()
+            max_pending (int, optional): Máximo de trabalhos aguardando ou em execução (None = sem limite)
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # Último trabalho enviado por usuário (o próximo só começa quando ele termina)
+        self._tails = {}
+        # Trabalhos por usuário ainda não concluídos, para cancelamento
+        self._jobs = {}
+        # Futuro do pool de processos de cada trabalho já despachado
+        self._dispatched = {}
+        # Ordem de envio de cada trabalho
+        self._order = {}
+        self._sequence = 0
+
+        self.stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'cancelled': 0,
+            'timed_out': 0
+        }
+
+    def _get_executor(self):
+        """
+        Cria o pool de processos na primeira utilização.
+
+        Returns:
+            ProcessPoolExecutor: Pool de processos de fotos
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # "spawn": os processos não herdam as threads e conexões do bot
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_warm_up
+                    )
+        return self._executor
+
+    def start(self):
+        """Cria os processos de trabalho antecipadamente, já com o analisador carregado."""
+        if self.max_workers > 0:
+            executor = self._get_executor()
+            for future in [executor.submit(_warm_up) for _ in range(self.max_workers)]:
+                future.result()
+
+    def submit(self, user_id, method, *args):
+        """
+        Agenda um trabalho do usuário, depois dos trabalhos que ele já enviou.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            method (str): Método do PhotoAnalyzer (um de JOB_METHODS)
+            *args: Argumentos do método (serializáveis entre processos)
+
+        Returns:
+            concurrent.futures.Future: Futuro com o resultado ou None se a fila estiver cheia
+        """
+        if method not in JOB_METHODS:
+            raise ValueError(f"Trabalho de foto desconhecido: {method}")
+
+        job = Future()
+        with self._lock:
+            pending = sum(len(jobs) for jobs in self._jobs.values())
+            if self.max_pending is not None and pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                return None
+
+            previous = self._tails.get(user_id)
+            self._tails[user_id] = job
+            self._jobs.setdefault(user_id, set()).add(job)
+            self._sequence += 1
+            self._order[job] = self._sequence
+            self.stats['submitted'] += 1
+
+        job.add_done_callback(lambda done: self._finish(user_id, done))
+
+        if previous is None:
+            self._dispatch(job, method, args)
+        else:
+            # Chamado imediatamente se o trabalho anterior já terminou
+            previous.add_done_callback(lambda _: self._dispatch(job, method, args))
+        return job
+
+    def _dispatch(self, job, method, args):
+        """
+        Envia um trabalho ao pool (ou o descarta se foi cancelado enquanto aguardava).
+
+        Args:
+            job (Future): Futuro devolvido por submit()
+            method (str): Método do PhotoAnalyzer
+            args (tuple): Argumentos do método
+        """
+        if not job.set_running_or_notify_cancel():
+            return
+
+        if self.max_workers <= 0:
+            try:
+                self._resolve(job, result=_run_job(method, *args))
+            except Exception as e:
+                self._resolve(job, exception=e)
+            return
+
+        try:
+            process_future = self._get_executor().submit(_run_job, method, *args)
+        except Exception as e:
+            self._resolve(job, exception=e)
+            return
+
+        with self._lock:
+            # Um trabalho interrompido nesse meio-tempo já saiu do acompanhamento
+            if not job.done():
+                self._dispatched[job] = process_future
+        process_future.add_done_callback(lambda done: self._copy_result(job, done))
+
+    def _copy_result(self, job, process_future):
+        """
+        Repassa o resultado do pool de processos para o futuro do trabalho.
+
+        Args:
+            job (Future): Futuro devolvido por submit()
+            process_future (Future): Futuro do pool de processos
+        """
+        if process_future.cancelled():
+            self._resolve(job, exception=FutureTimeoutError("trabalho cancelado"))
+            return
+
+        exception = process_future.exception()
+        if exception is not None:
+            self._resolve(job, exception=exception)
+        else:
+            self._resolve(job, result=process_future.result())
+
+    @staticmethod
+    def _resolve(job, result=None, exception=None):
+        """
+        Conclui um trabalho, ignorando os que já foram concluídos por timeout ou cancelamento.
+
+        Args:
+            job (Future): Futuro devolvido por submit()
+            result: Resultado do trabalho
+            exception (Exception, optional): Erro do trabalho
+        """
+        try:
+            if exception is not None:
+                job.set_exception(exception)
+            else:
+                job.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _finish(self, user_id, job):
+        """
+        Remove um trabalho concluído das estruturas de acompanhamento.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            job (Future): Futuro concluído
+        """
+        with self._lock:
+            self._dispatched.pop(job, None)
+            self._order.pop(job, None)
+
+            jobs = self._jobs.get(user_id)
+            if jobs is not None:
+                jobs.discard(job)
+                if not jobs:
+                    del self._jobs[user_id]
+
+            if self._tails.get(user_id) is job:
+                del self._tails[user_id]
+
+    def cancel(self, job):
+        """
+        Cancela um trabalho.
+
+        Trabalhos que ainda aguardam são descartados; trabalhos já em execução são
+        concluídos com erro de tempo esgotado, liberando os próximos do mesmo usuário
+        (o processo termina o cálculo, mas o resultado é descartado).
+
+        Args:
+            job (Future): Futuro devolvido por submit()
+
+        Returns:
+            bool: True se o trabalho foi cancelado ou interrompido
+        """
+        if job.cancel():
+            with self._lock:
+                self.stats['cancelled'] += 1
+            return True
+
+        with self._lock:
+            process_future = self._dispatched.get(job)
+
+        # Ainda na fila do pool: o cancelamento conclui o trabalho (ver _copy_result)
+        if process_future is None or not process_future.cancel():
+            if job.done():
+                return False
+            self._resolve(job, exception=FutureTimeoutError("trabalho interrompido"))
+
+        with self._lock:
+            self.stats['cancelled'] += 1
+        return True
+
+    def cancel_user(self, user_id):
+        """
+        Cancela todos os trabalhos pendentes de um usuário.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+
+        Returns:
+            int: Número de trabalhos cancelados
+        """
+        with self._lock:
+            # Do último para o primeiro: cancelar um trabalho libera o seguinte do mesmo usuário,
+            # que já deve estar cancelado para não ser despachado. A ordem é lida sob o lock,
+            # pois trabalhos concluídos nesse meio-tempo saem de _order
+            jobs = sorted(self._jobs.get(user_id, ()), key=lambda job: self._order.get(job, 0), reverse=True)
+
+        return sum(1 for job in jobs if self.cancel(job))
+
+    def result(self, job, timeout=None):
+        """
+        Aguarda o resultado de um trabalho, cancelando-o se o tempo esgotar.
+
+        Args:
+            job (Future): Futuro devolvido por submit() (None é aceito e devolve None)
+            timeout (float, optional): Tempo máximo (s) de espera (padrão: timeout do serviço)
+
+        Returns:
+            Resultado do trabalho ou None em caso de erro, cancelamento ou tempo esgotado
+        """
+        if job is None:
+            return None
+
+        try:
+            return job.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            if self.cancel(job):
+                with self._lock:
+                    self.stats['timed_out'] += 1
+            print("Tempo esgotado ao processar foto")
+        except Exception as e:
+            print(f"Erro ao processar foto: {e}")
+        return None
+
+    def get_stats(self):
+        """
+        Retorna estatísticas do serviço.
+
+        Returns:
+            dict: Trabalhos enviados, recusados, cancelados, com tempo esgotado e pendentes
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = sum(len(jobs) for jobs in self._jobs.values())
+        return stats
+
+    def shutdown(self, wait=True):
+        """
+        Encerra o pool de processos.
+
+        Com wait=False, os trabalhos na fila do pool são descartados, mas os que já
+        estão em execução terminam nos processos de trabalho.
+
+        Args:
+            wait (bool): Se True, aguarda os trabalhos em andamento
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            # cancel_futures (descartar os trabalhos na fila) só existe a partir do Python 3.9
+            if sys.version_info >= (3, 9):
+                executor.shutdown(wait=wait, cancel_futures=not wait)
+            else:
+                executor.shutdown(wait=wait)
+
+
+# Instância global do serviço de fotos
+photo_service = PhotoService(
+    config.PHOTO_SERVICE_WORKERS,
+    timeout=config.PHOTO_SERVICE_TIMEOUT,
+    max_pending=config.PHOTO_SERVICE_MAX_PENDING
+)
@@ -0,0 +1,294 @@
+"""
+Agendador de lembretes para o NutriBot Evolve.
+Mantém os lembretes ativos em uma roda de tempo com um compartimento por
+minuto do dia, carregada uma vez da tabela reminders e atualizada a cada
+alteração. A cada minuto apenas os lembretes daquele compartimento são
+enviados, em lotes e com limite de taxa, sem varrer a tabela.
+"""
+
+import sys
+import time
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from database.reminder_repository import ReminderRepository
+
+# Número de compartimentos da roda de tempo (um por minuto do dia)
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_day(reminder_time):
+    """
+    Converte um horário no índice do minuto do dia.
+
+    Args:
+        reminder_time: Horário no formato HH:MM (ou datetime.time / datetime.datetime)
+
+    Returns:
+        int: Minuto do dia (0 a 1439) ou None se o horário for inválido
+    """
+    if isinstance(reminder_time, (datetime.time, datetime.datetime)):
+        return reminder_time.hour * 60 + reminder_time.minute
+
+    try:
+        hours, minutes = str(reminder_time).split(':')[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+
+class TimingWheel:
+    """Roda de tempo com um compartimento por minuto do dia."""
+
+    def __init__(self):
+        """Inicializa a roda vazia."""
+        self._slots = [dict() for _ in range(MINUTES_PER_DAY)]
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def add(self, reminder_id, minute, entry):
+        """
+        Coloca (ou move) um lembrete no compartimento do seu minuto.
+
+        Args:
+            reminder_id (int): ID do lembrete
+            minute (int): Minuto do dia
+            entry (tuple): Dados enviados quando o lembrete dispara (user_id, reminder_type)
+        """
+        with self._lock:
+            previous = self._positions.get(reminder_id)
+            if previous is not None:
+                self._slots[previous].pop(reminder_id, None)
+            self._slots[minute][reminder_id] = entry
+            self._positions[reminder_id] = minute
+
+    def remove(self, reminder_id):
+        """
+        Retira um lembrete da roda.
+
+        Args:
+            reminder_id (int): ID do lembrete
+        """
+        with self._lock:
+            minute = self._positions.pop(reminder_id, None)
+            if minute is not None:
+                self._slots[minute].pop(reminder_id, None)
+
+    def due(self, minute):
+        """
+        Retorna os lembretes de um minuto.
+
+        Args:
+            minute (int): Minuto do dia
+
+        Returns:
+            list: Entradas (user_id, reminder_type) do compartimento
+        """
+        with self._lock:
+            return list(self._slots[minute].values())
+
+    def __len__(self):
+        return len(self._positions)
+
+
+class TokenBucket:
+    """Limitador de taxa por balde de fichas, seguro para uso por várias threads."""
+
+    def __init__(self, rate, capacity):
+        """
+        Inicializa o balde cheio.
+
+        Args:
+            rate (float): Fichas repostas por segundo
+            capacity (int): Máximo de fichas acumuladas (tamanho da rajada)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Aguarda até que uma ficha esteja disponível e a consome."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class ReminderScheduler:
+    """Classe para disparar os lembretes no horário, em lotes e com limite de taxa."""
+
+    def __init__(self, send_func, rate=None, burst=None, batch_size=None, workers=None):
+        """
+        Inicializa o agendador.
+
+        Args:
+            send_func (callable): Função que envia um lembrete, chamada com (user_id, reminder_type);
+                retornar False indica falha no envio
+            rate (float, optional): Envios por segundo (padrão: REMINDER_SEND_RATE)
+            burst (int, optional): Envios seguidos permitidos (padrão: REMINDER_SEND_BURST)
+            batch_size (int, optional): Lembretes por lote (padrão: REMINDER_BATCH_SIZE)
+            workers (int, optional): Lotes enviados em paralelo (padrão: REMINDER_SEND_WORKERS)
+        """
+        self.send_func = send_func
+        self.batch_size = batch_size or config.REMINDER_BATCH_SIZE
+        self.bucket = TokenBucket(rate or config.REMINDER_SEND_RATE, burst or config.REMINDER_SEND_BURST)
+        self.wheel = TimingWheel()
+
+        # Os lotes dividem o mesmo limite de taxa; o paralelismo só esconde a latência de cada envio
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or config.REMINDER_SEND_WORKERS,
+            thread_name_prefix="nutribot-reminders"
+        )
+        self._stats_lock = threading.Lock()
+
+        # Último minuto já processado (datetime truncado no minuto)
+        self._last_minute = None
+        self._tick_lock = threading.Lock()
+
+        self.stats = {
+            'sent': 0,
+            'failed': 0
+        }
+
+    def load(self, chunk_size=1000):
+        """
+        Carrega os lembretes ativos e passa a acompanhar as alterações.
+
+        Args:
+            chunk_size (int, optional): Lembretes lidos por consulta
+
+        Returns:
+            int: Número de lembretes na roda
+        """
+        ReminderRepository.add_change_listener(self.refresh)
+
+        last_id = 0
+        while True:
+            reminders = ReminderRepository.get_active_reminders(last_id, chunk_size)
+            if not reminders:
+                break
+            for reminder in reminders:
+                self._place(reminder)
+            last_id = reminders[-1]['id']
+
+        return len(self.wheel)
+
+    def _place(self, reminder):
+        """
+        Coloca um lembrete ativo na roda (ou o retira se o horário for inválido).
+
+        Args:
+            reminder (dict): Lembrete com id, user_id, reminder_type e reminder_time
+        """
+        minute = minute_of_day(reminder['reminder_time'])
+        if minute is None:
+            self.wheel.remove(reminder['id'])
+            return
+        self.wheel.add(reminder['id'], minute, (reminder['user_id'], reminder['reminder_type']))
+
+    def refresh(self, reminder_id):
+        """
+        Atualiza um lembrete na roda após uma alteração no banco de dados.
+
+        Args:
+            reminder_id (int): ID do lembrete alterado
+        """
+        reminder = ReminderRepository.get_reminder(reminder_id)
+        if reminder is None or not reminder['is_active']:
+            self.wheel.remove(reminder_id)
+        else:
+            self._place(reminder)
+
+    def tick(self, now=None):
+        """
+        Envia os lembretes dos minutos que passaram desde a última chamada.
+
+        Minutos perdidos (ex.: atraso da fila de tarefas) são recuperados, até um dia.
+        Se um envio anterior ainda estiver em andamento, a chamada não faz nada.
+
+        Args:
+            now (datetime.datetime, optional): Instante atual (padrão: agora)
+
+        Returns:
+            int: Número de lembretes enviados com sucesso
+        """
+        if not self._tick_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            current = (now or datetime.datetime.now()).replace(second=0, microsecond=0)
+            if self._last_minute is None:
+                self._last_minute = current - datetime.timedelta(minutes=1)
+
+            elapsed = int((current - self._last_minute).total_seconds() // 60)
+            due = []
+            for offset in range(max(0, elapsed - MINUTES_PER_DAY) + 1, elapsed + 1):
+                minute = self._last_minute + datetime.timedelta(minutes=offset)
+                due.extend(self.wheel.due(minute.hour * 60 + minute.minute))
+
+            if elapsed > 0:
+                self._last_minute = current
+            return self.dispatch(due)
+        finally:
+            self._tick_lock.release()
+
+    def _send_batch(self, batch):
+        """
+        Envia um lote de lembretes, uma ficha do limitador por envio.
+
+        Args:
+            batch (list): Entradas (user_id, reminder_type)
+
+        Returns:
+            int: Número de lembretes enviados com sucesso
+        """
+        sent = 0
+        for user_id, reminder_type in batch:
+            self.bucket.acquire()
+            try:
+                if self.send_func(user_id, reminder_type) is not False:
+                    sent += 1
+            except Exception as e:
+                print(f"Erro ao enviar lembrete {reminder_type} para o usuário {user_id}: {e}")
+
+        with self._stats_lock:
+            self.stats['sent'] += sent
+            self.stats['failed'] += len(batch) - sent
+        return sent
+
+    def dispatch(self, reminders):
+        """
+        Envia lembretes em lotes, respeitando o limite de taxa.
+
+        Args:
+            reminders (list): Entradas (user_id, reminder_type)
+
+        Returns:
+            int: Número de lembretes enviados com sucesso
+        """
+        batches = [reminders[start:start + self.batch_size] for start in range(0, len(reminders), self.batch_size)]
+        return sum(self._executor.map(self._send_batch, batches))
+
+    def stop(self):
+        """Deixa de acompanhar as alterações dos lembretes e encerra o envio."""
+        ReminderRepository.remove_change_listener(self.refresh)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,219 @@
+"""
+Geração de relatórios em lote para o NutriBot Evolve.
+Percorre os usuários com onboarding completo em lotes (paginados pelo ID),
+gera os relatórios em um pool de threads e os deixa prontos no cache de
+relatórios e na tabela reports, para que o envio periódico e o /relatorio
+não precisem desenhar nada nos horários de pico. O progresso é salvo após
+cada lote, permitindo retomar uma execução interrompida.
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from database.user_repository import UserRepository
+from utils.report_generator import ReportGenerator
+
+
+class ReportBatch:
+    """Classe para gerar os relatórios de todos os usuários em lote."""
+
+    # Métodos do ReportGenerator para cada tipo de relatório
+    REPORT_METHODS = {
+        'weekly': 'generate_weekly_report',
+        'monthly': 'generate_monthly_report'
+    }
+
+    # Intervalo entre execuções de cada tipo de relatório: um progresso mais antigo
+    # que isso pertence a um período já encerrado e não é retomado
+    REPORT_PERIODS = {
+        'weekly': datetime.timedelta(days=config.REPORT_FREQUENCY),
+        'monthly': datetime.timedelta(days=30)
+    }
+
+    def __init__(self, report_type='weekly', chunk_size=None, workers=None, checkpoint_path=None,
+                 report_generator=None):
+        """
+        Inicializa o lote.
+
+        Args:
+            report_type (str): Tipo do relatório (weekly, monthly)
+            chunk_size (int, optional): Usuários lidos por lote (padrão: REPORT_BATCH_CHUNK_SIZE)
+            workers (int, optional): Relatórios gerados em paralelo (padrão: REPORT_BATCH_WORKERS)
+            checkpoint_path (str, optional): Arquivo de progresso (padrão: REPORT_BATCH_CHECKPOINT_PATH)
+            report_generator (ReportGenerator, optional): Gerador de relatórios a utilizar
+        """
+        if report_type not in self.REPORT_METHODS:
+            raise ValueError(f"Tipo de relatório desconhecido: {report_type}")
+
+        self.report_type = report_type
+        self.chunk_size = chunk_size or config.REPORT_BATCH_CHUNK_SIZE
+        self.workers = workers or config.REPORT_BATCH_WORKERS
+
+        root_dir = os.path.dirname(os.path.dirname(__file__))
+        self.checkpoint_path = os.path.join(
+            root_dir, checkpoint_path or config.REPORT_BATCH_CHECKPOINT_PATH.format(report_type=report_type)
+        )
+
+        self.report_generator = report_generator or ReportGenerator()
+        self._generate = getattr(self.report_generator, self.REPORT_METHODS[report_type])
+
+    def load_checkpoint(self):
+        """
+        Lê o progresso de uma execução interrompida.
+
+        Progressos iniciados há mais de um período (REPORT_PERIODS) são descartados:
+        os relatórios já gerados por eles estão desatualizados.
+
+        Returns:
+            dict: Progresso salvo ou None se não houver execução pendente
+        """
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            started_at = datetime.datetime.fromisoformat(checkpoint['started_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if checkpoint.get('report_type') != self.report_type:
+            return None
+
+        if datetime.datetime.now() - started_at > self.REPORT_PERIODS[self.report_type]:
+            print(f"Progresso de {started_at} descartado: a geração em lote recomeça do primeiro usuário")
+            self.clear_checkpoint()
+            return None
+
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint):
+        """
+        Grava o progresso de forma atômica.
+
+        Args:
+            checkpoint (dict): Progresso da execução
+        """
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        """Descarta o progresso salvo (a próxima execução começa do primeiro usuário)."""
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+    def _generate_report(self, user_id):
+        """
+        Gera o relatório de um usuário.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+
+        Returns:
+            str: Resultado (generated, skipped ou failed)
+        """
+        try:
+            report = self._generate(user_id)
+        except Exception as e:
+            print(f"Erro ao gerar relatório do usuário {user_id}: {e}")
+            return 'failed'
+
+        if not report:
+            return 'skipped'
+        return 'generated' if all(report['charts'].values()) else 'failed'
+
+    def run(self, resume=True, max_users=None, progress=None):
+        """
+        Gera os relatórios de todos os usuários com onboarding completo.
+
+        Args:
+            resume (bool): Se True, continua a partir do progresso salvo
+            max_users (int, optional): Limite de usuários nesta execução (o restante fica para a próxima)
+            progress (callable, optional): Função chamada com as métricas após cada lote
+
+        Returns:
+            dict: Métricas da execução (usuários processados, gerados, ignorados,
+                falhas, duração e relatórios por segundo)
+        """
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {
+                'report_type': self.report_type,
+                'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                'last_user_id': 0,
+                'processed': 0,
+                'generated': 0,
+                'skipped': 0,
+                'failed': 0
+            }
+
+        run_processed = 0
+        start_time = time.perf_counter()
+        completed = False
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nutribot-report-batch") as executor:
+            while True:
+                limit = self.chunk_size
+                if max_users is not None:
+                    limit = min(limit, max_users - run_processed)
+                    if limit <= 0:
+                        break
+
+                # Próximo lote a partir do último usuário concluído
+                user_ids = UserRepository.get_onboarded_user_ids(checkpoint['last_user_id'], limit)
+                if not user_ids:
+                    completed = True
+                    break
+
+                for result in executor.map(self._generate_report, user_ids):
+                    checkpoint[result] += 1
+
+                checkpoint['processed'] += len(user_ids)
+                checkpoint['last_user_id'] = user_ids[-1]
+                run_processed += len(user_ids)
+                self._save_checkpoint(checkpoint)
+
+                if progress:
+                    progress(self._metrics(checkpoint, run_processed, start_time, completed))
+
+        if completed:
+            self.clear_checkpoint()
+
+        return self._metrics(checkpoint, run_processed, start_time, completed)
+
+    @staticmethod
+    def _metrics(checkpoint, run_processed, start_time, completed):
+        """
+        Monta as métricas de uma execução.
+
+        Args:
+            checkpoint (dict): Progresso acumulado
+            run_processed (int): Usuários processados nesta execução
+            start_time (float): Início desta execução (time.perf_counter)
+            completed (bool): Se todos os usuários já foram processados
+
+        Returns:
+            dict: Métricas da execução
+        """
+        elapsed = time.perf_counter() - start_time
+        return {
+            'report_type': checkpoint['report_type'],
+            'processed': checkpoint['processed'],
+            'generated': checkpoint['generated'],
+            'skipped': checkpoint['skipped'],
+            'failed': checkpoint['failed'],
+            'last_user_id': checkpoint['last_user_id'],
+            'elapsed': elapsed,
+            'reports_per_second': run_processed / elapsed if elapsed > 0 else 0,
+            'completed': completed
+        }
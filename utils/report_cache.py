@@ -0,0 +1,241 @@
+"""
+Cache de relatórios para o NutriBot Evolve.
+Identifica cada relatório pelo hash (SHA-256) dos dados que o produzem
+(totais diários, metas e período): se nada mudou desde o último pedido, os
+gráficos já desenhados e os insights são reutilizados. Os arquivos antigos são
+removidos por idade e por tamanho total do diretório de relatórios.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Versão do formato dos relatórios: alterar invalida todas as entradas em cache
+REPORT_CACHE_VERSION = 1
+
+
+class ReportCache:
+    """Classe para reutilizar relatórios e gráficos gerados a partir dos mesmos dados."""
+
+    def __init__(self, reports_dir, max_age=None, max_bytes=None, eviction_interval=3600):
+        """
+        Inicializa o cache.
+
+        Args:
+            reports_dir (str): Diretório de relatórios (um subdiretório por usuário)
+            max_age (float, optional): Idade máxima (s) dos arquivos sem uso (None = sem limite)
+            max_bytes (int, optional): Tamanho máximo (bytes) do diretório (None = sem limite)
+            eviction_interval (float): Intervalo mínimo (s) entre limpezas do diretório
+        """
+        self.reports_dir = reports_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.eviction_interval = eviction_interval
+
+        self._last_eviction = 0.0
+        self._lock = threading.Lock()
+
+        # Contadores para acompanhamento da taxa de acertos
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evicted_files': 0
+        }
+
+    @staticmethod
+    def make_key(report_type, user, report_data):
+        """
+        Calcula a impressão digital dos dados de um relatório.
+
+        Args:
+            report_type (str): Tipo do relatório (weekly, monthly)
+            user (dict): Dados do usuário
+            report_data (ReportData): Séries diárias do período
+
+        Returns:
+            str: Hash SHA-256 em hexadecimal
+        """
+        payload = {
+            'version': REPORT_CACHE_VERSION,
+            'type': report_type,
+            'start_date': report_data.start_date.isoformat(),
+            'end_date': report_data.end_date.isoformat(),
+            # Metas e preferências usadas nas estatísticas e nos insights
+            'daily_calories': user['daily_calories'],
+            'diet_type': user['diet_type'],
+            'goal': user['goal'],
+            'series': {
+                name: [round(float(value), 2) for value in getattr(report_data, name)]
+                for name in report_data.SERIES
+            }
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _user_dir(self, user_id):
+        """
+        Retorna (e cria, se necessário) o diretório de relatórios do usuário.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+
+        Returns:
+            str: Caminho do diretório
+        """
+        user_dir = os.path.join(self.reports_dir, str(user_id))
+        os.makedirs(user_dir, exist_ok=True)
+        return user_dir
+
+    def _entry_path(self, user_id, key):
+        """
+        Caminho do arquivo JSON que acompanha os gráficos de uma entrada.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            key (str): Impressão digital do relatório
+
+        Returns:
+            str: Caminho do arquivo JSON
+        """
+        return os.path.join(self._user_dir(user_id), f"report_{key[:16]}.json")
+
+    def chart_path(self, user_id, key, name):
+        """
+        Caminho endereçado pelo conteúdo de um gráfico do relatório.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            key (str): Impressão digital do relatório
+            name (str): Nome do gráfico (ex.: calorie_chart)
+
+        Returns:
+            str: Caminho do arquivo PNG
+        """
+        return os.path.join(self._user_dir(user_id), f"{name}_{key[:16]}.png")
+
+    def get(self, user_id, key):
+        """
+        Busca um relatório já gerado com os mesmos dados.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            key (str): Impressão digital do relatório
+
+        Returns:
+            dict: Relatório em cache ou None se não existir ou estiver incompleto
+        """
+        entry_path = self._entry_path(user_id, key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        # A entrada só vale se for da mesma chave e todos os gráficos ainda existirem
+        if not entry or entry.get('key') != key:
+            report = None
+        else:
+            report = entry['report']
+            chart_paths = list(report['charts'].values())
+            if not all(path and os.path.exists(path) for path in chart_paths):
+                report = None
+
+        with self._lock:
+            self.stats['hits' if report else 'misses'] += 1
+
+        if report:
+            # Marca os arquivos como usados recentemente (evita a remoção por idade)
+            for path in [entry_path, *chart_paths]:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+        self.evict_if_due()
+        return report
+
+    def set(self, user_id, key, report):
+        """
+        Armazena um relatório cujos gráficos já foram gerados.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            key (str): Impressão digital do relatório
+            report (dict): Relatório (serializável em JSON)
+        """
+        entry_path = self._entry_path(user_id, key)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'report': report}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, entry_path)
+
+        self.evict_if_due()
+
+    def evict_if_due(self):
+        """Executa a limpeza do diretório se o intervalo mínimo já passou."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_eviction < self.eviction_interval:
+                return
+            self._last_eviction = now
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove os arquivos de relatório antigos e, se o diretório passar do limite, os menos usados.
+
+        Returns:
+            int: Número de arquivos removidos
+        """
+        if not os.path.isdir(self.reports_dir):
+            return 0
+
+        files = []
+        for root, _, names in os.walk(self.reports_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, path))
+
+        now = time.time()
+        removed = 0
+        total_bytes = sum(size for _, size, _ in files)
+
+        # Do menos para o mais recentemente usado
+        for mtime, size, path in sorted(files):
+            expired = self.max_age is not None and now - mtime > self.max_age
+            oversized = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not expired and not oversized:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+
+        with self._lock:
+            self.stats['evicted_files'] += removed
+        return removed
+
+    def get_stats(self):
+        """
+        Retorna estatísticas do cache.
+
+        Returns:
+            dict: Acertos, falhas, arquivos removidos e taxa de acertos
+        """
+        with self._lock:
+            stats = dict(self.stats)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0
+        return stats
@@ -0,0 +1,272 @@
+"""
+Dados de relatórios para o NutriBot Evolve.
+Carrega os totais diários de um período em uma única consulta e os organiza
+em séries colunares (um array NumPy por nutriente, indexado pelo dia), usadas
+tanto nas estatísticas quanto nos gráficos dos relatórios. O período pode ser
+montado a partir do último instantâneo salvo, lendo apenas os dias alterados
+desde então. As estatísticas de qualquer janela (7, 30, 90 ou 365 dias) são
+calculadas de uma só vez sobre a matriz de nutrientes.
+"""
+
+import sys
+import datetime
+import numpy as np
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+from database.meal_repository import MealRepository
+from database.report_repository import ReportRepository
+
+
+class ReportData:
+    """Séries diárias de consumo de um usuário em um período."""
+
+    # Séries carregadas da tabela daily_totals
+    SERIES = ('calories', 'protein', 'carbs', 'fat', 'meal_count')
+
+    # Séries nutricionais, na ordem das linhas de nutrient_matrix()
+    NUTRIENTS = ('calories', 'protein', 'carbs', 'fat')
+
+    def __init__(self, user_id, start_date, end_date, series, as_of=None):
+        """
+        Inicializa os dados do período.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            start_date (datetime.date): Data inicial
+            end_date (datetime.date): Data final
+            series (dict): Arrays NumPy de SERIES, com um valor por dia do período
+            as_of (datetime.datetime, optional): Instante anterior à leitura dos totais diários
+        """
+        self.user_id = user_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.as_of = as_of
+
+        self.calories = series['calories']
+        self.protein = series['protein']
+        self.carbs = series['carbs']
+        self.fat = series['fat']
+        self.meal_count = series['meal_count']
+
+    @classmethod
+    def _from_days(cls, user_id, start_date, end_date, days_totals, as_of):
+        """
+        Monta as séries do período a partir dos totais dos dias com refeições.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            start_date (datetime.date): Data inicial
+            end_date (datetime.date): Data final
+            days_totals (dict): Data 'YYYY-MM-DD' -> valores na ordem de SERIES
+            as_of (datetime.datetime): Instante anterior à leitura dos totais diários
+
+        Returns:
+            ReportData: Séries diárias do período (dias sem refeições ficam com zero)
+        """
+        days = (end_date - start_date).days + 1
+        series = {name: np.zeros(days) for name in cls.SERIES}
+
+        for date_key, values in days_totals.items():
+            index = (datetime.date.fromisoformat(date_key) - start_date).days
+            if 0 <= index < days:
+                for name, value in zip(cls.SERIES, values):
+                    series[name][index] = value or 0
+
+        return cls(user_id, start_date, end_date, series, as_of)
+
+    @classmethod
+    def load(cls, user_id, start_date, end_date):
+        """
+        Carrega os totais diários do período (dias sem refeições ficam com zero).
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            start_date (datetime.date): Data inicial
+            end_date (datetime.date): Data final
+
+        Returns:
+            ReportData: Séries diárias do período
+        """
+        as_of = datetime.datetime.now()
+
+        # Uma única consulta por chave primária em daily_totals
+        totals = MealRepository.get_daily_totals_by_date_range(user_id, start_date, end_date)
+        days_totals = {
+            date_key: [day_totals[name] for name in cls.SERIES]
+            for date_key, day_totals in totals.items()
+        }
+
+        return cls._from_days(user_id, start_date, end_date, days_totals, as_of)
+
+    @classmethod
+    def load_incremental(cls, user_id, report_type, start_date, end_date):
+        """
+        Carrega o período a partir do último instantâneo do relatório, lendo de
+        daily_totals apenas os dias alterados desde então ou fora do período anterior.
+
+        Args:
+            user_id (int): ID do usuário no Telegram
+            report_type (str): Tipo do relatório (weekly, monthly)
+            start_date (datetime.date): Data inicial
+            end_date (datetime.date): Data final
+
+        Returns:
+            ReportData: Séries diárias do período
+        """
+        snapshot = ReportRepository.get_snapshot(user_id, report_type)
+        if not snapshot or any(len(values) != len(cls.SERIES) for values in snapshot['days'].values()):
+            return cls.load(user_id, start_date, end_date)
+
+        as_of = datetime.datetime.now()
+        start_key, end_key = start_date.isoformat(), end_date.isoformat()
+
+        # Dias do instantâneo que continuam no período
+        days_totals = {
+            date_key: values for date_key, values in snapshot['days'].items()
+            if start_key <= date_key <= end_key
+        }
+
+        # Aplica os dias alterados (dias que ficaram sem refeições saem do período)
+        changed = ReportRepository.get_changed_daily_totals(user_id, start_date, end_date, snapshot)
+        for date_key, day_totals in changed.items():
+            if day_totals['meal_count'] > 0:
+                days_totals[date_key] = [day_totals[name] for name in cls.SERIES]
+            else:
+                days_totals.pop(date_key, None)
+
+        return cls._from_days(user_id, start_date, end_date, days_totals, as_of)
+
+    def to_days(self):
+        """
+        Converte as séries nos totais dos dias com refeições (formato dos instantâneos).
+
+        Returns:
+            dict: Data 'YYYY-MM-DD' -> valores na ordem de SERIES
+        """
+        return {
+            date.isoformat(): [float(getattr(self, name)[index]) for name in self.SERIES]
+            for index, date in enumerate(self.dates)
+            if self.meal_count[index] > 0
+        }
+
+    @property
+    def days(self):
+        """Número de dias do período."""
+        return len(self.calories)
+
+    @property
+    def dates(self):
+        """Datas do período, em ordem."""
+        return [self.start_date + datetime.timedelta(days=i) for i in range(self.days)]
+
+    @property
+    def labels(self):
+        """Rótulos dos dias no formato dd/mm, usados nos gráficos e nos dados diários."""
+        return [date.strftime('%d/%m') for date in self.dates]
+
+    def nutrient_matrix(self):
+        """
+        Retorna as séries nutricionais empilhadas em uma matriz.
+
+        Returns:
+            numpy.ndarray: Matriz (nutrientes x dias), com linhas na ordem de NUTRIENTS
+        """
+        return np.vstack([getattr(self, name) for name in self.NUTRIENTS])
+
+    def summarize(self, daily_target, window=7):
+        """
+        Calcula as estatísticas do período.
+
+        Args:
+            daily_target (float): Meta calórica diária
+            window (int): Tamanho (dias) da janela das médias móveis
+
+        Returns:
+            ReportStats: Estatísticas do período
+        """
+        return ReportStats(self, daily_target, window)
+
+
+class ReportStats:
+    """Estatísticas vetorizadas das séries diárias de um período."""
+
+    def __init__(self, report_data, daily_target, window=7):
+        """
+        Calcula todas as estatísticas em uma passagem sobre a matriz de nutrientes.
+
+        Args:
+            report_data (ReportData): Séries diárias do período
+            daily_target (float): Meta calórica diária
+            window (int): Tamanho (dias) da janela das médias móveis
+        """
+        matrix = report_data.nutrient_matrix()
+        days = matrix.shape[1]
+
+        self.days = days
+        self.window = max(1, min(int(window), days)) if days else 0
+        self.logged_days = int(np.count_nonzero(report_data.meal_count))
+
+        # Totais, médias e desvios padrão de todos os nutrientes de uma vez
+        self.totals = self._by_nutrient(matrix.sum(axis=1))
+        self.averages = self._by_nutrient(matrix.mean(axis=1) if days else np.zeros(len(matrix)))
+        self.std = self._by_nutrient(matrix.std(axis=1) if days else np.zeros(len(matrix)))
+
+        # Dias acima e abaixo da meta calórica
+        calories = matrix[0]
+        self.days_over_target = int(np.count_nonzero(calories > daily_target))
+        self.days_under_target = int(np.count_nonzero(calories < daily_target))
+        self.days_on_target = days - self.days_over_target - self.days_under_target
+
+        # Médias móveis por soma acumulada: uma posição por janela completa
+        if days:
+            cumulative = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+            rolling = (cumulative[:, self.window:] - cumulative[:, :-self.window]) / self.window
+        else:
+            rolling = np.zeros((len(matrix), 0))
+        self.rolling_averages = self._by_nutrient(rolling)
+
+        # Inclinação da reta de mínimos quadrados (variação média por dia)
+        if days > 1:
+            x = np.arange(days) - (days - 1) / 2
+            slopes = (matrix - matrix.mean(axis=1, keepdims=True)) @ x / (x @ x)
+        else:
+            slopes = np.zeros(len(matrix))
+        self.trend_slopes = self._by_nutrient(slopes)
+
+        # Distribuição média das calorias entre os macronutrientes (%)
+        energy = np.array([self.averages['protein'] * 4, self.averages['carbs'] * 4, self.averages['fat'] * 9])
+        energy_total = energy.sum()
+        percents = energy / energy_total * 100 if energy_total > 0 else np.zeros(3)
+        self.macro_percents = dict(zip(('protein', 'carbs', 'fat'), (float(p) for p in percents)))
+
+    @staticmethod
+    def _by_nutrient(values):
+        """
+        Associa as linhas (ou posições) de um resultado aos nomes dos nutrientes.
+
+        Args:
+            values (numpy.ndarray): Resultado com uma linha por nutriente
+
+        Returns:
+            dict: Nome do nutriente -> valor (float) ou série (numpy.ndarray)
+        """
+        if values.ndim == 1:
+            return dict(zip(ReportData.NUTRIENTS, (float(value) for value in values)))
+        return dict(zip(ReportData.NUTRIENTS, values))
+
+    def window_change(self, name):
+        """
+        Compara a primeira e a última janela completa do período.
+
+        Args:
+            name (str): Nome do nutriente
+
+        Returns:
+            tuple: (média da primeira janela, média da última janela) ou None se não houver duas janelas
+        """
+        rolling = self.rolling_averages[name]
+        if not self.days or self.days < 2 * self.window:
+            return None
+        return float(rolling[0]), float(rolling[-1])
@@ -7,17 +7,17 @@ import sys
 import os
 import json
 import datetime
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Usar backend não interativo
-import numpy as np
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
+import config
 from database.user_repository import UserRepository
-from database.meal_repository import MealRepository
 from database.photo_repository import PhotoRepository
+from database.report_repository import ReportRepository
+from utils.report_data import ReportData
+from utils.chart_renderer import chart_renderer, render_calorie_chart, render_macro_chart
+from utils.report_cache import ReportCache
 
 class ReportGenerator:
     """Classe para gerar relatórios de progresso e gráficos."""
@@ -27,7 +27,16 @@ class ReportGenerator:
         # Diretório para armazenar relatórios
         self.reports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
         os.makedirs(self.reports_dir, exist_ok=True)
+        
+        # Relatórios e gráficos reutilizados enquanto os dados não mudam
+        self.report_cache = ReportCache(
+            self.reports_dir,
+            max_age=config.REPORT_CACHE_MAX_AGE,
+            max_bytes=config.REPORT_CACHE_MAX_BYTES,
+            eviction_interval=config.REPORT_CACHE_EVICTION_INTERVAL
+        )
     
+    @UserRepository.request_scope()
     def generate_weekly_report(self, user_id):
         """
         Gera um relatório semanal para o usuário.
@@ -51,18 +60,31 @@ class ReportGenerator:
         user_dir = os.path.join(self.reports_dir, str(user_id))
         os.makedirs(user_dir, exist_ok=True)
         
+        # Carrega os totais diários do período a partir do último instantâneo
+        report_data = ReportData.load_incremental(user_id, 'weekly', start_date, end_date)
+        
+        # Reutiliza o relatório anterior se os dados não mudaram desde então
+        cache_key = ReportCache.make_key('weekly', user, report_data)
+        report = self.report_cache.get(user_id, cache_key)
+        if report:
+            return report
+        
+        stats = report_data.summarize(user['daily_calories'], window=7)
+        
         # Gera relatório de consumo calórico
-        calorie_data = self._generate_calorie_report(user_id, start_date, end_date)
+        calorie_data = self._generate_calorie_report(user, report_data, stats)
         
         # Gera relatório de macronutrientes
-        macro_data = self._generate_macro_report(user_id, start_date, end_date)
+        macro_data = self._generate_macro_report(user, report_data, stats)
         
-        # Gera gráficos
-        calorie_chart_path = self._generate_calorie_chart(user_id, calorie_data, start_date, end_date)
-        macro_chart_path = self._generate_macro_chart(user_id, macro_data, start_date, end_date)
+        # Agenda os gráficos no pool de renderização enquanto os insights são calculados
+        chart_futures = {
+            'calorie_chart': self._generate_calorie_chart(user_id, cache_key, report_data, user['daily_calories']),
+            'macro_chart': self._generate_macro_chart(user_id, cache_key, report_data)
+        }
         
         # Gera insights
-        insights = self._generate_insights(user, calorie_data, macro_data)
+        insights = self._generate_insights(user, calorie_data, macro_data, stats)
         
         # Compila o relatório
         report = {
@@ -74,227 +96,141 @@ class ReportGenerator:
             'calorie_data': calorie_data,
             'macro_data': macro_data,
             'insights': insights,
-            'charts': {
-                'calorie_chart': calorie_chart_path,
-                'macro_chart': macro_chart_path
-            }
+            'charts': chart_renderer.wait(chart_futures)
         }
         
+        # Só armazena relatórios com todos os gráficos gerados
+        if all(report['charts'].values()):
+            self.report_cache.set(user_id, cache_key, report)
+        
+        # Guarda o instantâneo para a próxima atualização incremental
+        ReportRepository.save_snapshot(user_id, 'weekly', start_date, end_date,
+                                       report_data.to_days(), report_data.as_of)
+        
         return report
     
-    def _generate_calorie_report(self, user_id, start_date, end_date):
+    def _generate_calorie_report(self, user, report_data, stats):
         """
         Gera dados de consumo calórico para o período.
         
         Args:
-            user_id (int): ID do usuário no Telegram
-            start_date (datetime.date): Data inicial
-            end_date (datetime.date): Data final
+            user (dict): Dados do usuário
+            report_data (ReportData): Séries diárias do período
+            stats (ReportStats): Estatísticas do período
             
         Returns:
             dict: Dados de consumo calórico
         """
-        # Obtém os dados do usuário
-        user = UserRepository.get_user_by_id(user_id)
         daily_target = user['daily_calories']
         
-        # Inicializa dados para cada dia do período
-        date_range = [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-        daily_data = {date.strftime('%Y-%m-%d'): {'date': date.strftime('%d/%m'), 'calories': 0, 'target': daily_target} for date in date_range}
-        
-        # Obtém as refeições do período
-        meals = MealRepository.get_meals_by_user_and_date_range(user_id, start_date, end_date)
-        
-        # Calcula calorias diárias
-        for meal in meals:
-            date_key = meal['meal_date'].strftime('%Y-%m-%d')
-            if date_key in daily_data:
-                daily_data[date_key]['calories'] += meal['calories']
-        
-        # Calcula estatísticas
-        total_calories = sum(day['calories'] for day in daily_data.values())
-        avg_calories = total_calories / len(daily_data) if daily_data else 0
-        days_over_target = sum(1 for day in daily_data.values() if day['calories'] > day['target'])
-        days_under_target = sum(1 for day in daily_data.values() if day['calories'] < day['target'])
-        
         # Organiza os dados em formato de lista para facilitar o uso
-        daily_list = [daily_data[date.strftime('%Y-%m-%d')] for date in date_range]
+        daily_list = [
+            {'date': label, 'calories': float(value), 'target': daily_target}
+            for label, value in zip(report_data.labels, report_data.calories)
+        ]
         
         return {
             'daily': daily_list,
             'stats': {
-                'total_calories': round(total_calories),
-                'avg_calories': round(avg_calories),
-                'days_over_target': days_over_target,
-                'days_under_target': days_under_target,
+                'total_calories': round(stats.totals['calories']),
+                'avg_calories': round(stats.averages['calories']),
+                'std_calories': round(stats.std['calories']),
+                'trend_calories': round(stats.trend_slopes['calories'], 1),
+                'days_over_target': stats.days_over_target,
+                'days_under_target': stats.days_under_target,
                 'target_calories': round(daily_target)
             }
         }
     
-    def _generate_macro_report(self, user_id, start_date, end_date):
+    def _generate_macro_report(self, user, report_data, stats):
         """
         Gera dados de consumo de macronutrientes para o período.
         
         Args:
-            user_id (int): ID do usuário no Telegram
-            start_date (datetime.date): Data inicial
-            end_date (datetime.date): Data final
+            user (dict): Dados do usuário
+            report_data (ReportData): Séries diárias do período
+            stats (ReportStats): Estatísticas do período
             
         Returns:
             dict: Dados de consumo de macronutrientes
         """
-        # Obtém os dados do usuário
-        user = UserRepository.get_user_by_id(user_id)
-        
         # Calcula os macros alvo com base nas calorias diárias e tipo de dieta
         from utils.calorie_calculator import CalorieCalculator
         target_macros = CalorieCalculator.calculate_macros(user['daily_calories'], user['diet_type'])
         
-        # Inicializa dados para cada dia do período
-        date_range = [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-        daily_data = {date.strftime('%Y-%m-%d'): {
-            'date': date.strftime('%d/%m'),
-            'protein': 0,
-            'carbs': 0,
-            'fat': 0,
-            'target_protein': target_macros['protein'],
-            'target_carbs': target_macros['carbs'],
-            'target_fat': target_macros['fat']
-        } for date in date_range}
-        
-        # Obtém as refeições do período
-        meals = MealRepository.get_meals_by_user_and_date_range(user_id, start_date, end_date)
-        
-        # Calcula macros diários
-        for meal in meals:
-            date_key = meal['meal_date'].strftime('%Y-%m-%d')
-            if date_key in daily_data:
-                daily_data[date_key]['protein'] += meal['protein']
-                daily_data[date_key]['carbs'] += meal['carbs']
-                daily_data[date_key]['fat'] += meal['fat']
-        
-        # Calcula estatísticas
-        total_protein = sum(day['protein'] for day in daily_data.values())
-        total_carbs = sum(day['carbs'] for day in daily_data.values())
-        total_fat = sum(day['fat'] for day in daily_data.values())
-        
-        avg_protein = total_protein / len(daily_data) if daily_data else 0
-        avg_carbs = total_carbs / len(daily_data) if daily_data else 0
-        avg_fat = total_fat / len(daily_data) if daily_data else 0
-        
         # Organiza os dados em formato de lista para facilitar o uso
-        daily_list = [daily_data[date.strftime('%Y-%m-%d')] for date in date_range]
+        daily_list = [
+            {
+                'date': label,
+                'protein': float(protein),
+                'carbs': float(carbs),
+                'fat': float(fat),
+                'target_protein': target_macros['protein'],
+                'target_carbs': target_macros['carbs'],
+                'target_fat': target_macros['fat']
+            }
+            for label, protein, carbs, fat in zip(report_data.labels, report_data.protein,
+                                                  report_data.carbs, report_data.fat)
+        ]
         
         return {
             'daily': daily_list,
             'stats': {
-                'total_protein': round(total_protein),
-                'total_carbs': round(total_carbs),
-                'total_fat': round(total_fat),
-                'avg_protein': round(avg_protein),
-                'avg_carbs': round(avg_carbs),
-                'avg_fat': round(avg_fat),
+                'total_protein': round(stats.totals['protein']),
+                'total_carbs': round(stats.totals['carbs']),
+                'total_fat': round(stats.totals['fat']),
+                'avg_protein': round(stats.averages['protein']),
+                'avg_carbs': round(stats.averages['carbs']),
+                'avg_fat': round(stats.averages['fat']),
                 'target_protein': round(target_macros['protein']),
                 'target_carbs': round(target_macros['carbs']),
                 'target_fat': round(target_macros['fat'])
             }
         }
     
-    def _generate_calorie_chart(self, user_id, calorie_data, start_date, end_date):
+    def _generate_calorie_chart(self, user_id, cache_key, report_data, daily_target):
         """
-        Gera um gráfico de consumo calórico.
+        Agenda a geração do gráfico de consumo calórico.
         
         Args:
             user_id (int): ID do usuário no Telegram
-            calorie_data (dict): Dados de consumo calórico
-            start_date (datetime.date): Data inicial
-            end_date (datetime.date): Data final
+            cache_key (str): Impressão digital do relatório (nomeia o arquivo)
+            report_data (ReportData): Séries diárias do período
+            daily_target (float): Meta calórica diária
             
         Returns:
-            str: Caminho para o arquivo do gráfico
+            concurrent.futures.Future: Futuro com o caminho para o arquivo do gráfico
         """
-        # Configura o gráfico
-        plt.figure(figsize=(10, 6))
-        
-        # Extrai dados para o gráfico
-        dates = [day['date'] for day in calorie_data['daily']]
-        calories = [day['calories'] for day in calorie_data['daily']]
-        targets = [day['target'] for day in calorie_data['daily']]
-        
-        # Cria o gráfico de barras para calorias
-        bars = plt.bar(dates, calories, color='#4CAF50', alpha=0.7, label='Calorias consumidas')
-        
-        # Adiciona linha para o alvo
-        plt.plot(dates, targets, 'r--', label='Meta diária')
-        
-        # Configura o layout
-        plt.title('Consumo Calórico Diário')
-        plt.xlabel('Data')
-        plt.ylabel('Calorias')
-        plt.legend()
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Salva o gráfico
-        user_dir = os.path.join(self.reports_dir, str(user_id))
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        chart_filename = f"calorie_chart_{timestamp}.png"
-        chart_path = os.path.join(user_dir, chart_filename)
-        
-        plt.savefig(chart_path)
-        plt.close()
-        
-        return chart_path
+        return chart_renderer.submit(
+            render_calorie_chart,
+            self.report_cache.chart_path(user_id, cache_key, 'calorie_chart'),
+            report_data.labels,
+            report_data.calories.tolist(),
+            daily_target
+        )
     
-    def _generate_macro_chart(self, user_id, macro_data, start_date, end_date):
+    def _generate_macro_chart(self, user_id, cache_key, report_data):
         """
-        Gera um gráfico de consumo de macronutrientes.
+        Agenda a geração do gráfico de consumo de macronutrientes.
         
         Args:
             user_id (int): ID do usuário no Telegram
-            macro_data (dict): Dados de consumo de macronutrientes
-            start_date (datetime.date): Data inicial
-            end_date (datetime.date): Data final
+            cache_key (str): Impressão digital do relatório (nomeia o arquivo)
+            report_data (ReportData): Séries diárias do período
             
         Returns:
-            str: Caminho para o arquivo do gráfico
+            concurrent.futures.Future: Futuro com o caminho para o arquivo do gráfico
         """
-        # Configura o gráfico
-        plt.figure(figsize=(10, 6))
-        
-        # Extrai dados para o gráfico
-        dates = [day['date'] for day in macro_data['daily']]
-        proteins = [day['protein'] for day in macro_data['daily']]
-        carbs = [day['carbs'] for day in macro_data['daily']]
-        fats = [day['fat'] for day in macro_data['daily']]
-        
-        # Cria o gráfico de linhas para macronutrientes
-        plt.plot(dates, proteins, 'b-', marker='o', label='Proteínas (g)')
-        plt.plot(dates, carbs, 'g-', marker='s', label='Carboidratos (g)')
-        plt.plot(dates, fats, 'r-', marker='^', label='Gorduras (g)')
-        
-        # Configura o layout
-        plt.title('Consumo de Macronutrientes')
-        plt.xlabel('Data')
-        plt.ylabel('Gramas')
-        plt.legend()
-        plt.grid(linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Salva o gráfico
-        user_dir = os.path.join(self.reports_dir, str(user_id))
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        chart_filename = f"macro_chart_{timestamp}.png"
-        chart_path = os.path.join(user_dir, chart_filename)
-        
-        plt.savefig(chart_path)
-        plt.close()
-        
-        return chart_path
+        return chart_renderer.submit(
+            render_macro_chart,
+            self.report_cache.chart_path(user_id, cache_key, 'macro_chart'),
+            report_data.labels,
+            report_data.protein.tolist(),
+            report_data.carbs.tolist(),
+            report_data.fat.tolist()
+        )
     
-    def _generate_insights(self, user, calorie_data, macro_data):
+    def _generate_insights(self, user, calorie_data, macro_data, stats):
         """
         Gera insights com base nos dados do relatório.
         
@@ -302,6 +238,7 @@ class ReportGenerator:
             user (dict): Dados do usuário
             calorie_data (dict): Dados de consumo calórico
             macro_data (dict): Dados de consumo de macronutrientes
+            stats (ReportStats): Estatísticas do período
             
         Returns:
             list: Lista de insights
@@ -309,7 +246,7 @@ class ReportGenerator:
         insights = []
         
         # Insight sobre consumo calórico
-        avg_calories = calorie_data['stats']['avg_calories']
+        avg_calories = stats.averages['calories']
         target_calories = calorie_data['stats']['target_calories']
         
         if avg_calories > target_calories * 1.1:
@@ -320,33 +257,27 @@ class ReportGenerator:
             insights.append("Seu consumo calórico médio está próximo da meta. Continue mantendo esse equilíbrio!")
         
         # Insight sobre consistência
-        days_over = calorie_data['stats']['days_over_target']
-        days_under = calorie_data['stats']['days_under_target']
-        days_on_target = 7 - days_over - days_under
+        days_over = stats.days_over_target
+        days_under = stats.days_under_target
+        days_on_target = stats.days_on_target
         
         if days_on_target >= 4:
-            insights.append(f"Você manteve seu consumo próximo da meta em {days_on_target} dias esta semana. Excelente consistência!")
+            insights.append(f"Você manteve seu consumo próximo da meta em {days_on_target} dias no período. Excelente consistência!")
         elif days_over >= 4:
-            insights.append(f"Você excedeu sua meta calórica em {days_over} dias esta semana. Tente planejar suas refeições com antecedência para manter-se dentro da meta.")
+            insights.append(f"Você excedeu sua meta calórica em {days_over} dias no período. Tente planejar suas refeições com antecedência para manter-se dentro da meta.")
         elif days_under >= 4:
-            insights.append(f"Você ficou abaixo da meta calórica em {days_under} dias esta semana. Lembre-se que consumir calorias suficientes é importante para sua saúde e energia.")
+            insights.append(f"Você ficou abaixo da meta calórica em {days_under} dias no período. Lembre-se que consumir calorias suficientes é importante para sua saúde e energia.")
         
         # Insight sobre macronutrientes
-        avg_protein = macro_data['stats']['avg_protein']
+        avg_protein = stats.averages['protein']
         target_protein = macro_data['stats']['target_protein']
         
         if avg_protein < target_protein * 0.8:
             insights.append(f"Seu consumo de proteínas está abaixo do recomendado. Considere incluir mais fontes de proteína como carnes magras, ovos, laticínios ou leguminosas.")
         
         # Insight sobre distribuição de macros
-        avg_carbs = macro_data['stats']['avg_carbs']
-        avg_fat = macro_data['stats']['avg_fat']
-        
-        total_macros = avg_protein + avg_carbs + avg_fat
-        if total_macros > 0:
-            protein_percent = (avg_protein * 4) / (avg_protein * 4 + avg_carbs * 4 + avg_fat * 9) * 100
-            carbs_percent = (avg_carbs * 4) / (avg_protein * 4 + avg_carbs * 4 + avg_fat * 9) * 100
-            fat_percent = (avg_fat * 9) / (avg_protein * 4 + avg_carbs * 4 + avg_fat * 9) * 100
+        if stats.totals['protein'] + stats.totals['carbs'] + stats.totals['fat'] > 0:
+            carbs_percent = stats.macro_percents['carbs']
             
             diet_type = user['diet_type']
             
@@ -356,7 +287,7 @@ class ReportGenerator:
                 insights.append(f"Para uma dieta cetogênica, seu consumo de carboidratos está alto ({round(carbs_percent)}% das calorias). Limite ainda mais os carboidratos e aumente o consumo de gorduras saudáveis.")
         
         # Insight sobre variação ao longo da semana
-        calories_variation = np.std([day['calories'] for day in calorie_data['daily']])
+        calories_variation = stats.std['calories']
         if calories_variation > target_calories * 0.3:
             insights.append("Seu consumo calórico varia bastante ao longo da semana. Tentar manter um padrão mais consistente pode ajudar a alcançar seus objetivos.")
         
@@ -375,6 +306,7 @@ class ReportGenerator:
         
         return insights
     
+    @UserRepository.request_scope()
     def generate_monthly_report(self, user_id):
         """
         Gera um relatório mensal para o usuário (recurso premium).
@@ -401,21 +333,34 @@ class ReportGenerator:
         user_dir = os.path.join(self.reports_dir, str(user_id))
         os.makedirs(user_dir, exist_ok=True)
         
+        # Carrega os totais diários do período a partir do último instantâneo
+        report_data = ReportData.load_incremental(user_id, 'monthly', start_date, end_date)
+        
+        # Reutiliza o relatório anterior se os dados não mudaram desde então
+        cache_key = ReportCache.make_key('monthly', user, report_data)
+        report = self.report_cache.get(user_id, cache_key)
+        if report:
+            return report
+        
+        stats = report_data.summarize(user['daily_calories'], window=7)
+        
         # Gera relatório de consumo calórico
-        calorie_data = self._generate_calorie_report(user_id, start_date, end_date)
+        calorie_data = self._generate_calorie_report(user, report_data, stats)
         
         # Gera relatório de macronutrientes
-        macro_data = self._generate_macro_report(user_id, start_date, end_date)
+        macro_data = self._generate_macro_report(user, report_data, stats)
         
-        # Gera gráficos
-        calorie_chart_path = self._generate_calorie_chart(user_id, calorie_data, start_date, end_date)
-        macro_chart_path = self._generate_macro_chart(user_id, macro_data, start_date, end_date)
+        # Agenda os gráficos no pool de renderização enquanto os insights são calculados
+        chart_futures = {
+            'calorie_chart': self._generate_calorie_chart(user_id, cache_key, report_data, user['daily_calories']),
+            'macro_chart': self._generate_macro_chart(user_id, cache_key, report_data)
+        }
         
         # Gera insights
-        insights = self._generate_insights(user, calorie_data, macro_data)
+        insights = self._generate_insights(user, calorie_data, macro_data, stats)
         
         # Adiciona insights premium
-        premium_insights = self._generate_premium_insights(user, calorie_data, macro_data)
+        premium_insights = self._generate_premium_insights(user, calorie_data, macro_data, stats)
         insights.extend(premium_insights)
         
         # Compila o relatório
@@ -428,15 +373,20 @@ class ReportGenerator:
             'calorie_data': calorie_data,
             'macro_data': macro_data,
             'insights': insights,
-            'charts': {
-                'calorie_chart': calorie_chart_path,
-                'macro_chart': macro_chart_path
-            }
+            'charts': chart_renderer.wait(chart_futures)
         }
         
+        # Só armazena relatórios com todos os gráficos gerados
+        if all(report['charts'].values()):
+            self.report_cache.set(user_id, cache_key, report)
+        
+        # Guarda o instantâneo para a próxima atualização incremental
+        ReportRepository.save_snapshot(user_id, 'monthly', start_date, end_date,
+                                       report_data.to_days(), report_data.as_of)
+        
         return report
     
-    def _generate_premium_insights(self, user, calorie_data, macro_data):
+    def _generate_premium_insights(self, user, calorie_data, macro_data, stats):
         """
         Gera insights premium com base nos dados do relatório.
         
@@ -444,22 +394,22 @@ class ReportGenerator:
             user (dict): Dados do usuário
             calorie_data (dict): Dados de consumo calórico
             macro_data (dict): Dados de consumo de macronutrientes
+            stats (ReportStats): Estatísticas do período
             
         Returns:
             list: Lista de insights premium
         """
         premium_insights = []
         
-        # Análise de tendência
-        calories_by_day = [day['calories'] for day in calorie_data['daily']]
-        if len(calories_by_day) >= 7:
-            first_week_avg = sum(calories_by_day[:7]) / 7
-            last_week_avg = sum(calories_by_day[-7:]) / 7
+        # Análise de tendência: média móvel da primeira e da última janela do período
+        window_change = stats.window_change('calories')
+        if window_change:
+            first_week_avg, last_week_avg = window_change
             
             if first_week_avg > last_week_avg:
                 change_percent = (first_week_avg - last_week_avg) / first_week_avg * 100
                 premium_insights.append(f"Tendência positiva: Seu consumo calórico reduziu {round(change_percent)}% nas últimas semanas.")
-            elif last_week_avg > first_week_avg:
+            elif 0 < first_week_avg < last_week_avg:
                 change_percent = (last_week_avg - first_week_avg) / first_week_avg * 100
                 premium_insights.append(f"Tendência de atenção: Seu consumo calórico aumentou {round(change_percent)}% nas últimas semanas.")
         
@@ -478,6 +428,7 @@ class ReportGenerator:
         
         return premium_insights
     
+    @UserRepository.request_scope()
     def generate_pdf_report(self, user_id, report_data):
         """
         Gera um relatório em PDF (recurso premium).